@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+# Perzisztens, lemezen tárolt chunk cache régió könyvtárakkal.
+# A kulcs: (névtér, seed, generátor verzió, chunk oszlop). Egy oszlop adatai
+# (voxel tömbök és opcionálisan az előre elkészített mesh bufferek) egy tömörített
+# .npz fájlba kerülnek; a fájlok REGION_SIZE x REGION_SIZE oszlopos régió
+# könyvtárakba vannak csoportosítva. A legutóbb használt oszlopok a memóriában
+# is megmaradnak (LRU), így egy már bejárt területre visszatérni csak fájl olvasás.
+
+from collections import OrderedDict
+import os
+import tempfile
+
+import numpy as np
+
+REGION_SIZE = 8  # Egy régió könyvtár ennyiszer ennyi chunk oszlopot tartalmaz
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chunk_cache")
+
+
+class ChunkStore:
+    """
+    Oszloponkénti tömb-szótárak ({név: np.ndarray}) tárolása lemezen és memóriában.
+
+    cache_dir: a cache gyökérkönyvtára.
+    namespace: a világ típusa / paraméterei (pl. "voxel_inf", "hex_15").
+    seed, version: a generátor seedje és verziója; ha bármelyik változik,
+                   a régi adatok automatikusan érvénytelenek (másik könyvtár).
+    max_hot_columns: az LRU memória cache mérete oszlopban.
+    """
+
+    def __init__(self, cache_dir, namespace, seed=0, version=1, max_hot_columns=64):
+        self.root = os.path.join(cache_dir, f"{namespace}_s{seed}_v{version}")
+        self.max_hot_columns = max_hot_columns
+        self.hot = OrderedDict()  # (cx, cy) -> (fájl módosítási idő, {név: tömb})
+        self.hits = 0
+        self.misses = 0
+
+    def column_path(self, cx, cy):
+        rx, ry = cx // REGION_SIZE, cy // REGION_SIZE
+        return os.path.join(self.root, f"r.{rx}.{ry}", f"c.{cx}.{cy}.npz")
+
+    def load_column(self, cx, cy):
+        """Az oszlop tárolt tömbjei, vagy None, ha még nincs a cache-ben."""
+        key = (cx, cy)
+        path = self.column_path(cx, cy)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            self.hot.pop(key, None)
+            self.misses += 1
+            return None
+
+        # A memóriában lévő példány csak akkor jó, ha azóta más processz
+        # (pl. egy worker vagy a szerkesztő) nem írta felül a fájlt
+        entry = self.hot.get(key)
+        if entry is not None and entry[0] == mtime:
+            self.hot.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        try:
+            with np.load(path) as data:
+                arrays = {name: data[name] for name in data.files}
+        except (OSError, ValueError):
+            # Sérült / félbeszakadt fájl: úgy kezeljük, mintha nem lenne cache-elve
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.remember(key, arrays, mtime)
+        return arrays
+
+    def save_column(self, cx, cy, arrays):
+        """Az oszlop tömbjeinek kiírása (atomikusan: ideiglenes fájl + átnevezés)."""
+        path = self.column_path(cx, cy)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(suffix=".npz", dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(f, **arrays)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.remember((cx, cy), arrays, os.stat(path).st_mtime_ns)
+
+    def update_column(self, cx, cy, arrays, stale_chunks=()):
+        """
+        A meglévő tömbök kiegészítése / felülírása (pl. mesh hozzáadása a voxelekhez).
+        stale_chunks: ezeknek a chunkoknak (cz) a tárolt mesh-ei (minden mesher mód
+        és LOD szint) törlődnek; az oszlop többi chunkjának mesh-e megmarad.
+        """
+        stored = self.load_column(cx, cy)
+        if stored is None and not arrays:
+            return
+        merged = {name: array for name, array in (stored or {}).items()
+                  if mesh_chunk(name) not in stale_chunks}
+        merged.update(arrays)
+        self.save_column(cx, cy, merged)
+
+    def invalidate(self, cx, cy):
+        """Az oszlop törlése a memóriából és a lemezről."""
+        self.hot.pop((cx, cy), None)
+        path = self.column_path(cx, cy)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def remember(self, key, arrays, mtime):
+        self.hot[key] = (mtime, arrays)
+        self.hot.move_to_end(key)
+        while len(self.hot) > self.max_hot_columns:
+            self.hot.popitem(last=False)
+
+
+# --- VOXEL OSZLOP <-> TÖMB SZÓTÁR ---
+
+def voxel_column_arrays(chunks):
+    """A chunk oszlop voxel tömbjei tárolható formában ({'voxels_<cz>': tömb})."""
+    return {f"voxels_{chunk.coord[2]}": chunk.voxels for chunk in chunks}
+
+
+def mesh_arrays(coord, mesher_mode, rows, indices, num_vertices, num_triangles):
+    """Egy chunk előre elkészített (csomagolt) mesh bufferei tárolható formában."""
+    cz = coord[2]
+    return {
+        f"{mesher_mode}_rows_{cz}": np.frombuffer(rows, dtype=np.uint8),
+        f"{mesher_mode}_indices_{cz}": np.frombuffer(indices, dtype=np.uint8),
+        f"{mesher_mode}_counts_{cz}": np.array([num_vertices, num_triangles], dtype=np.int64),
+    }
+
+
+def mesh_chunk(name):
+    """A mesh_arrays() által írt tömb chunkjának cz koordinátája, más tömbnél None."""
+    parts = name.rsplit("_", 2)
+    if len(parts) == 3 and parts[1] in ("rows", "indices", "counts"):
+        return int(parts[2])
+    return None
+
+
+def stored_voxels(arrays):
+    """{cz: voxel tömb} a tárolt oszlopból."""
+    return {int(name.split("_")[1]): voxels
+            for name, voxels in arrays.items() if name.startswith("voxels_")}
+
+
+def stored_mesh(arrays, cz, mesher_mode):
+    """(rows, indices, vertex szám, háromszög szám) vagy None, ha nincs cache-elt mesh."""
+    counts = arrays.get(f"{mesher_mode}_counts_{cz}")
+    if counts is None:
+        return None
+    return (arrays[f"{mesher_mode}_rows_{cz}"].tobytes(),
+            arrays[f"{mesher_mode}_indices_{cz}"].tobytes(),
+            int(counts[0]), int(counts[1]))
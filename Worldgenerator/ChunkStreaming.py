@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+# Kamera-központú chunk streaming a végtelen voxel világhoz.
+# Csak a kamera körüli, adott sugarú körben lévő chunk oszlopok vannak betöltve;
+# a körbe belépő oszlopok generálási sorba kerülnek, a kilépők felszabadulnak.
+
+import math
+
+from VoxelChunk import CHUNK_SIZE, VOXEL_SIZE
+
+# A négy oldalszomszéd és a négy átlós szomszéd (oszlop koordinátában)
+NEIGHBOR_COLUMNS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if (dx, dy) != (0, 0)]
+
+
+def column_distance(a, b):
+    """Két chunk oszlop távolsága chunk egységben."""
+    return math.hypot(a[0] - b[0], a[1] - b[1])
+
+
+class ChunkStreamer:
+    """
+    Chunk oszlopok (cx, cy) betöltése / eltávolítása a kamera pozíciója alapján.
+
+    Egy oszlop kétféle állapotban lehet:
+      - adat: a voxel tömbök léteznek (world.chunks-ban),
+      - mesh: a GeomNode is fel van építve és a jelenetgráfban van.
+    A mesh-hez az oszlop 8 szomszédjának adata is kell (lapkivágás a határon),
+    ezért az adat gyűrű egy oszloppal szélesebb, mint a látható sugár.
+
+    world: a load_column(cx, cy), unload_column(cx, cy), build_column_nodes(cx, cy)
+           és remove_column_nodes(cx, cy) metódusokat biztosító világ objektum.
+           Ha a világnak van worker poolja (world.pool), az oszlopot a
+           request_column(cx, cy) küldi el a háttérben építésre.
+    radius: látható sugár chunk oszlopban.
+    hysteresis: ennyivel távolabb kell kerülnie egy oszlopnak, mielőtt eltávolítjuk
+                (így a határon mozgó kamera nem tölti újra folyamatosan ugyanazt).
+    max_columns: memória plafon, legfeljebb ennyi mesh-elt oszlop lehet egyszerre.
+    columns_per_frame: frame-enként legfeljebb ennyi oszlopot építünk fel.
+    """
+
+    def __init__(self, world, radius=4, hysteresis=1, max_columns=256, columns_per_frame=2):
+        self.world = world
+        self.radius = radius
+        self.hysteresis = hysteresis
+        self.max_columns = max_columns
+        self.columns_per_frame = columns_per_frame
+
+        self.data_columns = set()
+        self.mesh_columns = set()
+        self.queue = []
+        self.center = None
+
+    def camera_column(self, pos):
+        """A világkoordinátás pozíciót tartalmazó chunk oszlop."""
+        size = CHUNK_SIZE * VOXEL_SIZE
+        # A voxel középpontok egész koordinátán vannak, a chunk határ -0.5-nél
+        return (int(math.floor((pos[0] + VOXEL_SIZE / 2.0) / size)),
+                int(math.floor((pos[1] + VOXEL_SIZE / 2.0) / size)))
+
+    def update(self, pos):
+        """Frame-enként hívandó a kamera világkoordinátás pozíciójával."""
+        center = self.camera_column(pos)
+        if center != self.center:
+            self.center = center
+            self.unload_far_columns()
+            self.rebuild_queue()
+
+        built = 0
+        while self.queue and built < self.columns_per_frame:
+            if len(self.mesh_columns) >= self.max_columns:
+                break
+            column = self.queue.pop(0)
+            if column in self.mesh_columns:
+                continue
+            self.load_column(column)
+            built += 1
+
+    def rebuild_queue(self):
+        """A sugáron belüli, még fel nem épített oszlopok, a legközelebbivel kezdve."""
+        cx, cy = self.center
+        wanted = []
+        for dx in range(-self.radius, self.radius + 1):
+            for dy in range(-self.radius, self.radius + 1):
+                column = (cx + dx, cy + dy)
+                if column in self.mesh_columns:
+                    continue
+                distance = column_distance(column, self.center)
+                if distance <= self.radius:
+                    wanted.append((distance, column))
+        wanted.sort()
+        self.queue = [column for _, column in wanted]
+
+    def load_column(self, column):
+        """Az oszlop és 8 szomszédja adatainak biztosítása, majd az oszlop mesh-elése."""
+        if self.world.pool is not None:
+            # A worker maga generálja a szomszédokat is, az adat a mesh-sel együtt érkezik
+            self.world.request_column(*column)
+            self.data_columns.add(column)
+            self.mesh_columns.add(column)
+            return
+        for dx, dy in [(0, 0)] + NEIGHBOR_COLUMNS:
+            neighbor = (column[0] + dx, column[1] + dy)
+            if neighbor not in self.data_columns:
+                self.world.load_column(*neighbor)
+                self.data_columns.add(neighbor)
+        self.world.build_column_nodes(*column)
+        self.mesh_columns.add(column)
+
+    def unload_far_columns(self):
+        """A hiszterézissel megnövelt sugáron kívüli oszlopok eltávolítása."""
+        mesh_limit = self.radius + self.hysteresis
+        for column in list(self.mesh_columns):
+            if column_distance(column, self.center) > mesh_limit:
+                self.world.remove_column_nodes(*column)
+                self.mesh_columns.discard(column)
+        # Az adatot egy oszloppal tovább tartjuk meg, mert a szomszédok mesh-eléséhez kell
+        for column in list(self.data_columns):
+            if column_distance(column, self.center) > mesh_limit + 1:
+                if column in self.mesh_columns:
+                    continue
+                self.world.unload_column(*column)
+                self.data_columns.discard(column)
+
+    def stats(self):
+        """Állapot riport: betöltött oszlopok, sor hossza, becsült memória."""
+        return {
+            'data_columns': len(self.data_columns),
+            'mesh_columns': len(self.mesh_columns),
+            'queue': len(self.queue),
+            'memory_bytes': self.world.memory_bytes(),
+        }
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+# Háttérben futó chunk generálás és mesh-elés (concurrent.futures processz pool).
+# A workerek a magasságtérképet, a voxel tömböket és a csomagolt vertex / index
+# bufferet állítják elő; a fő szál ezeket frame-enkénti időkeretben tölti fel
+# GeomVertexData-ba, így a render loop sosem áll meg generálás miatt.
+
+from collections import deque
+import concurrent.futures
+import multiprocessing
+import os
+import time
+
+from VoxelTerrain import load_or_generate_column, open_voxel_store
+from VoxelMesher import mesh_key
+from SmoothMesher import build_mesh
+from ChunkStore import stored_voxels, stored_mesh, mesh_arrays
+from VoxelLod import build_lod_meshes, stored_lods, lod_mesh_arrays
+from VoxelLight import light_columns
+
+# Worker processzenként egy-egy nyitott chunk cache (saját LRU-val)
+_worker_stores = {}
+
+
+def worker_store(cache_dir, world_size, seed=0):
+    if cache_dir is None:
+        return None
+    key = (cache_dir, world_size, seed)
+    if key not in _worker_stores:
+        _worker_stores[key] = open_voxel_store(cache_dir, world_size, seed)
+    return _worker_stores[key]
+
+
+def cached_column_results(store, cx, cy, mesher_mode, lod_factors=(), packed=False):
+    """Ha az oszlop voxeljei és a mesh-ei (LOD-okkal) is a cache-ben vannak, azok eredményként."""
+    arrays = store.load_column(cx, cy)
+    if arrays is None:
+        return None
+    results = []
+    for cz, voxels in sorted(stored_voxels(arrays).items()):
+        cached = stored_mesh(arrays, cz, mesh_key(mesher_mode, packed))
+        lods = stored_lods(arrays, cz, lod_factors, packed)
+        if cached is None or lods is None:
+            return None
+        results.append(((cx, cy, cz), voxels) + cached + (lods,))
+    return results
+
+
+def build_column_job(cx, cy, world_size, mesher_mode, cache_dir=None, lod_factors=(),
+                     packed=False, seed=0):
+    """
+    Worker oldali feladat: a (cx, cy) chunk oszlop generálása és mesh-elése.
+    A 8 szomszéd oszlopot is legenerálja (a zaj determinisztikus), hogy a
+    chunk határokon is helyes legyen a lapkivágás.
+    Ha van chunk cache, a kész oszlopot onnan olvassa, az újat pedig elmenti.
+    packed=True: a bufferek PACKED_VOXEL_FORMAT elrendezésűek.
+    seed: a terep zaj seedje; a zaj processzfüggetlen, így a worker ugyanazt
+    a terepet adja, mint a fő szál vagy egy korábbi futás cache-e.
+    Visszatérés: ((cx, cy), [(chunk koordináta, voxels, vertex bytes, index bytes,
+                               vertex szám, háromszög szám, LOD mesh-ek), ...])
+    """
+    store = worker_store(cache_dir, world_size, seed)
+    if store is not None:
+        results = cached_column_results(store, cx, cy, mesher_mode, lod_factors, packed)
+        if results is not None:
+            return (cx, cy), results
+
+    chunks = {}
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            for chunk in load_or_generate_column(cx + dx, cy + dy, world_size, store, seed):
+                chunks[chunk.coord] = chunk
+    # A fény a 3x3 oszlopon belül terjed; a mesher a középső oszlopét süti be
+    light_columns(chunks, (cx - 1, cy - 1), (cx + 1, cy + 1), context=0)
+
+    results = []
+    baked = {}
+    for coord, chunk in chunks.items():
+        if coord[:2] != (cx, cy):
+            continue
+        mesh = build_mesh(chunk, chunks.get, mesher_mode, world_size, seed)
+        rows, indices = mesh.pack(packed)
+        lods = build_lod_meshes(chunk, lod_factors, packed)
+        results.append((coord, chunk.voxels, rows, indices,
+                        mesh.num_vertices(), mesh.num_triangles(), lods))
+        baked.update(mesh_arrays(coord, mesh_key(mesher_mode, packed), rows, indices,
+                                 mesh.num_vertices(), mesh.num_triangles()))
+        baked.update(lod_mesh_arrays(coord, lods, packed))
+    if store is not None:
+        store.update_column(cx, cy, baked)
+    return (cx, cy), results
+
+
+class ChunkBuildPool:
+    """
+    Processz pool a chunk oszlopok építéséhez.
+    A kész eredmények egy sorba kerülnek, amit az upload() frame-enként
+    legfeljebb upload_budget_ms ideig dolgoz fel.
+    """
+
+    def __init__(self, workers=None, upload_budget_ms=2.0):
+        # "spawn": a workerek tiszta interpretert kapnak, nem öröklik a grafikus kontextust
+        self.executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count(),
+            mp_context=multiprocessing.get_context("spawn"))
+        self.upload_budget_ms = upload_budget_ms
+        self.pending = {}     # oszlop -> Future
+        self.ready = deque()  # (oszlop, eredmények)
+
+    def submit(self, column, world_size, mesher_mode, cache_dir=None, lod_factors=(),
+               packed=False, seed=0):
+        if column in self.pending:
+            return
+        self.pending[column] = self.executor.submit(
+            build_column_job, column[0], column[1], world_size, mesher_mode, cache_dir,
+            tuple(lod_factors), packed, seed)
+
+    def cancel(self, column):
+        """Egy még nem feltöltött oszlop eldobása (pl. kikerült a streaming sugárból)."""
+        future = self.pending.pop(column, None)
+        if future is not None:
+            future.cancel()
+        self.ready = deque(item for item in self.ready if item[0] != column)
+
+    def collect(self):
+        """A befejeződött future-ök eredményeinek átrakása a feltöltési sorba."""
+        for column in [c for c, future in self.pending.items() if future.done()]:
+            future = self.pending.pop(column)
+            if not future.cancelled():
+                self.ready.append(future.result())
+
+    def upload(self, apply_column):
+        """
+        A kész oszlopok átadása az apply_column(oszlop, eredmények) függvénynek,
+        amíg az időkeret el nem fogy. Visszatérés: a feldolgozott oszlopok száma.
+        """
+        self.collect()
+        start = time.perf_counter()
+        uploaded = 0
+        while self.ready:
+            column, results = self.ready.popleft()
+            apply_column(column, results)
+            uploaded += 1
+            if (time.perf_counter() - start) * 1000.0 >= self.upload_budget_ms:
+                break
+        return uploaded
+
+    def busy(self):
+        return bool(self.pending or self.ready)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+# Seedelt, koherens fraktál zaj (Perlin gradiens zaj + fBm + domain warp) NumPy tömbökön.
+# A rácspontok gradiensét egy egész hash adja a (rácspont, seed) párból, nem
+# Python hash() vagy globális véletlen állapot, így ugyanaz a seed minden
+# processzben (worker pool, későbbi futás) bitre azonos terepet ad.
+# A magasságtérképet csempénként (pl. egy chunk oszlop) egyben számoljuk, és a
+# kész csempéket egy LRU cache tartja meg (seed, csempe, paraméterek) kulccsal.
+
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+# scale: az első oktáv frekvenciája (1 / hullámhossz rács egységben)
+# octaves, lacunarity, gain: oktávok száma, frekvencia szorzó és amplitúdó szorzó oktávonként
+# warp_strength, warp_scale, warp_octaves: a domain warp eltolása (rács egységben),
+#                                          frekvenciája és oktávszáma (0 erősség: nincs warp)
+NoiseParams = namedtuple("NoiseParams", [
+    "scale", "octaves", "lacunarity", "gain", "warp_strength", "warp_scale", "warp_octaves"],
+    defaults=(1.0 / 64.0, 5, 2.0, 0.5, 0.0, 1.0 / 128.0, 2))
+
+TILE_CACHE_SIZE = 256  # Ennyi kész csempét tart meg processzenként az LRU
+
+# A 8 gradiens irány (egységvektorok 45 fokonként)
+_ANGLES = np.arange(8) * (np.pi / 4.0)
+GRADIENTS = np.stack([np.cos(_ANGLES), np.sin(_ANGLES)], axis=1)
+
+# 3D gradiensek: a kocka 12 élfelező iránya (Perlin "improved noise")
+GRADIENTS3 = np.array([(1, 1, 0), (-1, 1, 0), (1, -1, 0), (-1, -1, 0),
+                       (1, 0, 1), (-1, 0, 1), (1, 0, -1), (-1, 0, -1),
+                       (0, 1, 1), (0, -1, 1), (0, 1, -1), (0, -1, -1)], dtype=np.float64)
+
+# Egymástól független zaj mezők seedje ugyanabból a világ seedből
+OCTAVE_SEED_STEP = 1013
+WARP_X_SEED = 7919
+WARP_Y_SEED = 15887
+
+
+def hash_lattice(ix, iy, seed):
+    """Egész rácspontok (int tömbök) 32 bites hash-e; az eredmény uint32 tömb."""
+    mask = 0xFFFFFFFF
+    h = (np.asarray(ix, dtype=np.int64) & mask).astype(np.uint32) * np.uint32(0x27D4EB2D)
+    h ^= (np.asarray(iy, dtype=np.int64) & mask).astype(np.uint32) * np.uint32(0x165667B1)
+    h ^= np.uint32((seed * 0x9E3779B9) & mask)
+    # Lavina lépések (murmur3 finalizer): a szomszéd rácspontok hash-e ne korreláljon
+    h ^= h >> np.uint32(16)
+    h *= np.uint32(0x85EBCA6B)
+    h ^= h >> np.uint32(13)
+    h *= np.uint32(0xC2B2AE35)
+    h ^= h >> np.uint32(16)
+    return h
+
+
+def hash_lattice3(ix, iy, iz, seed):
+    """hash_lattice() 3D rácspontokra: a z koordináta egy harmadik szorzóval keveredik be."""
+    mask = 0xFFFFFFFF
+    h = hash_lattice(ix, iy, seed)
+    h ^= (np.asarray(iz, dtype=np.int64) & mask).astype(np.uint32) * np.uint32(0x9E3779B1)
+    h ^= h >> np.uint32(15)
+    h *= np.uint32(0x2C1B3C6D)
+    h ^= h >> np.uint32(12)
+    return h
+
+
+def fade(t):
+    """Perlin kvintikus simítás: 6t^5 - 15t^4 + 10t^3."""
+    return t * t * t * (t * (t * 6.0 - 15.0) + 10.0)
+
+
+def perlin(x, y, seed=0):
+    """
+    2D Perlin gradiens zaj float tömbökön (broadcastolhatók), kb. [-1, 1] tartományban.
+    A rácspontokon az értéke 0; a rácsot egész koordináták adják.
+    """
+    x, y = np.broadcast_arrays(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64))
+    x0 = np.floor(x)
+    y0 = np.floor(y)
+    fx = x - x0
+    fy = y - y0
+    ix = x0.astype(np.int64)
+    iy = y0.astype(np.int64)
+
+    def corner(dx, dy):
+        g = GRADIENTS[hash_lattice(ix + dx, iy + dy, seed) & np.uint32(7)]
+        return g[..., 0] * (fx - dx) + g[..., 1] * (fy - dy)
+
+    u = fade(fx)
+    v = fade(fy)
+    bottom = corner(0, 0) + u * (corner(1, 0) - corner(0, 0))
+    top = corner(0, 1) + u * (corner(1, 1) - corner(0, 1))
+    # Egységnyi gradiensekkel a szélsőérték sqrt(0.5), ezt skálázzuk [-1, 1]-re
+    return (bottom + v * (top - bottom)) * np.sqrt(2.0)
+
+
+def perlin3(x, y, z, seed=0):
+    """
+    3D Perlin gradiens zaj (pl. barlangokhoz) float tömbökön, kb. [-1, 1] tartományban.
+    """
+    x, y, z = np.broadcast_arrays(*(np.asarray(c, dtype=np.float64) for c in (x, y, z)))
+    x0, y0, z0 = np.floor(x), np.floor(y), np.floor(z)
+    fx, fy, fz = x - x0, y - y0, z - z0
+    ix, iy, iz = x0.astype(np.int64), y0.astype(np.int64), z0.astype(np.int64)
+
+    def corner(dx, dy, dz):
+        g = GRADIENTS3[hash_lattice3(ix + dx, iy + dy, iz + dz, seed) % np.uint32(12)]
+        return g[..., 0] * (fx - dx) + g[..., 1] * (fy - dy) + g[..., 2] * (fz - dz)
+
+    u, v, w = fade(fx), fade(fy), fade(fz)
+
+    def lerp(a, b, t):
+        return a + t * (b - a)
+
+    near = lerp(lerp(corner(0, 0, 0), corner(1, 0, 0), u), lerp(corner(0, 1, 0), corner(1, 1, 0), u), v)
+    far = lerp(lerp(corner(0, 0, 1), corner(1, 0, 1), u), lerp(corner(0, 1, 1), corner(1, 1, 1), u), v)
+    # A (1, 1, 0) típusú gradiensekkel a szélsőérték kb. 1, nincs szükség skálázásra
+    return lerp(near, far, w)
+
+
+def fbm(x, y, seed=0, scale=1.0 / 64.0, octaves=5, lacunarity=2.0, gain=0.5):
+    """
+    Fraktál Brown-mozgás: octaves darab Perlin oktáv összege, oktávonként
+    lacunarity-szoros frekvenciával és gain-szeres amplitúdóval. Az eredmény
+    az amplitúdók összegével normalizált, kb. [-1, 1] tartományú tömb.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    total = np.zeros(np.broadcast(x, y).shape)
+    frequency = scale
+    amplitude = 1.0
+    norm = 0.0
+    for octave in range(octaves):
+        total += amplitude * perlin(x * frequency, y * frequency, seed + octave * OCTAVE_SEED_STEP)
+        norm += amplitude
+        frequency *= lacunarity
+        amplitude *= gain
+    return total / norm if norm else total
+
+
+def fbm3(x, y, z, seed=0, scale=1.0 / 32.0, octaves=3, lacunarity=2.0, gain=0.5):
+    """fbm() 3D változata perlin3() oktávokból, kb. [-1, 1] tartományban."""
+    x, y, z = (np.asarray(c, dtype=np.float64) for c in (x, y, z))
+    total = np.zeros(np.broadcast(x, y, z).shape)
+    frequency = scale
+    amplitude = 1.0
+    norm = 0.0
+    for octave in range(octaves):
+        total += amplitude * perlin3(x * frequency, y * frequency, z * frequency,
+                                     seed + octave * OCTAVE_SEED_STEP)
+        norm += amplitude
+        frequency *= lacunarity
+        amplitude *= gain
+    return total / norm if norm else total
+
+
+def fractal_noise(x, y, seed=0, params=NoiseParams()):
+    """
+    fBm domain warppal: a mintavételi pontot két további (alacsony frekvenciájú)
+    fBm mező tolja el, így a dombok nem rácshoz igazodó, folyószerű formát kapnak.
+    x, y: világ koordináta tömbök (rács egységben).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if params.warp_strength:
+        warp_x = fbm(x, y, seed + WARP_X_SEED, params.warp_scale, params.warp_octaves,
+                     params.lacunarity, params.gain)
+        warp_y = fbm(x, y, seed + WARP_Y_SEED, params.warp_scale, params.warp_octaves,
+                     params.lacunarity, params.gain)
+        x = x + params.warp_strength * warp_x
+        y = y + params.warp_strength * warp_y
+    return fbm(x, y, seed, params.scale, params.octaves, params.lacunarity, params.gain)
+
+
+@lru_cache(maxsize=TILE_CACHE_SIZE)
+def noise_tile(seed, tx, ty, size, params=NoiseParams()):
+    """
+    A (tx, ty) csempe (size, size) zaj értékei: x = tx * size + i, y = ty * size + j
+    rácspontokon, [i, j] indexeléssel. Az eredmény csak olvasható, mert az LRU
+    cache-ben megosztott példány; módosítás előtt másolni kell.
+    """
+    x = tx * size + np.arange(size, dtype=np.float64)
+    y = ty * size + np.arange(size, dtype=np.float64)
+    tile = fractal_noise(x[:, None], y[None, :], seed, params)
+    tile.setflags(write=False)
+    return tile
+
+
+def noise_region(seed, x0, y0, width, height, tile_size, params=NoiseParams()):
+    """
+    Tetszőleges, csempe határhoz nem igazodó [x0, x0 + width) x [y0, y0 + height)
+    terület zaj értékei a cache-elt csempékből összerakva.
+    """
+    first_tx, first_ty = x0 // tile_size, y0 // tile_size
+    last_tx, last_ty = (x0 + width - 1) // tile_size, (y0 + height - 1) // tile_size
+    region = np.empty((width, height))
+    for tx in range(first_tx, last_tx + 1):
+        for ty in range(first_ty, last_ty + 1):
+            tile = noise_tile(seed, tx, ty, tile_size, params)
+            gx0, gy0 = max(tx * tile_size, x0), max(ty * tile_size, y0)
+            gx1 = min((tx + 1) * tile_size, x0 + width)
+            gy1 = min((ty + 1) * tile_size, y0 + height)
+            region[gx0 - x0:gx1 - x0, gy0 - y0:gy1 - y0] = \
+                tile[gx0 - tx * tile_size:gx1 - tx * tile_size, gy0 - ty * tile_size:gy1 - ty * tile_size]
+    return region
+
+
+def tile_cache_info():
+    """Az LRU csempe cache statisztikái (találat, hiány, méret)."""
+    return noise_tile.cache_info()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# Közös segédfüggvények a voxel és a hatszög világ geometriájához.
+# A vertex és index adatokat NumPy tömbökben állítjuk elő, majd EGY
+# memóriamásolással töltjük be a GeomVertexArrayData bufferébe
+# (modify_array().modify_handle().copy_data_from()), vertexenkénti
+# GeomVertexWriter hívások helyett.
+
+from panda3d.core import (
+    GeomVertexData, GeomTriangles, Geom, GeomNode
+)
+import numpy as np
+
+# Panda3D numerikus típus -> NumPy típus
+NUMERIC_DTYPES = {
+    Geom.NT_float32: np.float32,
+    Geom.NT_uint8: np.uint8,
+    Geom.NT_uint16: np.uint16,
+    Geom.NT_uint32: np.uint32,
+    Geom.NT_int8: np.int8,
+    Geom.NT_int16: np.int16,
+    Geom.NT_int32: np.int32,
+}
+
+
+def vertex_dtype(vformat, array_index=0):
+    """
+    A vertex formátum egy tömbjének (interleaved) sorait leíró NumPy
+    structured dtype; az oszlopnevek a Panda3D oszlopnevek ('vertex', 'color', ...).
+    """
+    array_format = vformat.getArray(array_index)
+    names, formats, offsets = [], [], []
+    for i in range(array_format.getNumColumns()):
+        column = array_format.getColumn(i)
+        names.append(column.getName().getName())
+        dtype = NUMERIC_DTYPES[column.getNumericType()]
+        num_components = column.getNumComponents()
+        # Egykomponensű oszlop (pl. index) skalár mező, nem (1,) alakú
+        formats.append(dtype if num_components == 1 else (dtype, num_components))
+        offsets.append(column.getStart())
+    return np.dtype({'names': names, 'formats': formats, 'offsets': offsets,
+                     'itemsize': array_format.getStride()})
+
+
+def pack_vertex_rows(vformat, columns):
+    """
+    Oszloponkénti tömbökből (pl. {'vertex': (N, 3), 'color': (N, 4), ...})
+    összefésült vertex sorokat készít, pontosan a GPU buffer elrendezésében.
+    """
+    num_rows = len(next(iter(columns.values())))
+    rows = np.zeros(num_rows, dtype=vertex_dtype(vformat))
+    for name, data in columns.items():
+        rows[name] = data
+    return rows
+
+
+def vertex_data_from_rows(name, vformat, rows, usage=Geom.UHStatic):
+    """
+    GeomVertexData készítése előre csomagolt sorokból (NumPy tömb vagy bytes)
+    egyetlen bulk másolással.
+    """
+    vdata = GeomVertexData(name, vformat, usage)
+    vdata.modifyArray(0).modifyHandle().copyDataFrom(rows)
+    return vdata
+
+
+def triangles_from_indices(indices, usage=Geom.UHStatic):
+    """GeomTriangles 32 bites indexekkel, egyetlen bulk másolással (NumPy vagy bytes)."""
+    tris = GeomTriangles(usage)
+    tris.setIndexType(Geom.NT_uint32)
+    if isinstance(indices, np.ndarray):
+        indices = np.ascontiguousarray(indices, dtype=np.uint32)
+    tris.modifyVertices().modifyHandle().copyDataFrom(indices)
+    return tris
+
+
+def make_geom_node(name, vdata, tris):
+    """Egyetlen Geom-ot tartalmazó GeomNode (egy draw call)."""
+    geom = Geom(vdata)
+    geom.addPrimitive(tris)
+    node = GeomNode(name)
+    node.addGeom(geom)
+    return node
+
+
+def geom_node_from_packed(name, vformat, rows, indices, usage=Geom.UHStatic):
+    """GeomNode előre csomagolt (pl. worker processzből érkező) vertex és index bytes-ból."""
+    vdata = vertex_data_from_rows(name, vformat, rows, usage)
+    return make_geom_node(name, vdata, triangles_from_indices(indices, usage))
+
+
+QUAD_TRIANGLES = np.array([0, 1, 2, 0, 2, 3], dtype=np.uint32)
+FLIPPED_QUAD_TRIANGLES = np.array([1, 2, 3, 1, 3, 0], dtype=np.uint32)
+
+
+def quad_indices(num_quads, first_vertex=0, flipped=None):
+    """
+    Quadonként két háromszög (0, 1, 2) és (0, 2, 3) indexei, vektorizálva.
+    flipped: (num_quads,) bool tömb; ahol True, a quad a másik átlója mentén
+    (1, 2, 3) és (1, 3, 0) háromszögekre bomlik (a körüljárási irány nem változik).
+    """
+    base = first_vertex + np.arange(num_quads, dtype=np.uint32)[:, None] * 4
+    if flipped is None:
+        return (base + QUAD_TRIANGLES).ravel()
+    pattern = np.where(np.asarray(flipped, dtype=bool)[:, None], FLIPPED_QUAD_TRIANGLES, QUAD_TRIANGLES)
+    return (base + pattern).ravel()
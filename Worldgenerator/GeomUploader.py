@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+# Frame-enkénti időkeretben dolgozó geometria feltöltő (a voxel és a hatszög világ közös része).
+# Ha sok chunk egyszerre készül el, és mindegyik GeomNode-ja ugyanabban a
+# frame-ben kerül a jelenetgráfba, az első kirajzolás (vertex / index buffer
+# feltöltés a GPU-ra) hosszú akadást okoz. A kész NodePath-ok ezért egy sorba
+# kerülnek, és frame-enként csak budget_bytes vertex / index adatnyit készítünk
+# elő (prepareScene) és csatolunk, a kamerához legközelebbivel kezdve.
+# A prepareScene csak sorba állítja a feltöltést (a másolás a következő
+# kirajzoláskor történik), ezért a keretet a feltöltendő byte-okban mérjük;
+# a budget_ms csak a node-ok előkészítésének CPU idejét korlátozza.
+
+from collections import deque, namedtuple
+import math
+import time
+
+# A sor egy eleme: a még le nem csatolt NodePath, a prioritáshoz használt
+# világpozíció és a régi NodePath, amelyet a csatoláskor lecserél (vagy None)
+PendingGeom = namedtuple("PendingGeom", ["node_path", "position", "replaces"], defaults=(None,))
+
+# Egy frame statisztikája: feltöltött node-ok száma, vertex / index byte-jaik,
+# az eltelt idő és a maradék sor hossza
+FrameUploadStats = namedtuple("FrameUploadStats", ["uploaded", "upload_bytes", "upload_ms", "queue_depth"])
+
+
+def geom_bytes(node_path):
+    """A NodePath alatti (és a saját) Geom-ok vertex és index buffereinek mérete byte-ban."""
+    nodes = [node_path] if node_path.node().isGeomNode() else []
+    nodes.extend(node_path.findAllMatches("**/+GeomNode"))
+    total = 0
+    for geom_path in nodes:
+        for geom in geom_path.node().getGeoms():
+            vertex_data = geom.getVertexData()
+            total += sum(vertex_data.getArray(i).getDataSizeBytes()
+                         for i in range(vertex_data.getNumArrays()))
+            for i in range(geom.getNumPrimitives()):
+                indices = geom.getPrimitive(i).getVertices()
+                if indices is not None:
+                    total += indices.getDataSizeBytes()
+    return total
+
+
+class GeomUploadScheduler:
+    """
+    parent: a NodePath, amely alá a feltöltött node-ok kerülnek (pl. world_root).
+    gsg: a GraphicsStateGuardian (base.win.getGsg()); None esetén nincs
+         előkészítés, a node-ok csak csatolódnak (pl. ablak nélküli futásnál).
+    budget_bytes: frame-enként legfeljebb ennyi vertex / index adatot töltünk fel;
+                  legalább egy node mindig felkerül, így a sor nagy node-oknál sem akad el.
+    budget_ms: frame-enként legfeljebb ennyi CPU időt töltünk az előkészítéssel.
+    resort_distance: a sort csak akkor rendezzük újra, ha a kamera ennél
+                     többet mozdult (vagy új elem érkezett).
+    history: ennyi frame statisztikáját tartjuk meg.
+    log_interval: amíg a sor nem üres, ennyi másodpercenként kiírjuk az
+                  utolsó frame és az azóta eltelt frame-ek statisztikáját.
+    """
+
+    def __init__(self, parent, gsg=None, budget_ms=2.0, budget_bytes=1 << 20, resort_distance=4.0,
+                 history=120, log_interval=1.0):
+        self.parent = parent
+        self.gsg = gsg
+        self.budget_ms = budget_ms
+        self.budget_bytes = budget_bytes
+        self.resort_distance = resort_distance
+        self.pending = {}  # kulcs -> PendingGeom
+        self.order = []    # kulcsok távolság szerint csökkenő sorrendben (a végéről veszünk)
+        self.sorted_from = None
+        self.frames = deque(maxlen=history)
+        self.total_uploaded = 0
+        self.total_upload_bytes = 0
+        self.total_upload_ms = 0.0
+        self.log_interval = log_interval
+        self.last_log = None
+        self.frames_since_log = []
+
+    def enqueue(self, key, node_path, position, replaces=None):
+        """
+        Egy le nem csatolt NodePath sorba állítása. Ugyanazzal a kulccsal érkező
+        újabb node a régit váltja (az még nem került fel, ezért eldobjuk). Ha a
+        node-ot a feltöltés előtt eltávolítják (removeNode), a sor csendben kihagyja.
+        replaces: a már kirajzolt régi NodePath, amely csak az új node csatolásakor
+        tűnik el (így a csere közben nem marad lyuk a jelenetben).
+        """
+        previous = self.pending.get(key)
+        if previous is None:
+            self.order.append(key)
+        else:
+            replaces = previous.replaces
+            if previous.node_path is not node_path:
+                previous.node_path.removeNode()
+        self.pending[key] = PendingGeom(node_path, tuple(position), replaces)
+        self.sorted_from = None
+
+    def cancel(self, key):
+        """
+        A kulcshoz tartozó, még fel nem töltött node eldobása a sorból.
+        Visszatérés: az eldobott PendingGeom (vagy None).
+        """
+        return self.pending.pop(key, None)
+
+    def clear(self):
+        self.pending.clear()
+        self.order = []
+
+    def busy(self):
+        return bool(self.pending)
+
+    def sort_queue(self, camera_pos):
+        """A sor rendezése a kamera távolság szerint (a legközelebbi a lista végére)."""
+        def distance(key):
+            return math.dist(self.pending[key].position, camera_pos)
+        self.order = sorted((key for key in self.order if key in self.pending),
+                            key=distance, reverse=True)
+        self.sorted_from = tuple(camera_pos)
+
+    def update(self, camera_pos):
+        """
+        Frame-enként hívandó: a legközelebbi node-ok előkészítése és csatolása,
+        amíg a budget_bytes vagy a budget_ms el nem fogy. Visszatérés: a frame
+        FrameUploadStats-a.
+        """
+        camera_pos = tuple(camera_pos)
+        if self.pending and (self.sorted_from is None or
+                             math.dist(camera_pos, self.sorted_from) > self.resort_distance):
+            self.sort_queue(camera_pos)
+
+        start = time.perf_counter()
+        uploaded = 0
+        upload_bytes = 0
+        while self.order:
+            key = self.order[-1]
+            item = self.pending.get(key)
+            if item is None or item.node_path.isEmpty():
+                self.order.pop()
+                self.pending.pop(key, None)
+                continue  # Időközben visszavont vagy eltávolított node
+            size = geom_bytes(item.node_path)
+            if uploaded and upload_bytes + size > self.budget_bytes:
+                break
+            self.order.pop()
+            del self.pending[key]
+            if self.gsg is not None:
+                # A vertex / index bufferek és a shaderek előkészítése a GPU-n,
+                # így nem az első kirajzolás frame-jében történik
+                item.node_path.prepareScene(self.gsg)
+            item.node_path.reparentTo(self.parent)
+            if item.replaces is not None:
+                item.replaces.removeNode()
+            uploaded += 1
+            upload_bytes += size
+            if (time.perf_counter() - start) * 1000.0 >= self.budget_ms:
+                break
+        upload_ms = (time.perf_counter() - start) * 1000.0
+
+        frame = FrameUploadStats(uploaded, upload_bytes, upload_ms, len(self.pending))
+        self.frames.append(frame)
+        self.frames_since_log.append(frame)
+        self.total_uploaded += uploaded
+        self.total_upload_bytes += upload_bytes
+        self.total_upload_ms += upload_ms
+        return frame
+
+    def log_progress(self, force=False):
+        """
+        Amíg van feltöltendő node (vagy force=True), log_interval másodpercenként
+        kiírja az utolsó frame sor hosszát, feltöltött byte-jait és idejét, és az
+        előző kiírás óta eltelt frame-ek összegét / csúcsát.
+        """
+        now = time.perf_counter()
+        if self.last_log is not None and now - self.last_log < self.log_interval and not force:
+            return
+        frames, self.frames_since_log = self.frames_since_log, []
+        self.last_log = now
+        if not frames:
+            return
+        last = frames[-1]
+        print(f"Geometria feltöltés: sor {last.queue_depth} node, utolsó frame "
+              f"{last.uploaded} node / {last.upload_bytes / 1024.0:.1f} KB / {last.upload_ms:.2f} ms; "
+              f"{len(frames)} frame alatt {sum(frame.uploaded for frame in frames)} node, "
+              f"{sum(frame.upload_bytes for frame in frames) / 1024.0:.1f} KB, "
+              f"csúcs {max(frame.upload_ms for frame in frames):.2f} ms / frame.")
+
+    def stats(self):
+        """Feltöltési statisztika: aktuális sor hossz, az utolsó frame és a megtartott frame-ek csúcsa."""
+        last = self.frames[-1] if self.frames else FrameUploadStats(0, 0, 0.0, len(self.pending))
+        active = [frame for frame in self.frames if frame.uploaded]
+        return {
+            'queue_depth': len(self.pending),
+            'last_uploaded': last.uploaded,
+            'last_upload_bytes': last.upload_bytes,
+            'last_upload_ms': last.upload_ms,
+            'peak_upload_ms': max((frame.upload_ms for frame in active), default=0.0),
+            'mean_upload_ms': sum(frame.upload_ms for frame in active) / len(active) if active else 0.0,
+            'total_uploaded': self.total_uploaded,
+            'total_upload_bytes': self.total_upload_bytes,
+            'total_upload_ms': self.total_upload_ms,
+        }
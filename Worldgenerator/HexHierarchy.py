@@ -0,0 +1,540 @@
+# -*- coding: utf-8 -*-
+# Hierarchikus, több felbontású hatszög index (az H3 aperture-7 felosztásának
+# mintájára) a hatszög világhoz.
+# Egy szülő cella 7 gyereke: a középső gyerek és annak 6 szomszédja (rozetta).
+# A rozetták hézag nélkül lefedik a síkot; a középső gyerekek a gyerek rács
+# (2, 1) és (-1, 3) axial bázisvektorai által kifeszített alrácson vannak
+# (determináns 7). A szülő cellák koordinátái ezen az alrácson újra egy axial
+# rácsot alkotnak (sqrt(7)-szeres léptékkel, kb. 19.1 fokkal elforgatva), így a
+# felosztás szintenként ismételhető, és a szomszédság minden szinten
+# HEX_NEIGHBORS.
+#
+# Szintenként a cellák az alattuk lévő levelek (oszlopok) magasságának
+# min / max / átlag összesítését tárolják, így:
+#   - a távoli területek a szülő szinten renderelhetők (cellánként egy durva
+#     hasáb), és csak a kamera közelében finomodnak levélig (select()),
+#   - lekérdezések (pl. "van-e ebben a körzetben X-nél magasabb oszlop")
+#     durva szinten is megválaszolhatók (summary(), ancestor()).
+# A durva cella levélhalmaza nem hatszög (mint az H3-nál, "Gosper sziget"), ezért
+# a kirajzolt cella a levelek pontos körvonalából készül (cell_outline): a
+# körvonal minden szakaszát csak addig egyszerűsítjük, ameddig a túloldalán
+# kirajzolt cella szintje engedi, így két szomszéd cella - akármelyik szinten
+# vannak - pontosan ugyanazt a határt kapja, a szintváltásoknál sem marad rés
+# vagy átfedés.
+
+from collections import namedtuple
+from functools import lru_cache
+import math
+
+from panda3d.core import Triangulator
+import numpy as np
+
+from HexVoxelWorld import (
+    HEX_NEIGHBORS, HEX_CORNER_OFFSETS, HEX_AXIAL_TO_WORLD, HEX_NORMAL_ARRAY, HEX_HEIGHT_STEP,
+    HEX_QUAD_TRIANGLES, hex_centers, hex_level_color, hex_geom_node, level_color_tables,
+    wall_segments, wall_band_colors, wall_quads, shaded, face_indices
+)
+
+APERTURE = 7
+# A középső gyerek (gyerek rács axial) koordinátája: q = 2 * pq - pr, r = pq + 3 * pr
+PARENT_BASIS = np.array([(2, -1), (1, 3)], dtype=np.int64)
+# Szintenkénti elforgatás (a (2, 1) gyerek eltolás világbeli szöge) és lépték
+LEVEL_ROTATION = math.atan2(1.5, 2.5 * math.sqrt(3))
+LEVEL_SCALE = math.sqrt(APERTURE)
+# A gyerekek eltolása a középső gyerektől: önmaga, majd a 6 szomszéd
+CHILD_OFFSETS = np.vstack([np.zeros((1, 2), dtype=np.int64), HEX_NEIGHBORS])
+
+MAX_LEVELS = 8  # Legfeljebb ennyi szülő szint a levelek fölött
+
+# A hatszög i. sarkának eltolása a középponttól axial harmadokban: a sarkok
+# így egész (3q, 3r) rácson vannak, és kulcsként összehasonlíthatók
+CORNER_THIRDS = np.rint(3 * HEX_CORNER_OFFSETS @ np.linalg.inv(HEX_AXIAL_TO_WORLD)).astype(np.int64)
+
+# A szomszéd cella állapota (a szint helyett) a make_level_mesh() számára:
+# finomabb szinten kirajzolt szomszéd (élenként dől el), illetve nincs kirajzolva
+# (a térképen kívül)
+REFINED = -1
+VOID = -2
+
+# Egy szint cellájának körvonala (cell_outline), élenként: a levél és oldala,
+# a kezdő sarok eltolása, a túloldali szomszéd iránya és a kezdő sarok rangja
+CellOutline = namedtuple("CellOutline", ["leaf_q", "leaf_r", "side", "points", "directions", "ranks"])
+
+
+# --- KOORDINÁTÁK ---
+
+def pack_keys(q, r):
+    """(q, r) -> int64 kulcs (rendezhető, a keresőtáblákhoz)."""
+    return (np.asarray(q, dtype=np.int64) << 32) + (np.asarray(r, dtype=np.int64) + (1 << 31))
+
+
+def unpack_keys(keys):
+    """pack_keys() inverze."""
+    return keys >> 32, (keys & 0xFFFFFFFF) - (1 << 31)
+
+
+def parent_cells(q, r):
+    """
+    A cellák szülője egy szinttel feljebb (NumPy tömbökön). Az alrács
+    koordinátákra visszaszámolt tört (pq, pr) kerekítése mindig a 7 gyerekes
+    rozetta középpontját adja.
+    """
+    q, r = np.asarray(q, dtype=np.int64), np.asarray(r, dtype=np.int64)
+    pq = np.rint((3 * q + r) / APERTURE).astype(np.int64)
+    pr = np.rint((2 * r - q) / APERTURE).astype(np.int64)
+    return pq, pr
+
+
+def center_child(q, r):
+    """A szülő cella középső gyerekének koordinátája egy szinttel lejjebb."""
+    q, r = np.asarray(q, dtype=np.int64), np.asarray(r, dtype=np.int64)
+    return (PARENT_BASIS[0, 0] * q + PARENT_BASIS[0, 1] * r,
+            PARENT_BASIS[1, 0] * q + PARENT_BASIS[1, 1] * r)
+
+
+def child_cells(q, r):
+    """(N, 7) q és r tömbök: a cellák 7 gyereke egy szinttel lejjebb."""
+    cq, cr = center_child(np.atleast_1d(q), np.atleast_1d(r))
+    return cq[:, None] + CHILD_OFFSETS[None, :, 0], cr[:, None] + CHILD_OFFSETS[None, :, 1]
+
+
+def center_leaf(level, q, r):
+    """A level szintű cella középső levelének (oszlopának) axial koordinátája."""
+    for _ in range(level):
+        q, r = center_child(q, r)
+    return q, r
+
+
+def cell_centers(level, q, r):
+    """(N, 2) világ (x, y) középpontok: a középső levél hatszögének közepe."""
+    return hex_centers(*center_leaf(level, q, r))
+
+
+def ancestor_cells(levels_up, q, r):
+    """A cellák levels_up szinttel feljebb lévő őse."""
+    for _ in range(levels_up):
+        q, r = parent_cells(q, r)
+    return q, r
+
+
+def cell_radius(level):
+    """A level szintű cellával azonos területű szabályos hatszög sugara (a kiválasztáshoz)."""
+    return float(np.linalg.norm(HEX_CORNER_OFFSETS[0])) * LEVEL_SCALE ** level
+
+
+@lru_cache(maxsize=MAX_LEVELS + 1)
+def cell_outline(level):
+    """
+    A level szintű (0, 0) cella pontos körvonala (CellOutline): a levelei közül
+    a más cellával határos oldalak, körbejárási (CCW) sorrendben. Élenként a
+    levél (leaf_q, leaf_r) és oldala (side), a kezdő sarok világ eltolása a
+    középső levél közepéhez képest (points), a túloldali szomszéd cella iránya
+    (directions, HEX_NEIGHBORS index) és a kezdő sarok rangja (ranks): a
+    legnagyobb k <= level, amelyen a sarok három levele három különböző k szintű
+    cellába esik. A szintenkénti felosztás eltolás-invariáns, így a (q, r) cella
+    körvonala ennek center_leaf(level, q, r)-rel eltolt példánya.
+    """
+    if level == 0:
+        leaf_q = leaf_r = np.zeros(6, dtype=np.int64)
+        side = np.arange(6)
+    else:
+        # A 7 gyerek körvonal éleiből azok maradnak, amelyek túloldala más cellába esik
+        child = cell_outline(level - 1)
+        shift_q, shift_r = center_leaf(level - 1, CHILD_OFFSETS[:, 0], CHILD_OFFSETS[:, 1])
+        leaf_q = (child.leaf_q[None] + shift_q[:, None]).reshape(-1)
+        leaf_r = (child.leaf_r[None] + shift_r[:, None]).reshape(-1)
+        side = np.tile(child.side, APERTURE)
+        across_q, across_r = ancestor_cells(level, leaf_q + HEX_NEIGHBORS[side, 0],
+                                            leaf_r + HEX_NEIGHBORS[side, 1])
+        boundary = (across_q != 0) | (across_r != 0)
+        leaf_q, leaf_r, side = leaf_q[boundary], leaf_r[boundary], side[boundary]
+
+    # Körbejárási sorrend: minden él a kezdő sarkából a következő sarokba mutat
+    next_side = (side + 1) % 6
+    starts = pack_keys(3 * leaf_q + CORNER_THIRDS[side, 0], 3 * leaf_r + CORNER_THIRDS[side, 1])
+    ends = pack_keys(3 * leaf_q + CORNER_THIRDS[next_side, 0], 3 * leaf_r + CORNER_THIRDS[next_side, 1])
+    order = np.argsort(starts)
+    successor = order[np.searchsorted(starts[order], ends)]
+    chain = np.zeros(len(side), dtype=np.int64)
+    for k in range(1, len(side)):
+        chain[k] = successor[chain[k - 1]]
+    assert successor[chain[-1]] == 0 and len(np.unique(chain)) == len(chain), \
+        "A cella körvonalának egyetlen zárt láncnak kell lennie"
+    leaf_q, leaf_r, side = leaf_q[chain], leaf_r[chain], side[chain]
+
+    across_q, across_r = ancestor_cells(level, leaf_q + HEX_NEIGHBORS[side, 0],
+                                        leaf_r + HEX_NEIGHBORS[side, 1])
+    directions = np.argmax((HEX_NEIGHBORS[None, :, 0] == across_q[:, None]) &
+                           (HEX_NEIGHBORS[None, :, 1] == across_r[:, None]), axis=1)
+
+    # A kezdő sarok három levele: a saját, és az előző / ezen oldal túloldalán lévő
+    previous_side = (side - 1) % 6
+    corner_q = np.stack([leaf_q, leaf_q + HEX_NEIGHBORS[previous_side, 0], leaf_q + HEX_NEIGHBORS[side, 0]])
+    corner_r = np.stack([leaf_r, leaf_r + HEX_NEIGHBORS[previous_side, 1], leaf_r + HEX_NEIGHBORS[side, 1]])
+    ranks = np.zeros(len(side), dtype=np.int64)
+    for k in range(1, level + 1):
+        corner_q, corner_r = parent_cells(corner_q, corner_r)
+        keys = pack_keys(corner_q, corner_r)
+        distinct = (keys[0] != keys[1]) & (keys[1] != keys[2]) & (keys[0] != keys[2])
+        ranks = np.where(distinct, k, ranks)
+
+    points = hex_centers(leaf_q, leaf_r) + HEX_CORNER_OFFSETS[side]
+    outline = CellOutline(leaf_q, leaf_r, side, points, directions, ranks)
+    for array in outline:
+        array.flags.writeable = False
+    return outline
+
+
+# --- SZINTEK ---
+
+class HexLevel:
+    """
+    Egy szint cellái kulcs szerint rendezve: q, r koordináták és a levelek
+    magasságának min / max / összeg / darabszám összesítése (a levél szinten
+    egy-egy oszlop).
+    """
+
+    def __init__(self, keys, mins, maxs, sums, counts):
+        self.keys = keys
+        self.q, self.r = unpack_keys(keys)
+        self.min = mins
+        self.max = maxs
+        self.sum = sums
+        self.count = counts
+        # A kirajzolt cella magassága: a levelek átlaga egész szintre kerekítve
+        self.height = np.rint(sums / np.maximum(counts, 1)).astype(np.int32)
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def mean(self):
+        return self.sum / self.count
+
+    def lookup(self, q, r):
+        """A (q, r) cellák sor indexe (NumPy tömb), hiányzó cellánál -1."""
+        keys = pack_keys(q, r)
+        rows = np.minimum(np.searchsorted(self.keys, keys), max(len(self.keys) - 1, 0))
+        found = (len(self.keys) > 0) & (self.keys[rows] == keys)
+        return np.where(found, rows, -1)
+
+    def parent_level(self):
+        """Az eggyel durvább szint összesítése ebből a szintből."""
+        pq, pr = parent_cells(self.q, self.r)
+        keys, inverse = np.unique(pack_keys(pq, pr), return_inverse=True)
+        mins = np.full(len(keys), np.iinfo(np.int32).max, dtype=np.int32)
+        maxs = np.full(len(keys), np.iinfo(np.int32).min, dtype=np.int32)
+        np.minimum.at(mins, inverse, self.min)
+        np.maximum.at(maxs, inverse, self.max)
+        sums = np.bincount(inverse, weights=self.sum, minlength=len(keys))
+        counts = np.bincount(inverse, weights=self.count, minlength=len(keys)).astype(np.int64)
+        return HexLevel(keys, mins, maxs, sums, counts)
+
+
+class HexHierarchy:
+    """
+    A HexGrid oszlopai (0. szint) és fölöttük legfeljebb MAX_LEVELS aperture-7
+    szülő szint. A szintek építése vektorizált (np.unique + ufunc.at), és a
+    durva szintek mérete szintenként kb. 1/7-re csökken, így egy kontinens
+    méretű térkép összesítése is kis memóriában elfér.
+    """
+
+    def __init__(self, grid, max_levels=MAX_LEVELS):
+        self.grid = grid
+        keys, heights = [], []
+        for chunk in grid.chunks.values():
+            q0, r0 = chunk.origin()
+            qi, ri = np.nonzero(grid.map_mask(chunk.coord))
+            keys.append(pack_keys(q0 + qi, r0 + ri))
+            heights.append(chunk.heights[qi, ri])
+        keys = np.concatenate(keys) if keys else np.zeros(0, dtype=np.int64)
+        heights = np.concatenate(heights) if heights else np.zeros(0, dtype=np.int32)
+        order = np.argsort(keys)
+        heights = heights[order].astype(np.int32)
+        self.levels = [HexLevel(keys[order], heights, heights, heights.astype(np.float64),
+                                np.ones(len(keys), dtype=np.int64))]
+        # Addig építünk szinteket, amíg a legfelső szint már csak egy rozettányi
+        while len(self.levels) <= max_levels and len(self.levels[-1]) > APERTURE:
+            self.levels.append(self.levels[-1].parent_level())
+
+    @property
+    def top_level(self):
+        return len(self.levels) - 1
+
+    # --- Lekérdezések durva szinten ---
+
+    def ancestor(self, q, r, level):
+        """A (q, r) oszlop(ok) level szintű ősének koordinátája."""
+        return ancestor_cells(level, q, r)
+
+    def summary(self, level, q, r):
+        """
+        (min, max, átlag) magasság tömbök a level szintű (q, r) cellákra
+        (hiányzó cellánál min = max = 0, átlag = 0).
+        """
+        hex_level = self.levels[level]
+        rows = hex_level.lookup(q, r)
+        found = rows >= 0
+        rows = np.where(found, rows, 0)
+        return (np.where(found, hex_level.min[rows], 0), np.where(found, hex_level.max[rows], 0),
+                np.where(found, hex_level.mean[rows], 0.0))
+
+    # --- Részletességi szint kiválasztás ---
+
+    def select(self, camera_xy, lod_factor=12.0):
+        """
+        A kirajzolandó cellák szintenként (szint -> sor index tömb), fentről lefelé:
+        egy cella akkor bomlik 7 gyerekre, ha a kamera (x, y) távolsága a
+        középpontjától kisebb, mint lod_factor * a cella sugara. A kiválasztott
+        cellák levélhalmazai pontosan egyszer fedik le a térképet.
+        """
+        camera_xy = np.asarray(camera_xy, dtype=np.float64)[:2]
+        selection = {}
+        rows = np.arange(len(self.levels[-1]))
+        for level in range(self.top_level, 0, -1):
+            hex_level = self.levels[level]
+            centers = cell_centers(level, hex_level.q[rows], hex_level.r[rows])
+            distance = np.linalg.norm(centers - camera_xy, axis=1)
+            refine = distance < lod_factor * cell_radius(level)
+            selection[level] = rows[~refine]
+            child_q, child_r = child_cells(hex_level.q[rows[refine]], hex_level.r[rows[refine]])
+            children = self.levels[level - 1].lookup(child_q.reshape(-1), child_r.reshape(-1))
+            rows = children[children >= 0]
+        selection[0] = rows
+        return selection
+
+    def stale_levels(self, previous, selection):
+        """
+        A select() két egymás utáni eredménye között újraépítendő szintek
+        (növekvő sorrendben): ahol a kiválasztott cellák változtak, és ahol egy
+        kiválasztott cella szomszédja (a határa túloldalán kirajzolt cella) változott,
+        mert a körvonal egyszerűsítése és a falak a szomszédtól függenek.
+        previous=None: minden szint.
+        """
+        if previous is None:
+            return sorted(selection)
+        empty = np.zeros(0, dtype=np.int64)
+        changed = {level: np.setxor1d(previous.get(level, empty), selection.get(level, empty))
+                   for level in range(self.top_level + 1)}
+        changed = {level: rows for level, rows in changed.items() if len(rows)}
+        stale = set(changed)
+        for level, rows in selection.items():
+            if level in stale or len(rows) == 0:
+                continue
+            q, r = self.levels[level].q[rows], self.levels[level].r[rows]
+            for changed_level, changed_rows in changed.items():
+                changed_q = self.levels[changed_level].q[changed_rows]
+                changed_r = self.levels[changed_level].r[changed_rows]
+                # A két cella akkor határos, ha a durvább szinten az egyik őse a
+                # másik 1-gyűrűjében van
+                if changed_level <= level:
+                    ring_q, ring_r, other_q, other_r = q, r, *ancestor_cells(
+                        level - changed_level, changed_q, changed_r)
+                else:
+                    other_q, other_r = ancestor_cells(changed_level - level, q, r)
+                    ring_q, ring_r = changed_q, changed_r
+                ring = pack_keys(ring_q[:, None] + CHILD_OFFSETS[None, :, 0],
+                                 ring_r[:, None] + CHILD_OFFSETS[None, :, 1])
+                if np.isin(pack_keys(other_q, other_r), ring).any():
+                    stale.add(level)
+                    break
+        return sorted(stale)
+
+    # --- Szint mesh ---
+
+    def drawn_masks(self, selection):
+        """Szintenként bool tömb: a cella ki van-e választva (select())."""
+        masks = [np.zeros(len(hex_level), dtype=bool) for hex_level in self.levels]
+        for level, rows in selection.items():
+            masks[level][rows] = True
+        return masks
+
+    def neighbor_sides(self, level, q, r, drawn):
+        """
+        A level szintű (q, r) cellák 6 szomszédja helyén kirajzolt cella szintje és
+        magassága ((N, 6) tömbök): a szomszéd maga, vagy a kirajzolt őse. Ha egyik
+        sincs kirajzolva, a szomszéd finomabb szinten látszik (REFINED, élenként
+        drawn_below() dönti el), a térképen kívül pedig VOID (magasság 0).
+        """
+        hex_level = self.levels[level]
+        neighbor_q = q[:, None] + HEX_NEIGHBORS[None, :, 0]
+        neighbor_r = r[:, None] + HEX_NEIGHBORS[None, :, 1]
+        rows = hex_level.lookup(neighbor_q, neighbor_r)
+        exists = rows >= 0
+        found = exists & drawn[level][np.maximum(rows, 0)]
+        side_level = np.where(found, level, VOID)
+        side_height = np.where(found, hex_level.height[np.maximum(rows, 0)], 0)
+        ancestor_q, ancestor_r = neighbor_q, neighbor_r
+        for upper in range(level + 1, self.top_level + 1):
+            ancestor_q, ancestor_r = parent_cells(ancestor_q, ancestor_r)
+            rows = self.levels[upper].lookup(ancestor_q, ancestor_r)
+            found = (side_level == VOID) & (rows >= 0) & drawn[upper][np.maximum(rows, 0)]
+            side_level = np.where(found, upper, side_level)
+            side_height = np.where(found, self.levels[upper].height[np.maximum(rows, 0)], side_height)
+        side_level = np.where((side_level == VOID) & exists, REFINED, side_level)
+        return side_level, side_height
+
+    def drawn_below(self, level, leaf_q, leaf_r, drawn):
+        """
+        A (leaf_q, leaf_r) levelek level-nél finomabb szinten kirajzolt ősének
+        szintje és magassága (ha nincs ilyen: VOID, magasság 0).
+        """
+        found_level = np.full(len(leaf_q), VOID)
+        found_height = np.zeros(len(leaf_q), dtype=np.int32)
+        q, r = leaf_q, leaf_r
+        for lower in range(level):
+            if lower:
+                q, r = parent_cells(q, r)
+            rows = self.levels[lower].lookup(q, r)
+            found = (found_level == VOID) & (rows >= 0) & drawn[lower][np.maximum(rows, 0)]
+            found_level = np.where(found, lower, found_level)
+            found_height = np.where(found, self.levels[lower].height[np.maximum(rows, 0)], found_height)
+        return found_level, found_height
+
+    def level_polygons(self, level, q, r, drawn):
+        """
+        A level szintű (q, r) cellák egyszerűsített körvonala: a körvonal egy
+        sarka akkor marad meg, ha a rangja eléri a cella és a két szomszédos élen
+        túl kirajzolt cella szintjének minimumát; a túloldal két cellája így
+        ugyanazt a határt kapja. Visszatérés: (cella index, pont (a cella
+        középső levelének közepéhez képest), a következő megtartott sarok indexe,
+        az innen induló húr túloldalának magassága), a cellák sorban, mindegyik
+        CCW körbejárással.
+        """
+        side_level, side_height = self.neighbor_sides(level, q, r, drawn)
+        # Ahol minden túloldali cella legalább ilyen durva, elég a rang >= szint
+        # sarkok vizsgálata; finomabb szomszéd mellett az összes levél él. A térképen
+        # kívül (VOID) nincs kivel egyeznie a határnak, ott a cella saját szintje számít.
+        detail = np.where(side_level == REFINED, 0, np.where(side_level == VOID, level, side_level))
+        detail = np.minimum(detail.min(axis=1), level)
+        outline = cell_outline(level)
+        cells, points, heights, nexts = [], [], [], []
+        num_points = 0
+        for group in np.unique(detail):
+            members = np.nonzero(detail == group)[0]
+            candidates = np.nonzero(outline.ranks >= group)[0]
+            # A jelölt sarkok közötti húr túloldalán egyetlen szomszéd cella van
+            edge_level = side_level[members][:, outline.directions[candidates]]
+            edge_height = side_height[members][:, outline.directions[candidates]]
+            refined = edge_level == REFINED
+            if refined.any():
+                cell, edge = np.nonzero(refined)
+                leaf_q, leaf_r = center_leaf(level, q[members[cell]], r[members[cell]])
+                sides = outline.side[candidates[edge]]
+                leaf_q = leaf_q + outline.leaf_q[candidates[edge]] + HEX_NEIGHBORS[sides, 0]
+                leaf_r = leaf_r + outline.leaf_r[candidates[edge]] + HEX_NEIGHBORS[sides, 1]
+                edge_level[cell, edge], edge_height[cell, edge] = self.drawn_below(
+                    level, leaf_q, leaf_r, drawn)
+            edge_level = np.where(edge_level == VOID, level, edge_level)
+            keep = outline.ranks[candidates][None] >= np.minimum(
+                level, np.minimum(edge_level, np.roll(edge_level, 1, axis=1)))
+            cell, corner = np.nonzero(keep)
+            counts = keep.sum(axis=1)
+            first = np.concatenate([[0], np.cumsum(counts)[:-1]])
+            local = np.arange(len(cell)) - first[cell]
+            cells.append(members[cell])
+            points.append(outline.points[candidates[corner]])
+            heights.append(edge_height[cell, corner])
+            nexts.append(num_points + first[cell] + (local + 1) % counts[cell])
+            num_points += len(cell)
+        cells, points = np.concatenate(cells), np.concatenate(points)
+        heights, nexts = np.concatenate(heights), np.concatenate(nexts)
+        # A cellák sorrendjének visszaállítása (a csoportosítás előtti sorrend)
+        order = np.argsort(cells, kind='stable')
+        inverse = np.empty_like(order)
+        inverse[order] = np.arange(len(order))
+        return cells[order], points[order], inverse[nexts[order]], heights[order]
+
+    def make_level_mesh(self, level, selection, origin, level_color=hex_level_color, packed=False):
+        """
+        Egy szint kiválasztott celláinak (selection[level]) hasáb mesh-e a cellák
+        pontos (level_polygons()) körvonalával és átlag magasságával. A fal csak
+        a túloldali kirajzolt cella fölé kilátszó részen készül (make_hex_columns
+        mintájára), a normálja a húr valódi kifelé mutató normálja (a tömörített
+        formátumban a legközelebbi HEX_NORMALS oldal). A vertexek origin (x, y)-hoz
+        képest relatívak; a node ide kerül.
+        """
+        rows = selection.get(level, ())
+        if len(rows) == 0:
+            return None
+        hex_level = self.levels[level]
+        drawn = self.drawn_masks(selection)
+        rows = rows[hex_level.height[rows] > 0]
+        if len(rows) == 0:
+            return None
+        q, r, heights = hex_level.q[rows], hex_level.r[rows], hex_level.height[rows]
+        num_cells = len(rows)
+
+        cell, points, nexts, neighbor_heights = self.level_polygons(level, q, r, drawn)
+        centers = cell_centers(level, q, r) - np.asarray(origin, dtype=np.float64)[:2]
+        points = points + centers[cell]
+        tables = level_color_tables(level_color, heights.max())
+        bottom_table, _, top_table = tables
+
+        # --- TOP / BOTTOM FACE ---
+        # Csillag alakú körvonal (a középpontból minden húr CCW) legyezővel a
+        # középpontból, a többi a Panda3D Triangulator-ával
+        relative = points - centers[cell]
+        cross = relative[:, 0] * relative[nexts, 1] - relative[:, 1] * relative[nexts, 0]
+        star = np.ones(num_cells, dtype=bool)
+        np.logical_and.at(star, cell, cross > 0)
+        star_cells = np.nonzero(star)[0]
+        center_index = np.full(num_cells, -1)
+        center_index[star_cells] = len(points) + np.arange(len(star_cells))
+        cap_xy = np.concatenate([points, centers[star_cells]])
+        cap_cell = np.concatenate([cell, star_cells])
+        fan = star[cell]
+        triangles = [np.stack([center_index[cell[fan]], np.nonzero(fan)[0], nexts[fan]], axis=1)]
+        cell_starts = np.searchsorted(cell, np.arange(num_cells + 1))
+        for index in np.nonzero(~star)[0]:
+            start, stop = cell_starts[index], cell_starts[index + 1]
+            triangulator = Triangulator()
+            for x, y in points[start:stop]:
+                triangulator.addPolygonVertex(triangulator.addVertex(x, y))
+            triangulator.triangulate()
+            polygon = np.array([(triangulator.getTriangleV0(i), triangulator.getTriangleV1(i),
+                                 triangulator.getTriangleV2(i))
+                                for i in range(triangulator.getNumTriangles())], dtype=np.int64)
+            corners = points[start:stop][polygon]
+            area = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+            polygon[area < 0] = polygon[area < 0][:, ::-1]
+            triangles.append(start + polygon)
+        top_triangles = np.concatenate(triangles)
+        num_cap_vertices = len(cap_xy)
+        cap_heights = heights[cap_cell]
+        top_vertices = np.hstack([cap_xy, (cap_heights * HEX_HEIGHT_STEP)[:, None]])
+        bottom_vertices = np.hstack([cap_xy, np.zeros((num_cap_vertices, 1))])
+        top_colors = top_table[cap_heights]
+        bottom_colors = shaded(bottom_table[cap_heights], 0.8)
+
+        # --- SIDE FACES --- (húronként, a túloldali cella fölé kilátszó rész)
+        (chord,), z0, z1 = wall_segments(heights[cell], neighbor_heights)
+        wall_vertices = wall_quads(points[chord], points[nexts[chord]], z0, z1)
+        wall_colors = shaded(np.repeat(wall_band_colors(tables, heights[cell[chord]], z0), 4, axis=0), 0.9)
+        direction = points[nexts[chord]] - points[chord]
+        wall_normals = np.zeros((len(chord), 3), dtype=np.float32)
+        wall_normals[:, :2] = np.stack([direction[:, 1], -direction[:, 0]], axis=1) / \
+            np.linalg.norm(direction, axis=1)[:, None]
+        # A side-i normál szöge 60 * i + 60 fok
+        angle = np.degrees(np.arctan2(wall_normals[:, 1], wall_normals[:, 0]))
+        wall_normal_indices = 2 + np.rint((angle - 60.0) / 60.0).astype(np.int64) % 6
+
+        vertices = np.concatenate([top_vertices, bottom_vertices, wall_vertices])
+        colors = np.concatenate([top_colors, bottom_colors, wall_colors])
+        normal_indices = np.concatenate([
+            np.zeros(num_cap_vertices, dtype=np.uint8), np.ones(num_cap_vertices, dtype=np.uint8),
+            np.repeat(wall_normal_indices, 4).astype(np.uint8)])
+        normals = np.concatenate([HEX_NORMAL_ARRAY[normal_indices[:2 * num_cap_vertices]],
+                                  np.repeat(wall_normals, 4, axis=0)])
+        indices = np.concatenate([
+            top_triangles.reshape(-1),
+            (num_cap_vertices + top_triangles[:, ::-1]).reshape(-1),
+            face_indices(len(chord), 2 * num_cap_vertices, HEX_QUAD_TRIANGLES, 4)])
+
+        # A tömörített int16 pozíció tartománya a mesh kiterjedéséhez igazodik
+        extent = np.abs(points).max(initial=0.0)
+        fixed_point = 2 ** int(min(8, math.floor(math.log2(32000.0 / max(extent, 1.0)))))
+        node_path = hex_geom_node("HexLevel_%d" % level, vertices, colors, normals, normal_indices,
+                                  indices, packed, fixed_point)
+        node_path.setPos(origin[0], origin[1], 0)
+        return node_path
@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+# Térbeli lekérdezések a hatszög világ axial (q, r) rácsán stratégiai
+# funkciókhoz: távolság, körzet és gyűrű felsorolás kocka (cube) koordinátákkal,
+# hatszög vonal a látóvonal (line of sight) vizsgálathoz az oszlop magasságok
+# ellenében, és A* útkeresés magasságkülönbség költséggel.
+# A kocka koordináta: x = q, z = r, y = -q - r (x + y + z = 0).
+# Használat a futó világon: HexQuery(app.grid), ahol app egy HexVoxelWorld.
+#
+# Hogy sok ezer egység kereshessen utat másodpercenként lekérdezésenkénti
+# Python objektum gyártás nélkül:
+#   - a körzet / gyűrű eltolások sugaranként egyszer készülnek el (lru_cache),
+#   - a látóvonal sok pár egyszerre, NumPy tömbökön fut,
+#   - az A* a cellák lapos indexén dolgozik, előre számolt szomszéd és lépés
+#     költség táblákkal, és az újrafelhasznált g-érték tömböket egy lekérdezés
+#     sorszám (stamp) érvényesíti törlés helyett; a kész utak LRU cache-ben maradnak.
+
+from collections import OrderedDict
+from functools import lru_cache
+import heapq
+
+import numpy as np
+
+from HexVoxelWorld import HEX_NEIGHBORS, HEX_CHUNK_SIZE
+
+
+# --- KOCKA KOORDINÁTÁK ---
+
+def axial_to_cube(q, r):
+    """axial (q, r) -> kocka (x, y, z); skalár vagy NumPy tömb."""
+    return q, -q - r, r
+
+
+def cube_round(x, y, z):
+    """
+    Tört kocka koordináták kerekítése a legközelebbi hatszögre (NumPy tömbökön):
+    a legnagyobb kerekítési hibájú tengelyt a másik kettőből számoljuk újra,
+    hogy x + y + z = 0 maradjon.
+    """
+    rx, ry, rz = np.rint(x), np.rint(y), np.rint(z)
+    dx, dy, dz = np.abs(rx - x), np.abs(ry - y), np.abs(rz - z)
+    fix_x = (dx > dy) & (dx > dz)
+    fix_y = ~fix_x & (dy > dz)
+    fix_z = ~fix_x & ~fix_y
+    rx = np.where(fix_x, -ry - rz, rx)
+    ry = np.where(fix_y, -rx - rz, ry)
+    rz = np.where(fix_z, -rx - ry, rz)
+    return rx.astype(np.int64), ry.astype(np.int64), rz.astype(np.int64)
+
+
+def hex_distance(q0, r0, q1, r1):
+    """Két hatszög távolsága lépésben (skalár vagy NumPy tömb)."""
+    dq, dr = q1 - q0, r1 - r0
+    return (abs(dq) + abs(dr) + abs(dq + dr)) // 2
+
+
+@lru_cache(maxsize=64)
+def range_offsets(radius):
+    """(M, 2) csak olvasható tömb: az összes (dq, dr) eltolás radius távolságon belül."""
+    dq, dr = np.mgrid[-radius:radius + 1, -radius:radius + 1]
+    inside = np.abs(dq + dr) <= radius
+    offsets = np.stack([dq[inside], dr[inside]], axis=-1).astype(np.int32)
+    offsets.flags.writeable = False
+    return offsets
+
+
+@lru_cache(maxsize=64)
+def ring_offsets(radius):
+    """
+    (6 * radius, 2) csak olvasható tömb: a pontosan radius távolságra lévő
+    eltolások körbejárási sorrendben (radius = 0: csak a középpont).
+    Az i. sarokból (radius * HEX_NEIGHBORS[i]) az i + 2. irányba lépve a
+    következő sarokhoz jutunk.
+    """
+    if radius == 0:
+        offsets = np.zeros((1, 2), dtype=np.int32)
+    else:
+        steps = np.arange(radius)[None, :, None]
+        corners = radius * HEX_NEIGHBORS[:, None, :]
+        walks = np.roll(HEX_NEIGHBORS, -2, axis=0)[:, None, :]
+        offsets = (corners + steps * walks).reshape(-1, 2).astype(np.int32)
+    offsets.flags.writeable = False
+    return offsets
+
+
+def hex_line(q0, r0, q1, r1):
+    """
+    (N, L + 1) q és r tömbök: a hatszög vonalak cellái a kezdőponttól a
+    végpontig (L a leghosszabb vonal hossza; a rövidebb vonalak a végpontjukat
+    ismétlik), és a (N, L + 1) t paraméter (0..1). A kocka koordinátás lineáris
+    interpoláció kis eltolást kap, hogy a pontosan élre eső minták egy irányba
+    kerekedjenek.
+    """
+    q0, r0, q1, r1 = (np.atleast_1d(np.asarray(c, dtype=np.int64)) for c in (q0, r0, q1, r1))
+    lengths = hex_distance(q0, r0, q1, r1)
+    samples = np.arange(int(lengths.max(initial=0)) + 1)[None, :]
+    t = np.minimum(samples / np.maximum(lengths, 1)[:, None], 1.0)
+    x = q0[:, None] + (q1 - q0)[:, None] * t + 1e-6
+    z = r0[:, None] + (r1 - r0)[:, None] * t + 1e-6
+    rx, _, rz = cube_round(x, -x - z, z)
+    return rx, rz, t
+
+
+# --- LEKÉRDEZÉSEK A MAGASSÁGTÉRKÉPEN ---
+
+class HexQuery:
+    """
+    Lekérdezések egy HexGrid oszlop magasságain. A chunkok magasságai egy
+    sűrű (2 * world_size, 2 * world_size) tömbbe kerülnek ([q + world_size,
+    r + world_size] indexeléssel); a térképen kívüli cella nem járható.
+    climb_cost: a szintenkénti magasságkülönbség többletköltsége egy lépésben,
+    max_climb: ennél nagyobb szintkülönbségre nem lehet lépni (None: nincs korlát),
+    path_cache_size: az LRU útvonal cache mérete.
+    Szerkesztés után a rebuild() frissíti a tömböket és üríti a cache-t.
+    """
+
+    def __init__(self, grid, climb_cost=1.0, max_climb=None, path_cache_size=4096):
+        self.grid = grid
+        self.world_size = grid.world_size
+        self.size = 2 * grid.world_size
+        self.climb_cost = climb_cost
+        self.max_climb = max_climb
+        self.path_cache_size = path_cache_size
+        self.paths = OrderedDict()  # (start, goal) -> (n, 2) útvonal vagy None
+        self.rebuild()
+
+    def rebuild(self):
+        """A sűrű magasság tömb újraépítése a grid chunkjaiból; a keresési táblák lusták."""
+        size, offset = self.size, self.world_size
+        self.heights = np.zeros((size, size), dtype=np.int32)
+        for chunk in self.grid.chunks.values():
+            q0, r0 = chunk.origin()
+            # A chunk a sűrű tömb szélén túlnyúlhat (csak a térképen belüli részt másoljuk)
+            q_lo, r_lo = max(q0 + offset, 0), max(r0 + offset, 0)
+            q_hi = min(q0 + offset + HEX_CHUNK_SIZE, size)
+            r_hi = min(r0 + offset + HEX_CHUNK_SIZE, size)
+            self.heights[q_lo:q_hi, r_lo:r_hi] = chunk.heights[q_lo - q0 - offset:q_hi - q0 - offset,
+                                                               r_lo - r0 - offset:r_hi - r0 - offset]
+        q, r = np.mgrid[-offset:size - offset, -offset:size - offset]
+        self.on_map = self.grid.in_map(q, r)
+        self.neighbors = None  # [cella] -> 6 szomszéd lapos index (-1: nem járható)
+        self.step_costs = None  # [cella] -> 6 lépés költség
+        self.paths.clear()
+
+    # --- Magasság és cella index ---
+
+    def index(self, q, r):
+        """A (q, r) cella lapos indexe, vagy -1, ha a térképen kívül van."""
+        qi, ri = q + self.world_size, r + self.world_size
+        if 0 <= qi < self.size and 0 <= ri < self.size and self.on_map[qi, ri]:
+            return qi * self.size + ri
+        return -1
+
+    def height_at(self, q, r):
+        """Oszlop magasság (skalár vagy NumPy tömb); a térképen kívül 0."""
+        qi = np.asarray(q) + self.world_size
+        ri = np.asarray(r) + self.world_size
+        inside = (qi >= 0) & (qi < self.size) & (ri >= 0) & (ri < self.size)
+        heights = self.heights[np.where(inside, qi, 0), np.where(inside, ri, 0)]
+        return np.where(inside & self.on_map[np.where(inside, qi, 0), np.where(inside, ri, 0)],
+                        heights, 0)
+
+    # --- Körzet és gyűrű ---
+
+    def hexes_in_range(self, q, r, radius):
+        """(M, 2) tömb: a (q, r) körüli radius sugarú körzet térképen lévő cellái."""
+        cells = range_offsets(radius) + np.array([q, r], dtype=np.int32)
+        return cells[self.cells_on_map(cells)]
+
+    def hex_ring(self, q, r, radius):
+        """(M, 2) tömb: a pontosan radius távolságra lévő, térképen lévő cellák sorban."""
+        cells = ring_offsets(radius) + np.array([q, r], dtype=np.int32)
+        return cells[self.cells_on_map(cells)]
+
+    def cells_on_map(self, cells):
+        """(M,) bool maszk egy (M, 2) cella tömbhöz."""
+        qi = cells[:, 0] + self.world_size
+        ri = cells[:, 1] + self.world_size
+        inside = (qi >= 0) & (qi < self.size) & (ri >= 0) & (ri < self.size)
+        return inside & self.on_map[np.where(inside, qi, 0), np.where(inside, ri, 0)]
+
+    # --- Látóvonal ---
+
+    def line_of_sight(self, q0, r0, q1, r1, eye_height=1.0, target_height=1.0):
+        """
+        (N,) bool tömb: True, ha a (q0, r0) oszlop tetején eye_height szint
+        magasan álló szem látja a (q1, r1) oszlop fölött target_height szinttel
+        lévő célt. A két pont közötti egyenes magassága lineárisan változik a
+        hatszög vonal mentén; a vonal belső celláinak oszlopa nem lehet magasabb
+        nála. Sok pár egyszerre, a leghosszabb vonal hosszáig kitöltött tömbökön.
+        """
+        line_q, line_r, t = hex_line(q0, r0, q1, r1)
+        eye_z = self.height_at(line_q[:, 0], line_r[:, 0]) + eye_height
+        target_z = self.height_at(line_q[:, -1], line_r[:, -1]) + target_height
+        sight_z = eye_z[:, None] + (target_z - eye_z)[:, None] * t
+        interior = (t > 0.0) & (t < 1.0)
+        blocked = interior & (self.height_at(line_q, line_r) > sight_z)
+        return ~np.any(blocked, axis=1)
+
+    # --- Útkeresés ---
+
+    def build_step_tables(self):
+        """
+        A cellánkénti szomszéd index és lépés költség táblák (egyszer, vektorizáltan),
+        Python listaként, mert az A* belső ciklusa elemenként olvassa őket.
+        Költség: 1 + climb_cost * |magasság különbség|; a max_climb fölötti
+        lépés és a térképről lelépés nem járható.
+        """
+        size, offset = self.size, self.world_size
+        qi, ri = np.mgrid[0:size, 0:size]
+        neighbors = np.full((size, size, 6), -1, dtype=np.int64)
+        costs = np.zeros((size, size, 6), dtype=np.float64)
+        for i, (dq, dr) in enumerate(HEX_NEIGHBORS):
+            nq, nr = qi + dq, ri + dr
+            inside = (nq >= 0) & (nq < size) & (nr >= 0) & (nr < size)
+            nq, nr = np.where(inside, nq, 0), np.where(inside, nr, 0)
+            climb = np.abs(self.heights[nq, nr] - self.heights)
+            walkable = inside & self.on_map & self.on_map[nq, nr]
+            if self.max_climb is not None:
+                walkable &= climb <= self.max_climb
+            neighbors[..., i] = np.where(walkable, nq * size + nr, -1)
+            costs[..., i] = 1.0 + self.climb_cost * climb
+        self.neighbors = neighbors.reshape(-1, 6).tolist()
+        self.step_costs = costs.reshape(-1, 6).tolist()
+        cell_q = (qi - offset).reshape(-1)
+        cell_r = (ri - offset).reshape(-1)
+        self.cell_q = cell_q.tolist()
+        self.cell_r = cell_r.tolist()
+        # Újrafelhasznált keresési állapot: a cella értékei csak akkor érvényesek,
+        # ha a stamp-je az aktuális lekérdezés sorszáma
+        self.g_score = [0.0] * (size * size)
+        self.came_from = [-1] * (size * size)
+        self.stamp = [0] * (size * size)
+        self.search_id = 0
+
+    def find_path(self, start, goal):
+        """
+        A* útvonal start = (q, r) és goal = (q, r) között: (n, 2) csak olvasható
+        tömb a starttól a célig, vagy None, ha nem elérhető. A heurisztika a
+        hatszög távolság (minden lépés legalább 1 költségű, így elfogadható).
+        Az eredmény az LRU cache-be kerül.
+        """
+        key = (tuple(start), tuple(goal))
+        if key in self.paths:
+            self.paths.move_to_end(key)
+            return self.paths[key]
+        path = self.search(self.index(*key[0]), self.index(*key[1]))
+        self.paths[key] = path
+        if len(self.paths) > self.path_cache_size:
+            self.paths.popitem(last=False)
+        return path
+
+    def search(self, start, goal):
+        """Az A* keresés lapos cella indexeken; -1 index: nincs út."""
+        if start < 0 or goal < 0:
+            return None
+        if self.neighbors is None:
+            self.build_step_tables()
+
+        neighbors, step_costs = self.neighbors, self.step_costs
+        cell_q, cell_r = self.cell_q, self.cell_r
+        g_score, came_from, stamp = self.g_score, self.came_from, self.stamp
+        self.search_id += 1
+        search_id = self.search_id
+        goal_q, goal_r = cell_q[goal], cell_r[goal]
+
+        stamp[start] = search_id
+        g_score[start] = 0.0
+        came_from[start] = -1
+        open_heap = [(0.0, 0.0, start)]
+        while open_heap:
+            _, negative_cost, cell = heapq.heappop(open_heap)
+            cost = -negative_cost
+            if cell == goal:
+                break
+            if cost > g_score[cell]:
+                continue  # Elavult bejegyzés (azóta olcsóbb úton értük el)
+            for neighbor, step_cost in zip(neighbors[cell], step_costs[cell]):
+                if neighbor < 0:
+                    continue
+                new_cost = cost + step_cost
+                if stamp[neighbor] != search_id or new_cost < g_score[neighbor]:
+                    stamp[neighbor] = search_id
+                    g_score[neighbor] = new_cost
+                    came_from[neighbor] = cell
+                    dq, dr = goal_q - cell_q[neighbor], goal_r - cell_r[neighbor]
+                    heuristic = (abs(dq) + abs(dr) + abs(dq + dr)) // 2
+                    # Egyenlő f értéknél a célhoz közelebbi (nagyobb g) cella jön előbb
+                    heapq.heappush(open_heap, (new_cost + heuristic, -new_cost, neighbor))
+        else:
+            return None
+
+        cells = [goal]
+        while cells[-1] != start:
+            cells.append(came_from[cells[-1]])
+        cells.reverse()
+        path = np.array([(cell_q[c], cell_r[c]) for c in cells], dtype=np.int32)
+        path.flags.writeable = False
+        return path
@@ -10,6 +10,15 @@ from panda3d.core import (
 from direct.showbase.ShowBase import ShowBase
 import math
 import random
+import numpy as np
+
+from GeomBuffers import (
+    pack_vertex_rows, vertex_data_from_rows, triangles_from_indices, make_geom_node
+)
+from ChunkStore import ChunkStore, DEFAULT_CACHE_DIR
+from GeomUploader import GeomUploadScheduler
+from PackedVertices import PACKED_FORMAT, pack_colors, apply_packed_shader
+from FractalNoise import NoiseParams, noise_region
 
 # --- GLOBÁLIS GEOMETRIA BEÁLLÍTÁSOK ---
 
@@ -22,18 +31,60 @@ array_format.add_column(InternalName.make("normal"), 3, Geom.NT_float32, Geom.C_
 
 CUSTOM_HEX_FORMAT = GeomVertexFormat.registerFormat(array_format)
 
+# Tömörített formátum (12 byte / vertex): fixpontos int16 pozíció, uint8 RGBA, normál index
+PACKED_HEX_FORMAT = PACKED_FORMAT
+
 # --- GEOMETRIA DEFINÍCIÓK ÉS SEGÉDFÜGGVÉNYEK ---
 
 HEX_SIZE = 1.0  # A hatszög (hexagon) sugara
 HEX_HEIGHT_STEP = 0.5 # Egy szint magassága
 
-# Egyszerű zajgenerátor (Perlin zaj helyett)
-# A magasságot egy egyszerű szinuszos hullámzás adja
-def simple_noise(x, y, scale=0.1, amplitude=5.0):
+# A hatszög terep generátor verziója (a lemez cache kulcsának része)
+# 3: chunkonkénti (HEX_CHUNK_SIZE x HEX_CHUNK_SIZE) magasság tömbök
+HEX_TERRAIN_VERSION = 3
+
+# Egy hatszög chunk mérete axial (q, r) irányban; chunkonként egy Geom
+HEX_CHUNK_SIZE = 16
+
+# A hatszög terep zaja (axial q, r rácson): kb. 12 hatszöges hullámhossz, enyhe warp
+HEX_TERRAIN_NOISE = NoiseParams(scale=1.0 / 12.0, octaves=4, lacunarity=2.0, gain=0.5,
+                                warp_strength=4.0, warp_scale=1.0 / 24.0, warp_octaves=2)
+HEX_BASE_HEIGHT = 3.0
+HEX_AMPLITUDE = 12.0
+HEX_NOISE_TILE = 16  # A zaj csempe mérete (a csempék LRU cache-ben maradnak)
+
+# Tömörített pozíciók: 1/HEX_FIXED_POINT egység pontosság (int16: kb. +-128 egység)
+HEX_FIXED_POINT = 256
+
+# A tömörített formátum normál táblája: felső lap, alsó lap, majd a 6 oldallap
+# (az i. oldal normálja a 60*i + 60 fokos irány, az i. és i+1. sarok közepe felé)
+HEX_NORMALS = [(0, 0, 1), (0, 0, -1)] + [
+    (math.cos(math.radians(60 * i + 60)), math.sin(math.radians(60 * i + 60)), 0)
+    for i in range(6)]
+
+# Az i. oldallap túloldalán álló szomszéd oszlop axial (dq, dr) eltolása
+# (a HEX_NORMALS 2 + i. normáljának irányában)
+HEX_NEIGHBORS = np.array([(0, 1), (-1, 1), (-1, 0), (0, -1), (1, -1), (1, 0)], dtype=np.int32)
+
+# Előre számolt táblák (minden hasábnál azonosak, nem kell újraszámolni):
+# az i. sarok eltolása a középponttól (60*i + 30 fok, HEX_SIZE sugáron),
+# a normál tábla tömbként, és az axial -> világ (x, y) leképezés mátrixa
+HEX_CORNER_OFFSETS = HEX_SIZE * np.array(
+    [(math.cos(math.radians(60 * i + 30)), math.sin(math.radians(60 * i + 30))) for i in range(6)])
+HEX_NORMAL_ARRAY = np.array(HEX_NORMALS, dtype=np.float32)
+HEX_AXIAL_TO_WORLD = HEX_SIZE * np.array([(math.sqrt(3), 0.0), (math.sqrt(3) / 2, 3 / 2)])
+
+# Háromszög index minták: a 6 sarkú felső / alsó lap legyezője és egy fal quad
+HEX_FAN_TRIANGLES = np.array([(0, 1, 2), (0, 2, 3), (0, 3, 4), (0, 4, 5)], dtype=np.uint32)
+HEX_QUAD_TRIANGLES = np.array([(0, 1, 2), (0, 2, 3)], dtype=np.uint32)
+
+def hex_heights(q0, r0, size, seed=0):
     """
-    Egy egyszerű hullámzó zajfüggvény a magasság kiszámításához.
+    A [q0, q0 + size) x [r0, r0 + size) axial terület egész magasságtérképe
+    ([qi, ri] indexeléssel) a seedelt fraktál zajból.
     """
-    return int(amplitude * (math.sin(x * scale) + math.cos(y * scale)) + amplitude)
+    noise = noise_region(seed, q0, r0, size, size, HEX_NOISE_TILE, HEX_TERRAIN_NOISE)
+    return np.floor(HEX_BASE_HEIGHT + HEX_AMPLITUDE * noise).astype(np.int32)
 
 def get_hex_center(q, r):
     """
@@ -44,154 +95,346 @@ def get_hex_center(q, r):
     y = HEX_SIZE * (0 * q + 3/2 * r)
     return LVector3f(x, y, 0)
 
+def hex_centers(q, r):
+    """get_hex_center() NumPy tömbökre: (..., 2) világ (x, y) középpontok."""
+    return np.stack([q, r], axis=-1).astype(np.float64) @ HEX_AXIAL_TO_WORLD
+
 def get_hex_corner(center, i):
     """
     Kiszámítja a hatszög 6 sarokpontjának 2D koordinátáit.
     i: 0-tól 5-ig a sarok indexe.
     """
-    angle_deg = 60 * i
-    angle_rad = math.pi / 180 * angle_deg
-    
-    # A lapos tetejű hatszög miatt elforgatjuk a kiindulási szöget
-    angle_rad += math.pi / 6 
-    
-    x = center.x + HEX_SIZE * math.cos(angle_rad)
-    y = center.y + HEX_SIZE * math.sin(angle_rad)
-    return x, y
+    # A 60*i + 30 fokos (lapos tetejű elrendezés) sarok eltolás a HEX_CORNER_OFFSETS táblából
+    offset_x, offset_y = HEX_CORNER_OFFSETS[i]
+    return center.x + offset_x, center.y + offset_y
 
-def make_hex_prism(q, r, z_level, color):
+def make_prism_template():
+    """
+    Egy szint magas hatszög hasáb sablonja, egyszer kiszámolva: vertexenként
+    (x, y) eltolás a középponttól, z (0 = alja, 1 = teteje), normál index és
+    szín szorzó, valamint a háromszög indexek. Sorrend: felső lap (közép + 6
+    sarok), alsó lap (közép + 6 sarok), majd oldalanként B0, T0, T1, B1.
+    """
+    zero = np.zeros((1, 2))
+    sides = np.arange(6)
+    next_sides = (sides + 1) % 6
+    side_xy = np.stack([HEX_CORNER_OFFSETS[sides], HEX_CORNER_OFFSETS[sides],
+                        HEX_CORNER_OFFSETS[next_sides], HEX_CORNER_OFFSETS[next_sides]], axis=1)
+    xy = np.concatenate([zero, HEX_CORNER_OFFSETS, zero, HEX_CORNER_OFFSETS, side_xy.reshape(-1, 2)])
+    z = np.concatenate([np.ones(7), np.zeros(7), np.tile([0.0, 1.0, 1.0, 0.0], 6)])
+    normal_indices = np.concatenate([np.zeros(7), np.ones(7), np.repeat(2 + sides, 4)]).astype(np.uint8)
+    shades = np.concatenate([np.full(7, 1.0), np.full(7, 0.8), np.full(24, 0.9)])
+
+    # Felülről nézve az óramutatóval ellentétes sorrend (a Panda3D ezt tekinti
+    # előlapnak); az alsó lap fordítva, az oldallapok kívülről nézve CCW
+    top = np.stack([np.zeros(6), 1 + sides, 1 + next_sides], axis=1)
+    bottom = np.stack([np.full(6, 7), 8 + next_sides, 8 + sides], axis=1)
+    b0, t0, t1, b1 = (14 + 4 * sides + k for k in range(4))
+    side_tris = np.stack([np.stack([b0, b1, t1], axis=1), np.stack([b0, t1, t0], axis=1)], axis=1)
+    indices = np.concatenate([top, bottom, side_tris.reshape(-1, 3)]).astype(np.uint32).reshape(-1)
+    return xy, z, normal_indices, shades, indices
+
+HEX_PRISM_XY, HEX_PRISM_Z, HEX_PRISM_NORMAL_INDICES, HEX_PRISM_SHADES, HEX_PRISM_INDICES = \
+    make_prism_template()
+
+def make_hex_prism(q, r, z_level, color, packed=False):
     """
     Létrehoz egy hatszögletű hasábot (voxelt) a megadott koordinátákon és színnel.
-    A geometria kézzel készül a Panda3D Geom osztályaival.
+    A vertexek az előre számolt hasáb sablonból (HEX_PRISM_*) jönnek egy-egy
+    NumPy művelettel, és egyetlen bulk másolással kerülnek a GeomVertexData-ba.
+    packed=True: PACKED_HEX_FORMAT (fixpontos pozíció, a NodePath skálázza vissza).
     """
     hex_center = get_hex_center(q, r)
-    base_z = z_level * HEX_HEIGHT_STEP
-    top_z = (z_level + 1) * HEX_HEIGHT_STEP
-
-    # A Panda3D Geom objektumokhoz szükséges formátum
-    format = CUSTOM_HEX_FORMAT
-    vdata = GeomVertexData('hex_data', format, Geom.UHDynamic)
-    vertex = GeomVertexWriter(vdata, 'vertex')
-    color_writer = GeomVertexWriter(vdata, 'color')
-    normal_writer = GeomVertexWriter(vdata, 'normal')
-    tris = GeomTriangles(Geom.UHDynamic)
-
-    # 6 sarokpont kiszámítása 2D-ben
-    corners_2d = [get_hex_corner(hex_center, i) for i in range(6)]
-
-    # --- TOP FACE --- (Felső lap)
-    center_top_index = vdata.getNumRows() 
-    vertex.addData3f(hex_center.x, hex_center.y, top_z)
-    color_writer.addData4f(color.x * 1.0, color.y * 1.0, color.z * 1.0, color.w)
-    normal_writer.addData3f(0, 0, 1) # Felfelé néző normál
-
-    top_indices = []
-    for i in range(6):
-        cx, cy = corners_2d[i]
-        index = vdata.getNumRows()
-        top_indices.append(index)
-        
-        vertex.addData3f(cx, cy, top_z)
-        color_writer.addData4f(color.x * 1.0, color.y * 1.0, color.z * 1.0, color.w)
-        normal_writer.addData3f(0, 0, 1)
-
-    # Háromszögek a felső laphoz
-    for i in range(6):
-        i0 = top_indices[i]
-        i1 = top_indices[(i + 1) % 6]
-        tris.addVertices(i0, center_top_index, i1)
-
-    # --- BOTTOM FACE --- (Alsó lap)
-    center_bottom_index = vdata.getNumRows() 
-    vertex.addData3f(hex_center.x, hex_center.y, base_z)
-    color_writer.addData4f(color.x * 0.8, color.y * 0.8, color.z * 0.8, color.w) # Sötétebb szín
-    normal_writer.addData3f(0, 0, -1) # Lefelé néző normál
-
-    bottom_indices = []
-    for i in range(6):
-        cx, cy = corners_2d[i]
-        index = vdata.getNumRows()
-        bottom_indices.append(index)
-        
-        vertex.addData3f(cx, cy, base_z)
-        color_writer.addData4f(color.x * 0.8, color.y * 0.8, color.z * 0.8, color.w)
-        normal_writer.addData3f(0, 0, -1)
-
-    # Háromszögek az alsó laphoz (fordított sorrendben)
-    for i in range(6):
-        i0 = bottom_indices[i]
-        i1 = bottom_indices[(i + 1) % 6]
-        tris.addVertices(i1, center_bottom_index, i0)
-
-    # --- SIDE FACES --- (Oldallapok)
-    side_color = LColor(color.x * 0.9, color.y * 0.9, color.z * 0.9, color.w)
-
-    for i in range(6):
-        # Aktuális és következő sarokpont koordinátái
-        p0_2d = corners_2d[i]
-        p1_2d = corners_2d[(i + 1) % 6]
-        
-        # Kiszámítja az oldalra mutató normál vektort
-        mid_x = (p0_2d[0] + p1_2d[0]) / 2.0
-        mid_y = (p0_2d[1] + p1_2d[1]) / 2.0
-        
-        norm_x = mid_x - hex_center.x
-        norm_y = mid_y - hex_center.y
-        
-        # Létrehozzuk az oldalsó normál vektort
-        side_normal = LVector3f(norm_x, norm_y, 0)
-        
-        # Normalizálás in-place. A Panda3D verzióknál ez adja vissza a True/False-t.
-        # Ha False-t ad vissza (nulla vektor), megakadályozzuk, hogy a side_normal True/False legyen.
-        if not side_normal.normalize():
-            # Ha valamiért (0,0,0) a normál vektor, adjunk egy default értéket.
-            # Ez a biztonsági fallback megakadályozza az AttributeError-t.
-            side_normal = LVector3f(1, 0, 0)
-
-        # Új vertexek létrehozása a négyzet mind a 4 sarkához, egyedi normállal
-        
-        # B0 (Alsó, p0)
-        idx_b0 = vdata.getNumRows()
-        vertex.addData3f(p0_2d[0], p0_2d[1], base_z)
-        color_writer.addData4f(side_color.x, side_color.y, side_color.z, side_color.w)
-        normal_writer.addData3f(side_normal.x, side_normal.y, side_normal.z)
-
-        # T0 (Felső, p0)
-        idx_t0 = vdata.getNumRows()
-        vertex.addData3f(p0_2d[0], p0_2d[1], top_z)
-        color_writer.addData4f(side_color.x, side_color.y, side_color.z, side_color.w)
-        normal_writer.addData3f(side_normal.x, side_normal.y, side_normal.z)
-
-        # T1 (Felső, p1)
-        idx_t1 = vdata.getNumRows()
-        vertex.addData3f(p1_2d[0], p1_2d[1], top_z)
-        color_writer.addData4f(side_color.x, side_color.y, side_color.z, side_color.w)
-        normal_writer.addData3f(side_normal.x, side_normal.y, side_normal.z)
-        
-        # B1 (Alsó, p1)
-        idx_b1 = vdata.getNumRows()
-        vertex.addData3f(p1_2d[0], p1_2d[1], base_z)
-        color_writer.addData4f(side_color.x, side_color.y, side_color.z, side_color.w)
-        normal_writer.addData3f(side_normal.x, side_normal.y, side_normal.z)
+    vertices = np.column_stack([HEX_PRISM_XY + (hex_center.x, hex_center.y),
+                                (z_level + HEX_PRISM_Z) * HEX_HEIGHT_STEP])
+    colors = np.empty((len(HEX_PRISM_SHADES), 4))
+    colors[:, :3] = np.outer(HEX_PRISM_SHADES, (color.x, color.y, color.z))
+    colors[:, 3] = color.w
+    return hex_geom_node('HexVoxel', vertices, colors, HEX_NORMAL_ARRAY[HEX_PRISM_NORMAL_INDICES],
+                         HEX_PRISM_NORMAL_INDICES, HEX_PRISM_INDICES, packed)
+
+def hex_geom_node(name, vertices, colors, normals, normal_indices, indices, packed=False,
+                  fixed_point=HEX_FIXED_POINT):
+    """
+    A vertex oszlop listákból egyetlen bulk másolással feltöltött GeomNode.
+    packed=True: PACKED_HEX_FORMAT (fixpontos pozíció, a NodePath skálázza vissza;
+    nagy kiterjedésű mesh-nél kisebb fixed_point nagyobb tartományt ad).
+    """
+    if packed:
+        vformat = PACKED_HEX_FORMAT
+        rows = pack_vertex_rows(PACKED_HEX_FORMAT, {
+            'vertex': np.rint(np.array(vertices) * fixed_point).astype(np.int16),
+            'color': pack_colors(colors),
+            'normal_index': np.array(normal_indices, dtype=np.uint8)})
+    else:
+        vformat = CUSTOM_HEX_FORMAT
+        rows = pack_vertex_rows(CUSTOM_HEX_FORMAT, {
+            'vertex': vertices, 'color': colors, 'normal': normals})
+    vdata = vertex_data_from_rows('hex_data', vformat, rows)
+    tris = triangles_from_indices(np.array(indices, dtype=np.uint32))
+
+    # A Geom-ot GeomNode-ba helyezzük
+    node = make_geom_node(name, vdata, tris)
+    
+    node_path = NodePath(node)
+    if packed:
+        node_path.setScale(1.0 / fixed_point)
+    return node_path
+
+def hex_biome_color(height):
+    """Magasság alapján színt rendel a voxelhez (Minecraft-stílusú biómok)."""
+    if height < 2:
+        # Víz (kék)
+        return LColor(0.1, 0.4, 0.9, 1) # Világosabb kék
+    elif height < 5:
+        # Fű/Síkság (világos zöld)
+        return LColor(0.3, 0.8, 0.3, 1) # Világosabb zöld
+    elif height < 8:
+        # Hegyoldal (szürke-barna)
+        return LColor(0.6, 0.5, 0.4, 1)
+    else:
+        # Csúcs/Hó (TISZTA FEHÉR)
+        return LColor(1.0, 1.0, 1.0, 1) # Tiszta fehér a kért szín
+
+def hex_level_color(z, height_blocks, biome_color=hex_biome_color):
+    """Egy height_blocks magas oszlop z. szintjének színe."""
+    # Ha a legalsó réteg (dirt/kő)
+    if z == 0:
+        return LColor(0.5, 0.3, 0.1, 1) # Barna (föld/kő)
+    # Ha a legfelső réteg (biome)
+    elif z == height_blocks - 1:
+        return biome_color(height_blocks)
+    # Ha középső réteg (dirt)
+    else:
+        return LColor(0.4, 0.25, 0.05, 1) # Sötétbarna
+
+def face_indices(num_faces, first_vertex, triangles, face_vertices):
+    """Egymás után álló, face_vertices vertexes lapok háromszög indexei egy mintából."""
+    bases = first_vertex + face_vertices * np.arange(num_faces, dtype=np.uint32)
+    return (bases[:, None, None] + triangles[None]).reshape(-1)
+
+def shaded(colors, shade):
+    """RGBA sorok RGB része shade-del szorozva (az alfa marad)."""
+    colors = colors.copy()
+    colors[:, :3] *= shade
+    return colors
+
+def level_color_tables(level_color, max_height):
+    """
+    (alsó, középső, felső) szín tábla magasságonként: a height_blocks magas
+    oszlop legalsó, középső és legfelső szintjének RGBA színe, (max_height + 1, 4).
+    """
+    height_range = range(int(max_height) + 1)
+    return tuple(
+        np.array([tuple(level_color(level(h), h)) for h in height_range], dtype=np.float32)
+        for level in (lambda h: 0, lambda h: 1, lambda h: h - 1))
+
+def wall_segments(column_heights, neighbor_heights):
+    """
+    A falak kilátszó szakaszai: oldalanként a [szomszéd magasság, oszlop magasság)
+    tartomány a színsávok (alsó szint, középső szintek, legfelső szint) határain
+    darabolva, legfeljebb 3 szakasz a [low, b1, b2, h] határok között (az üres
+    szakaszok kiesnek). column_heights és neighbor_heights azonos alakú tömbök.
+    Visszatérés: (az oldal indexei (np.nonzero alakban), z0, z1).
+    """
+    low = np.clip(neighbor_heights, 0, column_heights)
+    b1 = np.clip(1, low, column_heights)
+    b2 = np.maximum(b1, np.clip(column_heights - 1, low, column_heights))
+    bounds = np.stack([low, b1, b2, column_heights], axis=-1)
+    *index, segment = np.nonzero(bounds[..., 1:] > bounds[..., :-1])
+    index = tuple(index)
+    return index, bounds[index + (segment,)], bounds[index + (segment + 1,)]
+
+def wall_band_colors(tables, wall_heights, z0):
+    """A z0 szinten kezdődő falszakaszok színe (a level_color_tables() tábláiból)."""
+    bottom_table, middle_table, top_table = tables
+    return np.where((z0 == 0)[:, None], bottom_table[wall_heights],
+                    np.where((z0 == wall_heights - 1)[:, None], top_table[wall_heights],
+                             middle_table[wall_heights]))
+
+def wall_quads(p0, p1, z0, z1):
+    """(M, 2) alsó élek (p0 -> p1) és z0..z1 szint tartományok -> (4 * M, 3) fal quad vertexek."""
+    wall_z0 = (z0 * HEX_HEIGHT_STEP)[:, None]
+    wall_z1 = (z1 * HEX_HEIGHT_STEP)[:, None]
+    return np.stack([np.hstack([p0, wall_z0]), np.hstack([p1, wall_z0]),
+                     np.hstack([p1, wall_z1]), np.hstack([p0, wall_z1])], axis=1).reshape(-1, 3)
+
+def make_hex_columns(q, r, heights, neighbor_heights, level_color=hex_level_color, packed=False):
+    """
+    Oszlop mód: (q, r) oszloponként EGY 0..height_blocks magas hasáb, az összes
+    oszlop egyetlen közös bufferben (egy GeomNode, egy draw call).
+    A szintenkénti make_hex_prism() hasábok belső lapjai (a szintek közötti
+    felső / alsó lapok és a szomszéd oszlop által takart falak) kimaradnak:
+    oldalfal csak ott készül, ahol a szomszéd oszlop alacsonyabb, és csak a
+    kilátszó [szomszéd magasság, height_blocks) tartományban.
+    q, r, heights: (N,) tömbök, neighbor_heights: (N, 6) a szomszédok magassága
+    HEX_NEIGHBORS sorrendben (a térképen kívül 0).
+    level_color(z, height_blocks): az oszlop z. szintjének színe (a fal színsávjaihoz).
+
+    Vertexenkénti írás helyett a középpontokat (hex_centers) a HEX_CORNER_OFFSETS
+    táblával broadcastoljuk, így minden lap típus egy-egy NumPy művelet, és a
+    kész sorok egyetlen bulk másolással kerülnek a bufferbe.
+    """
+    heights = np.asarray(heights, dtype=np.int32)
+    keep = heights > 0
+    q, r, heights = np.asarray(q)[keep], np.asarray(r)[keep], heights[keep]
+    neighbor_heights = np.asarray(neighbor_heights, dtype=np.int32)[keep]
+    num_columns = len(heights)
+    if num_columns == 0:
+        return None
+
+    # Szín táblák magasságonként: a legalsó, a középső és a legfelső szint színe
+    tables = level_color_tables(level_color, heights.max())
+    bottom_table, _, top_table = tables
+
+    corners = hex_centers(q, r)[:, None, :] + HEX_CORNER_OFFSETS[None]  # (N, 6, 2)
+
+    # --- TOP / BOTTOM FACE --- (a legfelső szint teteje, a legalsó szint alja)
+    top_z = np.broadcast_to((heights * HEX_HEIGHT_STEP)[:, None, None], (num_columns, 6, 1))
+    top_vertices = np.concatenate([corners, top_z], axis=2).reshape(-1, 3)
+    # Az alsó lap kívülről (alulról) nézve CCW: fordított sarok sorrend
+    bottom_vertices = np.concatenate([corners[:, ::-1], np.zeros_like(top_z)], axis=2).reshape(-1, 3)
+    top_colors = np.repeat(top_table[heights], 6, axis=0)
+    bottom_colors = shaded(np.repeat(bottom_table[heights], 6, axis=0), 0.8)
+
+    # --- SIDE FACES --- (csak a szomszéd fölé kilátszó rész)
+    # A fal a színsávok határain darabolódik (wall_segments), így a színezés a
+    # szintenkénti hasábokéval azonos.
+    column_heights = np.broadcast_to(heights[:, None], neighbor_heights.shape)
+    (column, side), z0, z1 = wall_segments(column_heights, neighbor_heights)
+    wall_vertices = wall_quads(corners[column, side], corners[column, (side + 1) % 6], z0, z1)
+    wall_colors = shaded(np.repeat(wall_band_colors(tables, heights[column], z0), 4, axis=0), 0.9)
+
+    num_cap_vertices = 6 * num_columns
+    vertices = np.concatenate([top_vertices, bottom_vertices, wall_vertices])
+    colors = np.concatenate([top_colors, bottom_colors, wall_colors])
+    normal_indices = np.concatenate([
+        np.zeros(num_cap_vertices, dtype=np.uint8), np.ones(num_cap_vertices, dtype=np.uint8),
+        np.repeat(2 + side, 4).astype(np.uint8)])
+    indices = np.concatenate([
+        face_indices(num_columns, 0, HEX_FAN_TRIANGLES, 6),
+        face_indices(num_columns, num_cap_vertices, HEX_FAN_TRIANGLES, 6),
+        face_indices(len(side), 2 * num_cap_vertices, HEX_QUAD_TRIANGLES, 4)])
+    return hex_geom_node('HexColumns', vertices, colors, HEX_NORMAL_ARRAY[normal_indices],
+                         normal_indices, indices, packed)
+
+# --- HATSZÖG RÁCS (AXIAL CHUNKOK) ---
+
+class HexChunk:
+    """
+    Egy HEX_CHUNK_SIZE x HEX_CHUNK_SIZE axial terület oszlopainak magassága.
+    heights[qi, ri] a (q0 + qi, r0 + ri) oszlop magassága; a térképen kívül 0.
+    """
 
-        # Két háromszög a négyszöghöz (quad)
-        tris.addVertices(idx_b0, idx_t0, idx_t1)
-        tris.addVertices(idx_b0, idx_t1, idx_b1)
+    def __init__(self, coord, heights):
+        self.coord = coord
+        self.heights = heights
 
+    def origin(self):
+        """A chunk első oszlopának (q0, r0) axial koordinátája."""
+        return self.coord[0] * HEX_CHUNK_SIZE, self.coord[1] * HEX_CHUNK_SIZE
 
-    geom = Geom(vdata)
-    geom.addPrimitive(tris)
+    def is_empty(self):
+        return not np.any(self.heights > 0)
 
-    # A Geom-ot GeomNode-ba helyezzük
-    node = GeomNode('HexVoxel')
-    node.addGeom(geom)
-    
-    return NodePath(node)
+
+class HexGrid:
+    """
+    A gyémánt alakú (|q + r| <= world_size) axial térkép chunkokra bontva.
+    A chunkok a (cq, cr) chunk koordinátával indexelt szótárban vannak; a
+    szomszéd oszlopok magassága (a chunk határon túl is) HEX_NEIGHBORS
+    eltolásokkal, NumPy szeletekkel olvasható ki.
+    """
+
+    def __init__(self, world_size):
+        self.world_size = world_size
+        self.chunks = {}
+
+    def chunk_range(self):
+        """A térképet lefedő chunk koordináták (cq, cr) sorban."""
+        first = -self.world_size // HEX_CHUNK_SIZE
+        last = (self.world_size - 1) // HEX_CHUNK_SIZE
+        for cq in range(first, last + 1):
+            for cr in range(first, last + 1):
+                yield cq, cr
+
+    def in_map(self, q, r):
+        """A (q, r) hatszög a térképen van-e (skalár vagy NumPy tömb)."""
+        return ((-self.world_size <= q) & (q < self.world_size) &
+                (-self.world_size <= r) & (r < self.world_size) &
+                (abs(q + r) <= self.world_size))
+
+    def map_mask(self, coord):
+        """(HEX_CHUNK_SIZE, HEX_CHUNK_SIZE) bool maszk: a chunk mely oszlopai vannak a térképen."""
+        q0, r0 = coord[0] * HEX_CHUNK_SIZE, coord[1] * HEX_CHUNK_SIZE
+        q, r = np.mgrid[q0:q0 + HEX_CHUNK_SIZE, r0:r0 + HEX_CHUNK_SIZE]
+        return self.in_map(q, r)
+
+    def generate_chunk(self, coord, seed=0):
+        """Egy chunk magasságai a zajból; a térképen kívüli oszlopok 0-k."""
+        q0, r0 = coord[0] * HEX_CHUNK_SIZE, coord[1] * HEX_CHUNK_SIZE
+        heights = hex_heights(q0, r0, HEX_CHUNK_SIZE, seed)
+        heights[~self.map_mask(coord)] = 0
+        return HexChunk(coord, heights)
+
+    def height(self, q, r):
+        """Egy oszlop magassága (a térképen és a betöltött chunkokon kívül 0)."""
+        chunk = self.chunks.get((q // HEX_CHUNK_SIZE, r // HEX_CHUNK_SIZE))
+        if chunk is None:
+            return 0
+        return int(chunk.heights[q % HEX_CHUNK_SIZE, r % HEX_CHUNK_SIZE])
+
+    def padded_heights(self, chunk):
+        """
+        (S + 2, S + 2) magasság tömb a chunk körüli 1 hatszög széles kerettel,
+        a szomszéd chunkokból másolva (hiányzó chunk helyén 0).
+        """
+        size = HEX_CHUNK_SIZE
+        padded = np.zeros((size + 2, size + 2), dtype=np.int32)
+        cq, cr = chunk.coord
+        for dcq in (-1, 0, 1):
+            for dcr in (-1, 0, 1):
+                other = self.chunks.get((cq + dcq, cr + dcr))
+                if other is None:
+                    continue
+                # A szomszéd chunk l. oszlopa a keretes tömb dc * S + l + 1. indexe
+                q_start, r_start = dcq * size + 1, dcr * size + 1
+                q_lo, q_hi = max(q_start, 0), min(q_start + size, size + 2)
+                r_lo, r_hi = max(r_start, 0), min(r_start + size, size + 2)
+                padded[q_lo:q_hi, r_lo:r_hi] = other.heights[q_lo - q_start:q_hi - q_start,
+                                                             r_lo - r_start:r_hi - r_start]
+        return padded
+
+    def neighbor_heights(self, chunk):
+        """(S, S, 6) tömb: [qi, ri, i] az oszlop i. oldallapja mögötti szomszéd magassága."""
+        size = HEX_CHUNK_SIZE
+        padded = self.padded_heights(chunk)
+        return np.stack([padded[1 + dq:1 + dq + size, 1 + dr:1 + dr + size]
+                         for dq, dr in HEX_NEIGHBORS], axis=-1)
+
+def make_hex_chunk(grid, chunk, level_color=hex_level_color, packed=False):
+    """
+    Oszlop mód: a chunk összes oszlopa egy make_hex_columns() bufferbe kerül.
+    A vertexek a chunk első hatszögéhez képest relatívak (a fixpontos int16
+    pozíció így a térkép méretétől függetlenül elfér), a node-ot toljuk el.
+    A térképen kívüli szomszéd 0 magasságú, így a peremen teljes fal készül.
+    Üres chunknál None.
+    """
+    q0, r0 = chunk.origin()
+    q, r = np.nonzero(chunk.heights > 0)
+    node_path = make_hex_columns(q, r, chunk.heights[q, r], grid.neighbor_heights(chunk)[q, r],
+                                 level_color, packed)
+    if node_path is None:
+        return None
+    node_path.node().setName("HexChunk_%d_%d" % chunk.coord)
+    node_path.setPos(get_hex_center(q0, r0))
+    return node_path
 
 # --- FŐ ALKALMAZÁS ---
 
 class HexVoxelWorld(ShowBase):
-    def __init__(self):
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, packed_vertices=True, seed=0,
+                 column_mode=True, world_size=15, lod_mode=False, lod_factor=12.0):
         ShowBase.__init__(self)
         self.setBackgroundColor(0.2, 0.2, 0.4) # Sötétkék égbolt
 
@@ -216,7 +459,33 @@ class HexVoxelWorld(ShowBase):
         self.render.setLight(dlnp)
 
         # Globális változók
-        self.world_size = 15 # A generált rács mérete
+        self.world_size = world_size # A generált rács mérete
+        # Az axial chunkokra bontott magasság adatok
+        self.grid = HexGrid(self.world_size)
+        # Tömörített vertex formátum (12 byte / vertex a 40 helyett), saját shaderrel
+        self.packed_vertices = packed_vertices
+        # A terep zaj seedje (a cache kulcsának is része)
+        self.seed = seed
+        # Oszlop mód: (q, r) oszloponként egy összevont hasáb, egy közös bufferben
+        # (False: a régi út, szintenként külön make_hex_prism() node)
+        self.column_mode = column_mode
+        # Hierarchikus LOD mód (HexHierarchy): a távoli területek aperture-7 szülő
+        # cellákként, és csak a kamera közelében oszloponként jelennek meg. Ha a
+        # kamera lod_rebuild_distance-nél többet mozdult, a kiválasztás újraszámolódik,
+        # és csak azok a szintenkénti mesh-ek épülnek újra, amelyeken (vagy a
+        # szomszédjukban) a kiválasztás változott. lod_factor: egy cella addig
+        # finomodik, amíg a kamera lod_factor * cella sugárnál közelebb van.
+        self.lod_mode = lod_mode
+        self.lod_factor = lod_factor
+        self.lod_rebuild_distance = 4.0
+        self.lod_nodes = {}  # szint -> a kirajzolt (vagy feltöltésre váró) NodePath
+        self.lod_selection = None
+        self.lod_camera_xy = None
+        # Lemezen tárolt cache (cache_dir=None: mindig újragenerálás)
+        self.store = None
+        if cache_dir:
+            self.store = ChunkStore(cache_dir, f"hex_{self.world_size}", seed=seed,
+                                    version=HEX_TERRAIN_VERSION)
         self.generate_world()
 
     def camera_task(self, task):
@@ -237,19 +506,27 @@ class HexVoxelWorld(ShowBase):
 
     def get_color_by_height(self, height):
         """Magasság alapján színt rendel a voxelhez (Minecraft-stílusú biómok)."""
-        if height < 2:
-            # Víz (kék)
-            return LColor(0.1, 0.4, 0.9, 1) # Világosabb kék
-        elif height < 5:
-            # Fű/Síkság (világos zöld)
-            return LColor(0.3, 0.8, 0.3, 1) # Világosabb zöld
-        elif height < 8:
-            # Hegyoldal (szürke-barna)
-            return LColor(0.6, 0.5, 0.4, 1)
-        else:
-            # Csúcs/Hó (TISZTA FEHÉR)
-            return LColor(1.0, 1.0, 1.0, 1) # Tiszta fehér a kért szín
-        
+        return hex_biome_color(height)
+
+    def get_level_color(self, z, height_blocks):
+        """Egy height_blocks magas oszlop z. szintjének színe."""
+        return hex_level_color(z, height_blocks, self.get_color_by_height)
+
+    def load_or_generate_chunk(self, coord):
+        """
+        Egy chunk magasság tömbje: a lemez cache-ből, ha már elkészült egyszer,
+        különben a zajból kiszámolva (a térképen kívüli oszlopok 0-k) és elmentve.
+        """
+        if self.store is not None:
+            arrays = self.store.load_column(*coord)
+            if arrays is not None:
+                return HexChunk(coord, arrays["heights"])
+
+        chunk = self.grid.generate_chunk(coord, self.seed)
+        if self.store is not None:
+            self.store.save_column(*coord, {"heights": chunk.heights})
+        return chunk
+
     def generate_world(self):
         """A hatszögletű világ procedurális generálása."""
         
@@ -257,36 +534,116 @@ class HexVoxelWorld(ShowBase):
         
         # Az összes generált voxel egy közös NodePath alá kerül a könnyebb kezelés érdekében
         self.world_root = self.render.attachNewNode("WorldRoot")
+        if self.packed_vertices:
+            apply_packed_shader(self.world_root, HEX_NORMALS)
+
+        # A node-ok (oszlop módban chunkonként egy közös buffer, különben hatszög
+        # oszloponként egy node) a feltöltési sorba kerülnek: frame-enként
+        # upload_budget_ms ideig, a kamerához legközelebbivel kezdve csatoljuk őket
+        self.uploader = GeomUploadScheduler(self.world_root, self.win.getGsg() if self.win else None,
+                                            budget_ms=2.0)
+        self.taskMgr.add(self.geom_upload_task, "GeomUploadTask", sort=10)
+
+        for coord in self.grid.chunk_range():
+            chunk = self.load_or_generate_chunk(coord)
+            if not chunk.is_empty():
+                self.grid.chunks[coord] = chunk
+
+        if self.lod_mode:
+            # Lusta import: a HexHierarchy maga is ebből a modulból importál
+            from HexHierarchy import HexHierarchy
+            self.hierarchy = HexHierarchy(self.grid)
+            self.taskMgr.add(self.lod_task, "HexLodTask", sort=5)
+        else:
+            for chunk in self.grid.chunks.values():
+                if self.column_mode:
+                    self.generate_chunk_columns(chunk)
+                else:
+                    self.generate_chunk_prisms(chunk)
 
-        for q in range(-self.world_size, self.world_size):
-            for r in range(-self.world_size, self.world_size):
-                # Csak a gyémánt alakú (axial) rácson belüli hatszögeket generáljuk
-                if abs(q + r) > self.world_size:
-                    continue
+        print("Világ generálása kész.")
 
-                # Kiszámoljuk a magasságot zajfüggvény alapján
-                height_blocks = simple_noise(q, r, scale=0.15, amplitude=3.0)
+    def generate_chunk_columns(self, chunk):
+        """Oszlop mód: chunkonként egy make_hex_chunk() node a feltöltési sorba."""
+        node_path = make_hex_chunk(self.grid, chunk, self.get_level_color, self.packed_vertices)
+        if node_path is None:
+            return
+        q0, r0 = chunk.origin()
+        center = get_hex_center(q0 + HEX_CHUNK_SIZE / 2.0, r0 + HEX_CHUNK_SIZE / 2.0)
+        self.uploader.enqueue(chunk.coord, node_path, (center.x, center.y, 0))
+
+    def generate_chunk_prisms(self, chunk):
+        """A régi út: szintenként egy make_hex_prism() hasáb, oszloponként egy node."""
+        q0, r0 = chunk.origin()
+        for qi, ri in zip(*np.nonzero(chunk.heights > 0)):
+            q, r = q0 + int(qi), r0 + int(ri)
+            height_blocks = int(chunk.heights[qi, ri])
+            column_root = NodePath("HexColumn_%d_%d" % (q, r))
+
+            # A hatszögek építése a legalsó szinttől a zaj által meghatározott magasságig
+            for z in range(height_blocks):
+                # Létrehozza a 3D hatszög hasábot
+                hex_voxel = make_hex_prism(q, r, z, self.get_level_color(z, height_blocks),
+                                           self.packed_vertices)
                 
-                # A hatszögek építése a legalsó szinttől a zaj által meghatározott magasságig
-                for z in range(height_blocks):
-                    
-                    # Ha a legalsó réteg (dirt/kő)
-                    if z == 0:
-                        voxel_color = LColor(0.5, 0.3, 0.1, 1) # Barna (föld/kő)
-                    # Ha a legfelső réteg (biome)
-                    elif z == height_blocks - 1:
-                        voxel_color = self.get_color_by_height(height_blocks)
-                    # Ha középső réteg (dirt)
-                    else:
-                        voxel_color = LColor(0.4, 0.25, 0.05, 1) # Sötétbarna
-                        
-                    # Létrehozza a 3D hatszög hasábot
-                    hex_voxel = make_hex_prism(q, r, z, voxel_color)
-                    
-                    # Hozzáadja a világhoz
-                    hex_voxel.reparentTo(self.world_root)
+                # Hozzáadja az oszlophoz
+                hex_voxel.reparentTo(column_root)
+
+            center = get_hex_center(q, r)
+            self.uploader.enqueue((q, r), column_root,
+                                  (center.x, center.y, height_blocks * HEX_HEIGHT_STEP / 2.0))
+
+    def lod_task(self, task):
+        """
+        LOD mód: ha a kamera elég messzire mozdult, a szintenkénti kiválasztás
+        (HexHierarchy.select) újraszámolódik, és csak a változott szintek mesh-e
+        épül újra (HexHierarchy.stale_levels). Az új mesh a feltöltési sorba kerül,
+        és a csatolásakor váltja le a régit. A vertexek az építéskori, a kamerához
+        igazított origóhoz relatívak.
+        """
+        camera_pos = self.camera.getPos(self.render)
+        camera_xy = np.array([camera_pos.x, camera_pos.y])
+        if (self.lod_camera_xy is not None and
+                np.linalg.norm(camera_xy - self.lod_camera_xy) < self.lod_rebuild_distance):
+            return task.cont
+        self.lod_camera_xy = camera_xy
+
+        origin = np.rint(camera_xy)
+        selection = self.hierarchy.select(camera_xy, self.lod_factor)
+        stale = self.hierarchy.stale_levels(self.lod_selection, selection)
+        self.lod_selection = selection
+        for level in stale:
+            key = ("lod", level)
+            node_path = self.hierarchy.make_level_mesh(level, selection, origin, self.get_level_color,
+                                                       self.packed_vertices)
+            old = self.lod_nodes.pop(level, None)
+            if node_path is None:
+                # Üres szint: a várakozó és a kirajzolt régi mesh is eltűnik
+                dropped = self.uploader.cancel(key)
+                if dropped is not None:
+                    dropped.node_path.removeNode()
+                    if dropped.replaces is not None:
+                        dropped.replaces.removeNode()
+                if old is not None:
+                    old.removeNode()
+                continue
+            # Ha a régi még a sorban várt, az enqueue eldobja, és az ő cseréjét örökli
+            self.uploader.enqueue(key, node_path, (origin[0], origin[1], 0), replaces=old)
+            self.lod_nodes[level] = node_path
+        return task.cont
 
-        print("Világ generálása kész.")
+    def geom_upload_task(self, task):
+        """A sorban álló hatszög oszlopok feltöltése a GeomUploadScheduler időkeretében."""
+        if self.uploader.busy():
+            self.uploader.update(self.camera.getPos(self.render))
+            self.uploader.log_progress()
+            if not self.uploader.busy():
+                stats = self.uploader.stats()
+                print(f"Geometria feltöltés kész: {stats['total_uploaded']} node, "
+                      f"{stats['total_upload_bytes'] / 1024.0:.1f} KB, "
+                      f"{stats['total_upload_ms']:.1f} ms összesen, "
+                      f"csúcs {stats['peak_upload_ms']:.2f} ms / frame.")
+        return task.cont
 
 if __name__ == "__main__":
     app = HexVoxelWorld()
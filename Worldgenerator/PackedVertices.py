@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+# Tömörített vertex formátum a voxel és a hatszög mesh-ekhez.
+# A float32 pozíció + float32 RGBA + float32 normál (40 byte / vertex) helyett:
+#   - pozíció: int16 egész rács koordináta (voxelnél a rács sarokpont indexe,
+#     hatszögnél fixpontos érték), a valódi méretet / eltolást a NodePath
+#     transzformációja adja,
+#   - szín: uint8 RGBA (a GPU 0..1-re normalizálja),
+#   - normál: egy uint8 index a normal_table shader bemenetbe,
+#   - réteg: egy uint8 textúra tömb réteg index (a voxel anyag rendszerhez, lásd
+#     VoxelMaterials; a hatszög mesh-ek nem használják).
+# Így egy vertex 12 byte (3.3x kisebb). A dekódolást és a
+# megvilágítást (ambient + irányfény, mint a setShaderAuto) PACKED_SHADER végzi,
+# textúrázott voxeleknél TEXTURED_SHADER.
+
+from panda3d.core import (
+    GeomVertexFormat, GeomVertexArrayFormat, Geom, InternalName, Shader,
+    PTA_LVecBase3f, LVecBase3f
+)
+import numpy as np
+
+MAX_NORMALS = 8  # A normal_table mérete (voxel: 6 lapirány, hatszög: 2 + 6)
+
+
+def make_packed_format():
+    """
+    Tömörített vertex formátum regisztrálása:
+    color (4 x uint8) | vertex (3 x int16) | normal_index (uint8) | layer (uint8) = 12 byte.
+    Az oszlopok kezdőcímét kézzel adjuk meg, hogy mindegyik természetes igazításon legyen.
+    (uint8 pozíciót a Panda3D nem ad át közvetlenül a GPU-nak, hanem átalakítja
+    a vertex adatot, és közben a többi oszlop elveszik, ezért int16.)
+    """
+    array_format = GeomVertexArrayFormat()
+    array_format.add_column(InternalName.make("color"), 4, Geom.NT_uint8, Geom.C_color, 0)
+    array_format.add_column(InternalName.make("vertex"), 3, Geom.NT_int16, Geom.C_point, 4)
+    array_format.add_column(InternalName.make("normal_index"), 1, Geom.NT_uint8, Geom.C_index, 10, 1)
+    array_format.add_column(InternalName.make("layer"), 1, Geom.NT_uint8, Geom.C_index, 11, 1)
+    array_format.set_stride(12)
+    return GeomVertexFormat.registerFormat(array_format)
+
+
+PACKED_FORMAT = make_packed_format()
+
+
+def pack_colors(colors):
+    """float 0..1 RGBA tömb -> uint8 RGBA tömb."""
+    return np.clip(np.rint(np.asarray(colors, dtype=np.float32) * 255.0), 0, 255).astype(np.uint8)
+
+
+PACKED_VERTEX_SHADER = """
+#version 150
+
+uniform mat4 p3d_ModelViewProjectionMatrix;
+uniform mat3 p3d_NormalMatrix;
+uniform vec3 normal_table[8];
+
+in vec4 p3d_Vertex;
+in vec4 p3d_Color;
+in float normal_index;
+
+out vec4 v_color;
+out vec3 v_normal;
+
+void main() {
+    gl_Position = p3d_ModelViewProjectionMatrix * p3d_Vertex;
+    v_color = p3d_Color;
+    v_normal = normalize(p3d_NormalMatrix * normal_table[int(normal_index + 0.5)]);
+}
+"""
+
+PACKED_FRAGMENT_SHADER = """
+#version 150
+
+uniform struct p3d_LightModelParameters {
+    vec4 ambient;
+} p3d_LightModel;
+
+uniform struct p3d_LightSourceParameters {
+    vec4 color;
+    vec4 position;
+} p3d_LightSource[1];
+
+in vec4 v_color;
+in vec3 v_normal;
+
+out vec4 p3d_FragColor;
+
+void main() {
+    // Irányfénynél a position a fény felé mutató (view térbeli) irány, w = 0
+    vec3 to_light = normalize(p3d_LightSource[0].position.xyz);
+    float diffuse = max(dot(normalize(v_normal), to_light), 0.0);
+    vec3 light = p3d_LightModel.ambient.rgb + p3d_LightSource[0].color.rgb * diffuse;
+    p3d_FragColor = vec4(v_color.rgb * light, v_color.a);
+}
+"""
+
+PACKED_SHADER = Shader.make(Shader.SL_GLSL, PACKED_VERTEX_SHADER, PACKED_FRAGMENT_SHADER)
+
+# Textúrázott változat: a textúra koordináta a rács pozícióból és a lap normáljából
+# jön (a lapra merőleges tengelyt elhagyva, 1 voxel = 1 textúra ismétlés), így egy
+# több voxelt lefedő greedy quad is voxelenként ismétli a textúrát. A réteg a
+# vertex layer oszlopa; a vertex szín (AO x fény) a texelt szorozza.
+TEXTURED_VERTEX_SHADER = """
+#version 150
+
+uniform mat4 p3d_ModelViewProjectionMatrix;
+uniform mat3 p3d_NormalMatrix;
+uniform vec3 normal_table[8];
+
+in vec4 p3d_Vertex;
+in vec4 p3d_Color;
+in float normal_index;
+in float layer;
+
+out vec4 v_color;
+out vec3 v_normal;
+out vec3 v_texcoord;
+
+void main() {
+    gl_Position = p3d_ModelViewProjectionMatrix * p3d_Vertex;
+    vec3 normal = normal_table[int(normal_index + 0.5)];
+    vec2 uv = abs(normal.z) > 0.5 ? p3d_Vertex.xy : (abs(normal.y) > 0.5 ? p3d_Vertex.xz : p3d_Vertex.yz);
+    v_texcoord = vec3(uv, floor(layer + 0.5));
+    v_color = p3d_Color;
+    v_normal = normalize(p3d_NormalMatrix * normal);
+}
+"""
+
+TEXTURED_FRAGMENT_SHADER = """
+#version 150
+
+uniform sampler2DArray material_textures;
+
+uniform struct p3d_LightModelParameters {
+    vec4 ambient;
+} p3d_LightModel;
+
+uniform struct p3d_LightSourceParameters {
+    vec4 color;
+    vec4 position;
+} p3d_LightSource[1];
+
+in vec4 v_color;
+in vec3 v_normal;
+in vec3 v_texcoord;
+
+out vec4 p3d_FragColor;
+
+void main() {
+    vec4 texel = texture(material_textures, v_texcoord);
+    vec3 to_light = normalize(p3d_LightSource[0].position.xyz);
+    float diffuse = max(dot(normalize(v_normal), to_light), 0.0);
+    vec3 light = p3d_LightModel.ambient.rgb + p3d_LightSource[0].color.rgb * diffuse;
+    p3d_FragColor = vec4(texel.rgb * v_color.rgb * light, texel.a * v_color.a);
+}
+"""
+
+TEXTURED_SHADER = Shader.make(Shader.SL_GLSL, TEXTURED_VERTEX_SHADER, TEXTURED_FRAGMENT_SHADER)
+
+
+def normal_table(normals):
+    """A normal_table shader bemenet; normals: (n, 3), n <= MAX_NORMALS."""
+    table = PTA_LVecBase3f()
+    for i in range(MAX_NORMALS):
+        normal = normals[i] if i < len(normals) else (0, 0, 1)
+        table.push_back(LVecBase3f(*(float(c) for c in normal)))
+    return table
+
+
+def apply_packed_shader(node_path, normals):
+    """A PACKED_SHADER és a normál tábla beállítása egy (al)gráfra; normals: (n, 3), n <= MAX_NORMALS."""
+    node_path.setShader(PACKED_SHADER)
+    node_path.setShaderInput("normal_table", normal_table(normals))
+
+
+def apply_textured_shader(node_path, normals, texture_array):
+    """
+    A TEXTURED_SHADER, a normál tábla és az anyag textúra tömb beállítása egy
+    (al)gráfra. Minden anyag egyetlen textúrában van, így a chunkok között
+    nincs állapotváltás, és egy chunk bármennyi anyaggal egy draw call marad.
+    """
+    node_path.setShader(TEXTURED_SHADER)
+    node_path.setShaderInput("normal_table", normal_table(normals))
+    node_path.setShaderInput("material_textures", texture_array)
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+# Sima terep mesher (Surface Nets) a terep sűrűség mezőjéből.
+# A kocka mesherek mellett ez a mód a voxel középpontokon mintavételezett
+# sűrűség nulla-szintfelületét háromszögeli: minden előjelváltó rács cellába
+# egy közös vertex kerül (a cella éleinek metszéspontjainak átlaga), és minden
+# előjelváltó rács élhez egy quad, ami az élt körülvevő 4 cella vertexeit köti
+# össze. A teljes chunk egyben, NumPy tömbökön és előre számolt
+# táblákon (sarok kód -> metszett élek) készül, Python ciklus nélkül.
+# A normál a sűrűség gradiense a vertex pontjában; a szín az anyagból és a
+# cella levegő sarkainak fényéből jön, mint a kocka mesherekben.
+
+import numpy as np
+
+from VoxelChunk import VOXEL_SIZE, CHUNK_SIZE, AIR
+from VoxelMesher import (
+    CUSTOM_VOXEL_FORMAT, MATERIAL_COLOR_ARRAY, build_chunk_mesh, get_padded_voxels, get_padded_array
+)
+from GeomBuffers import pack_vertex_rows, geom_node_from_packed
+from VoxelLight import FULL_SKY, LIGHT_CURVE, light_level
+from VoxelTerrain import terrain_density
+
+MESHER_SMOOTH = "smooth"  # Surface Nets a sűrűség mezőből (csak CUSTOM_VOXEL_FORMAT)
+
+# Szerkesztett voxelnél (a tömörség eltér a generált mezőtől) ennyi a sűrűség
+EDITED_DENSITY = 0.5
+
+# A cella 8 sarka (x, y, z eltolás); a sarok kód i. bitje az i. sarok tömörsége
+CELL_CORNERS = np.array([(x, y, z) for z in (0, 1) for y in (0, 1) for x in (0, 1)], dtype=np.int64)
+
+# A cella 12 éle sarok index párként (a két végpont pontosan egy tengelyben tér el)
+CELL_EDGES = np.array([(a, b) for a in range(8) for b in range(a + 1, 8)
+                       if np.abs(CELL_CORNERS[a] - CELL_CORNERS[b]).sum() == 1], dtype=np.int64)
+
+
+def make_edge_table():
+    """Sarok kód (0..255) -> 12 bites maszk: mely éleken vált előjelet a sűrűség."""
+    codes = np.arange(256)[:, None]
+    inside = (codes >> np.arange(8)) & 1  # (256, 8)
+    crossed = inside[:, CELL_EDGES[:, 0]] != inside[:, CELL_EDGES[:, 1]]  # (256, 12)
+    return (crossed << np.arange(12)).sum(axis=1).astype(np.uint16)
+
+
+EDGE_TABLE = make_edge_table()
+
+
+class SmoothMesh:
+    """
+    Indexelt, közös vertexű chunk mesh: vertexek (n, 3), normálok (n, 3),
+    színek (n, 4) és háromszög indexek (m * 3,). A ChunkMesh felületét követi
+    (num_vertices, num_triangles, pack, make_geom_node), így a cache, a workerek
+    és a feltöltés ugyanúgy kezelik.
+    """
+
+    def __init__(self, vertices, normals, colors, indices):
+        self.vertices = vertices
+        self.normals = normals
+        self.colors = colors
+        self.indices = indices
+
+    def num_vertices(self):
+        return len(self.vertices)
+
+    def num_triangles(self):
+        return len(self.indices) // 3
+
+    def pack(self, packed=False):
+        """A vertex sorok és a 32 bites indexek bytes-ként (csak CUSTOM_VOXEL_FORMAT)."""
+        if packed:
+            # A tömörített formátum rács sarok pozíciót és 6 lapirány normált tud csak
+            raise ValueError("A smooth mesh nem tárolható tömörített vertex formátumban")
+        rows = pack_vertex_rows(CUSTOM_VOXEL_FORMAT, {
+            'vertex': self.vertices, 'color': self.colors, 'normal': self.normals})
+        return rows.tobytes(), self.indices.astype(np.uint32).tobytes()
+
+    def make_geom_node(self, name, packed=False):
+        return geom_node_from_packed(name, CUSTOM_VOXEL_FORMAT, *self.pack(packed))
+
+
+def chunk_density(chunk, chunk_lookup, world_size=None, seed=0):
+    """
+    A chunk és 1 voxeles kerete (CHUNK_SIZE + 2)^3 sűrűség tömbje. A generált mezőt
+    a tényleges voxelekhez igazítjuk: ahol a szerkesztés miatt a tömörség eltér
+    tőle, ott +-EDITED_DENSITY, így az ásás és az építés is látszik a sima felületen.
+    Visszatérés: (sűrűség, keretes voxel tömb).
+    """
+    padded = get_padded_voxels(chunk, chunk_lookup)
+    x0, y0, z0 = (c * CHUNK_SIZE - 1 for c in chunk.coord)
+    density = terrain_density(x0, y0, z0, CHUNK_SIZE + 2, world_size, seed)
+    solid = padded != AIR
+    agree = (density >= 0.0) == solid
+    density = np.where(agree, density, np.where(solid, EDITED_DENSITY, -EDITED_DENSITY))
+    return density.astype(np.float32), padded
+
+
+def cell_corner_values(grid):
+    """(A, B, C) rács -> (A - 1, B - 1, C - 1, 8) cellánkénti sarok értékek."""
+    a, b, c = (n - 1 for n in grid.shape)
+    return np.stack([grid[x:x + a, y:y + b, z:z + c] for x, y, z in CELL_CORNERS], axis=-1)
+
+
+def surface_net_vertices(density):
+    """
+    Előjelváltó cellák és vertexeik. Visszatérés: (cella maszk (A-1, B-1, C-1),
+    sarok értékek (n, 8), vertex pozíció a cellán belül (n, 3), sarok kódok (n,)).
+    """
+    corners = cell_corner_values(density)
+    codes = ((corners >= 0.0) << np.arange(8)).sum(axis=-1)
+    mask = (codes != 0) & (codes != 255)
+    corners = corners[mask]
+    codes = codes[mask]
+
+    # A metszett élek metszéspontjainak átlaga (lineáris interpolációval az élen)
+    crossed = ((EDGE_TABLE[codes][:, None] >> np.arange(12)) & 1).astype(bool)  # (n, 12)
+    d0 = corners[:, CELL_EDGES[:, 0]]
+    d1 = corners[:, CELL_EDGES[:, 1]]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.where(crossed, d0 / (d0 - d1), 0.0)
+    p0 = CELL_CORNERS[CELL_EDGES[:, 0]]
+    p1 = CELL_CORNERS[CELL_EDGES[:, 1]]
+    points = p0 + t[..., None] * (p1 - p0)  # (n, 12, 3)
+    local = (points * crossed[..., None]).sum(axis=1) / crossed.sum(axis=1)[:, None]
+    return mask, corners, local, codes
+
+
+def trilinear_gradient(corners, local):
+    """A cella sarok értékeiből trilineárisan interpolált mező gradiense a local pontban."""
+    fx, fy, fz = local[:, 0:1], local[:, 1:2], local[:, 2:3]
+    c = corners.reshape(-1, 2, 2, 2)  # [z, y, x] sorrend a CELL_CORNERS miatt
+    dx = c[:, :, :, 1] - c[:, :, :, 0]  # (n, z, y)
+    dy = c[:, :, 1, :] - c[:, :, 0, :]  # (n, z, x)
+    dz = c[:, 1, :, :] - c[:, 0, :, :]  # (n, y, x)
+
+    def bilinear(v, s, t):
+        # v[:, i, j]: i a t, j az s tengely mentén
+        return ((1 - t) * ((1 - s) * v[:, 0, 0:1] + s * v[:, 0, 1:2])
+                + t * ((1 - s) * v[:, 1, 0:1] + s * v[:, 1, 1:2]))
+
+    return np.concatenate([bilinear(dx, fy, fz), bilinear(dy, fx, fz), bilinear(dz, fx, fy)], axis=1)
+
+
+def build_smooth_mesh(chunk, chunk_lookup, world_size=None, seed=0):
+    """
+    Surface Nets mesh a chunk sűrűség mezőjéből. A chunk a [0, CHUNK_SIZE)^3
+    kezdőpontú rács éleket birtokolja, így a szomszéd chunkok quadjai nem fedik
+    egymást; a határ cellák vertexei mindkét oldalon ugyanoda esnek (ugyanaz a mező).
+    """
+    S = CHUNK_SIZE
+    density, padded = chunk_density(chunk, chunk_lookup, world_size, seed)
+    inside = density >= 0.0
+
+    # Vertexek: a (S + 1)^3 cella (alsó sarok -1 .. S - 1) közül az előjelváltók
+    mask, corners, local, codes = surface_net_vertices(density)
+    cells = np.argwhere(mask)  # cella index = alsó sarok + 1
+    vertex_index = np.full(mask.shape, -1, dtype=np.int64)
+    vertex_index[mask] = np.arange(len(cells))
+    positions = (cells - 1 + local) * VOXEL_SIZE
+
+    gradient = trilinear_gradient(corners, local)
+    length = np.linalg.norm(gradient, axis=1, keepdims=True)
+    normals = np.where(length > 1e-9, -gradient / np.maximum(length, 1e-9), (0.0, 0.0, 1.0))
+
+    # Szín: a felszínhez legközelebbi tömör sarok anyaga, a levegő sarkok legnagyobb fényével
+    corner_cells = cells[:, None, :] + CELL_CORNERS[None, :, :]  # keretes index
+    corner_voxels = padded[corner_cells[..., 0], corner_cells[..., 1], corner_cells[..., 2]]
+    nearest = np.argmin(np.where(corners >= 0.0, corners, np.inf), axis=1)
+    materials = corner_voxels[np.arange(len(cells)), nearest]
+    padded_light = get_padded_array(chunk, chunk_lookup, lambda c: c.light, FULL_SKY, True)
+    corner_light = light_level(padded_light[corner_cells[..., 0], corner_cells[..., 1], corner_cells[..., 2]])
+    light = np.where(corners < 0.0, corner_light, 0).max(axis=1)
+    colors = MATERIAL_COLOR_ARRAY[materials].copy()
+    colors[:, :3] *= LIGHT_CURVE[light][:, None]
+
+    # Quadok: a chunk saját rács élei (kezdőpont 0 .. S - 1), amelyeken előjelváltás van.
+    # Ha a tengely menti alsó szomszéd chunk nem létezik (világ széle / alja), a belőle
+    # induló élek is ide tartoznak, különben a felület ott nyitva maradna
+    quads = []
+    for axis in range(3):
+        u, v = (axis + 1) % 3, (axis + 2) % 3
+        below = list(chunk.coord)
+        below[axis] -= 1
+        first = 0 if chunk_lookup(tuple(below)) is not None else -1
+        start = [slice(1, S + 1)] * 3
+        start[axis] = slice(first + 1, S + 1)
+        end = list(start)
+        end[axis] = slice(first + 2, S + 2)
+        start_inside = inside[tuple(start)]
+        crossing = start_inside != inside[tuple(end)]
+        points = np.argwhere(crossing)
+        solid_start = start_inside[points[:, 0], points[:, 1], points[:, 2]]
+        points[:, axis] += first  # rácspont a chunkban (first .. S - 1)
+        if len(points) == 0:
+            continue
+        # Az élt körülvevő 4 cella (u, v) eltolásai CCW sorrendben az axis tengely körül;
+        # a cella index = alsó sarok + 1, az alsó sarok pedig a pont, vagy eggyel kisebb
+        ring = []
+        for du, dv in ((-1, -1), (0, -1), (0, 0), (-1, 0)):
+            cell = points + 1
+            cell[:, u] += du
+            cell[:, v] += dv
+            ring.append(vertex_index[cell[:, 0], cell[:, 1], cell[:, 2]])
+        ring = np.stack(ring, axis=1)
+        # Ha a kezdőpont tömör, a felület normálja +axis irányú; különben megfordítjuk
+        ring = np.where(solid_start[:, None], ring, ring[:, ::-1])
+        quads.append(ring)
+
+    if quads:
+        quads = np.concatenate(quads)
+        indices = quads[:, [0, 1, 2, 0, 2, 3]].ravel()
+    else:
+        indices = np.zeros(0, dtype=np.int64)
+
+    # Csak a quadokban használt vertexek maradnak (a keret cellák egy része nem kell)
+    used = np.zeros(len(cells), dtype=bool)
+    used[indices] = True
+    remap = np.cumsum(used) - 1
+    return SmoothMesh(positions[used].astype(np.float32), normals[used].astype(np.float32),
+                      colors[used], remap[indices].astype(np.uint32))
+
+
+def build_mesh(chunk, chunk_lookup, mode, world_size=None, seed=0):
+    """
+    A mesher mód szerinti chunk mesh: MESHER_SMOOTH esetén Surface Nets a
+    (world_size, seed) terep sűrűség mezőjéből, különben build_chunk_mesh().
+    """
+    if mode == MESHER_SMOOTH:
+        return build_smooth_mesh(chunk, chunk_lookup, world_size, seed)
+    return build_chunk_mesh(chunk, chunk_lookup, mode)
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+# Kinematikus karakter vezérlő közvetlenül a voxel tömbökön (Panda3D ütközés nélkül).
+# A karakter egy tengelyhez igazított doboz (AABB); a mozgást tengelyenként
+# söpörjük végig a rácson: csak az elmozdulás által érintett cellarétegeket
+# kérdezzük le, így a frame-enkénti költség a doboz méretétől és a sebességtől
+# függ, a világ méretétől nem. Vízszintes ütközésnél a talajon álló karakter
+# step_height magasságig fellép (lépcső, domboldal).
+# A voxel középpontok egész koordinátán vannak (mint a VoxelRaycast-ban), ezért
+# a számítás a +0.5-tel eltolt rácsban történik, ahol az i. cella az [i, i + 1) tartomány.
+
+import math
+
+import numpy as np
+
+from VoxelChunk import VOXEL_SIZE, AIR
+
+EPSILON = 1e-6  # Érintkező (de át nem fedő) lapok tűrése rács egységben
+
+
+class CharacterController:
+    """
+    lookup_array(cells) -> anyag id tömb, cells: (N, 3) globális voxel index
+    (pl. VoxelWorld.get_voxels); minden nem-levegő voxel tömör.
+    position: a doboz alsó lapjának közepe (a "talp") világkoordinátában.
+    radius, height: a doboz fél szélessége és magassága világegységben.
+    """
+
+    def __init__(self, lookup_array, position, radius=0.3, height=1.8, step_height=1.0,
+                 gravity=-25.0, jump_speed=8.5, max_fall_speed=50.0):
+        self.lookup_array = lookup_array
+        self.position = [float(c) for c in position]
+        self.velocity = [0.0, 0.0, 0.0]
+        self.radius = radius
+        self.height = height
+        self.step_height = step_height
+        self.gravity = gravity
+        self.jump_speed = jump_speed
+        self.max_fall_speed = max_fall_speed
+        self.on_ground = False
+
+    # --- DOBOZ A RÁCSBAN ---
+
+    def grid_box(self):
+        """A doboz (lo, hi) sarka a +0.5-tel eltolt rácsban (rács egységben)."""
+        x, y, z = (c / VOXEL_SIZE + 0.5 for c in self.position)
+        r = self.radius / VOXEL_SIZE
+        return [x - r, y - r, z], [x + r, y + r, z + self.height / VOXEL_SIZE]
+
+    def translate(self, axis, distance):
+        """A karakter eltolása rács egységben."""
+        self.position[axis] += distance * VOXEL_SIZE
+
+    def sweep(self, lo, hi, axis, delta):
+        """
+        A (lo, hi) doboz söprése az axis tengely mentén delta rács egységgel.
+        Visszatérés: (megtehető elmozdulás, ütközött-e). Csak a doboz elülső
+        lapja előtti, delta által érintett cellarétegeket kérdezzük le, egyben.
+        """
+        if delta == 0.0:
+            return 0.0, False
+        others = [k for k in range(3) if k != axis]
+        spans = [np.arange(math.floor(lo[k] + EPSILON), math.ceil(hi[k] - EPSILON)) for k in others]
+        if delta > 0.0:
+            layers = np.arange(math.ceil(hi[axis] - EPSILON), math.ceil(hi[axis] + delta - EPSILON))
+        else:
+            layers = np.arange(math.floor(lo[axis] + EPSILON) - 1,
+                               math.floor(lo[axis] + delta + EPSILON) - 1, -1)
+        if len(layers) == 0:
+            return delta, False
+
+        grids = [None, None, None]
+        grids[axis] = layers[:, None, None]
+        grids[others[0]] = spans[0][None, :, None]
+        grids[others[1]] = spans[1][None, None, :]
+        cells = np.stack(np.broadcast_arrays(*grids), axis=-1).reshape(-1, 3)
+        solid = (self.lookup_array(cells) != AIR).reshape(len(layers), -1).any(axis=1)
+        if not solid.any():
+            return delta, False
+
+        # Az első tömör réteg lapjáig mehetünk (visszafelé sosem)
+        layer = int(layers[np.argmax(solid)])
+        if delta > 0.0:
+            return max(min(layer - hi[axis], delta), 0.0), True
+        return min(max(layer + 1 - lo[axis], delta), 0.0), True
+
+    def move_axis(self, axis, delta):
+        """Elmozdulás egy tengely mentén; visszatérés: (megtett út, ütközött-e)."""
+        lo, hi = self.grid_box()
+        moved, hit = self.sweep(lo, hi, axis, delta)
+        self.translate(axis, moved)
+        return moved, hit
+
+    def step_up(self, axis, delta, blocked_move):
+        """
+        Fellépés kísérlete egy vízszintesen akadályozott lépésnél: a doboz felemelése
+        (legfeljebb step_height), vízszintes söprés, majd visszaengedés a lépcsőre.
+        Csak akkor marad érvényben, ha így tovább jutunk, mint a sima lépéssel.
+        """
+        saved = list(self.position)
+        raised, _ = self.move_axis(2, self.step_height / VOXEL_SIZE)
+        moved, _ = self.move_axis(axis, delta)
+        if abs(moved) <= abs(blocked_move) + EPSILON:
+            self.position = saved
+            return False
+        self.move_axis(2, -raised)
+        return True
+
+    # --- FRAME-ENKÉNTI FRISSÍTÉS ---
+
+    def update(self, dt, move_x=0.0, move_y=0.0, jump=False):
+        """
+        Egy szimulációs lépés. move_x, move_y: a kívánt vízszintes sebesség
+        (világegység / s); jump: ugrás, ha a karakter a talajon áll.
+        """
+        vz = max(self.velocity[2] + self.gravity * dt, -self.max_fall_speed)
+        if jump and self.on_ground:
+            vz = self.jump_speed
+
+        # Függőleges mozgás: talaj / plafon érzékelése
+        moved, hit = self.move_axis(2, vz * dt / VOXEL_SIZE)
+        self.on_ground = hit and vz < 0.0
+        if hit:
+            vz = 0.0
+
+        # Vízszintes mozgás tengelyenként, fellépéssel
+        for axis, speed in ((0, move_x), (1, move_y)):
+            delta = speed * dt / VOXEL_SIZE
+            lo, hi = self.grid_box()
+            moved, hit = self.sweep(lo, hi, axis, delta)
+            if hit and self.on_ground and self.step_height > 0.0 and self.step_up(axis, delta, moved):
+                continue
+            self.translate(axis, moved)
+
+        self.velocity = [move_x, move_y, vz]
+        return self.position
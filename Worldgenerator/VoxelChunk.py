@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+# Voxel chunk adattárolás a kocka világhoz.
+# A világ CHUNK_SIZE^3 méretű darabokra (chunk) van osztva, minden chunk
+# egy sűrű (dense) NumPy tömbben tárolja a blokkok anyag azonosítóját;
+# a nem szerkesztett chunkok paletta + oszloponkénti RLE alakba tömöríthetők.
+
+from panda3d.core import LColor
+import numpy as np
+
+# --- ALAP BEÁLLÍTÁSOK ---
+
+VOXEL_SIZE = 1.0  # Egy kocka mérete
+HALF_VOXEL = VOXEL_SIZE / 2.0
+
+CHUNK_SIZE = 16  # Egy chunk élhossza voxelben (16x16x16)
+
+# --- ANYAGOK (MATERIAL ID-K) ---
+
+# A 0-s azonosító mindig a levegő, a többi egy-egy színt jelöl.
+AIR = 0
+STONE = 1
+DIRT = 2
+WATER = 3
+GRASS = 4
+MOUNTAIN = 5
+SNOW = 6
+LAMP = 7  # Fényforrás (blokk fényt bocsát ki, lásd VoxelLight.LIGHT_EMISSION)
+
+# Anyag azonosító -> szín táblázat (a levegőnek nincs színe)
+MATERIAL_COLORS = [
+    None,                          # AIR
+    LColor(0.5, 0.5, 0.5, 1),      # STONE - Szürke (kő)
+    LColor(0.4, 0.25, 0.05, 1),    # DIRT - Sötétbarna (föld)
+    LColor(0.1, 0.4, 0.9, 1),      # WATER - Víz (kék)
+    LColor(0.3, 0.8, 0.3, 1),      # GRASS - Fű/Síkság (világos zöld)
+    LColor(0.6, 0.5, 0.4, 1),      # MOUNTAIN - Hegyoldal (szürke-barna)
+    LColor(1.0, 1.0, 1.0, 1),      # SNOW - Csúcs/Hó (tiszta fehér)
+    LColor(1.0, 0.85, 0.4, 1),     # LAMP - Lámpa (meleg sárga)
+]
+
+
+def surface_material(height):
+    """Magasság alapján adja meg a legfelső blokk anyagát (biómok)."""
+    if height < 3:
+        return WATER
+    elif height < 7:
+        return GRASS
+    elif height < 12:
+        return MOUNTAIN
+    else:
+        return SNOW
+
+
+# Vektorizált változat: a küszöbök és a hozzájuk tartozó felszíni anyagok
+SURFACE_THRESHOLDS = np.array([3, 7, 12])
+SURFACE_MATERIALS = np.array([WATER, GRASS, MOUNTAIN, SNOW], dtype=np.uint8)
+
+
+def surface_material_array(heights):
+    """surface_material() egy teljes magasságtérképre (NumPy tömbre) egyszerre."""
+    return SURFACE_MATERIALS[np.searchsorted(SURFACE_THRESHOLDS, heights, side='right')]
+
+
+def column_material(z_idx, height_blocks):
+    """Egy oszlop z_idx szintjén lévő blokk anyaga (kő / föld / felszín)."""
+    if z_idx == 0:
+        return STONE
+    elif z_idx == height_blocks - 1:
+        return surface_material(height_blocks)
+    else:
+        return DIRT
+
+
+def chunk_coord(x_idx, y_idx, z_idx):
+    """Globális voxel koordinátából a tartalmazó chunk koordinátája."""
+    return (x_idx // CHUNK_SIZE, y_idx // CHUNK_SIZE, z_idx // CHUNK_SIZE)
+
+
+def local_coord(x_idx, y_idx, z_idx):
+    """Globális voxel koordinátából a chunkon belüli (lokális) koordináta."""
+    return (x_idx % CHUNK_SIZE, y_idx % CHUNK_SIZE, z_idx % CHUNK_SIZE)
+
+
+# --- TÖMÖRÍTETT (PALETTA + RLE) TÁROLÁS ---
+
+# Egy futás kezdő z koordinátájának bitjei (a felső bitek a paletta index)
+assert CHUNK_SIZE & (CHUNK_SIZE - 1) == 0, "A futás kódolás 2-hatvány CHUNK_SIZE-t feltételez"
+RUN_Z_BITS = (CHUNK_SIZE - 1).bit_length()
+RUN_Z_MASK = CHUNK_SIZE - 1
+
+class CompressedVoxels:
+    """
+    Egy chunk voxelei palettával és függőleges oszloponkénti futáshossz kódolással.
+    palette: a chunkban előforduló anyag id-k (a MATERIAL_COLORS indexei).
+    runs: az (x, y) oszlopok z menti futásai sorban (i = x * CHUNK_SIZE + y),
+    futásonként (paletta index << RUN_Z_BITS) | kezdő z egy uint8-ban (ha nem fér
+    el, uint16-ban). Minden oszlop első futása z = 0-nál kezdődik, így az
+    oszlophatárok a futásokból is visszanyerhetők; a pontszerű lekérdezésekhez
+    (get, empty_box) az oszlopok első futásának indexét egyszer kiszámoljuk
+    (column_runs). A kő / föld / felszín / levegő oszlop így 4 byte a 16 helyett,
+    az egynemű (pl. csupa levegő) oszlop 1 byte.
+    """
+
+    def __init__(self, voxels):
+        S = CHUNK_SIZE
+        self.palette, local = np.unique(voxels, return_inverse=True)
+        columns = local.reshape(S * S, S)
+        change = np.ones((S * S, S), dtype=bool)
+        change[:, 1:] = columns[:, 1:] != columns[:, :-1]
+        flat_starts = np.flatnonzero(change)
+        run_dtype = np.uint8 if len(self.palette) << RUN_Z_BITS <= 256 else np.uint16
+        self.runs = ((columns.ravel()[flat_starts] << RUN_Z_BITS) | (flat_starts % S)).astype(run_dtype)
+        # Az oszlopok első futásának indexe a runs tömbben
+        run_counts = change.sum(axis=1)
+        self.column_runs = (np.cumsum(run_counts) - run_counts).astype(np.uint16)
+        self.dtype = voxels.dtype
+
+    def nbytes(self):
+        return self.palette.nbytes + self.runs.nbytes + self.column_runs.nbytes
+
+    def run_materials(self):
+        return self.palette[self.runs >> RUN_Z_BITS]
+
+    def flat_starts(self):
+        """A futások kezdete a laposított (x, y, z) tömbben."""
+        run_z = (self.runs & RUN_Z_MASK).astype(np.int64)
+        columns = np.cumsum(run_z == 0) - 1
+        return columns * CHUNK_SIZE + run_z
+
+    def run_lengths(self, starts):
+        return np.diff(np.append(starts, CHUNK_SIZE ** 3))
+
+    def decode(self):
+        """A sűrű (CHUNK_SIZE^3) anyag tömb visszaállítása."""
+        starts = self.flat_starts()
+        flat = np.repeat(self.run_materials(), self.run_lengths(starts))
+        return flat.reshape(CHUNK_SIZE, CHUNK_SIZE, CHUNK_SIZE).astype(self.dtype)
+
+    def get_many(self, lx, ly, lz):
+        """Voxelek anyaga lokális koordináta tömbökkel, kitömörítés nélkül (bináris keresés)."""
+        positions = (np.asarray(lx) * CHUNK_SIZE + ly) * CHUNK_SIZE + lz
+        runs = np.searchsorted(self.flat_starts(), positions, side='right') - 1
+        return self.run_materials()[runs]
+
+    def find_run(self, lx, ly, lz):
+        """(futás index, a futás utáni első z) a voxelt tartalmazó futásra."""
+        # Az oszlop futásai: a column_runs[lx * CHUNK_SIZE + ly] indexűtől a következő oszlopéig
+        column = lx * CHUNK_SIZE + ly
+        run = int(self.column_runs[column])
+        last = int(self.column_runs[column + 1]) - 1 if column + 1 < len(self.column_runs) \
+            else len(self.runs) - 1
+        while run < last and int(self.runs[run + 1]) & RUN_Z_MASK <= lz:
+            run += 1
+        end = int(self.runs[run + 1]) & RUN_Z_MASK if run < last else CHUNK_SIZE
+        return run, end
+
+    def get(self, lx, ly, lz):
+        run, _ = self.find_run(lx, ly, lz)
+        return int(self.palette[self.runs[run] >> RUN_Z_BITS])
+
+    def empty_box(self, lx, ly, lz):
+        """Ha a voxel levegő, a tartalmazó levegő futás (lo, hi) zárt doboza, különben None."""
+        run, end = self.find_run(lx, ly, lz)
+        if self.palette[self.runs[run] >> RUN_Z_BITS] != AIR:
+            return None
+        return (lx, ly, int(self.runs[run]) & RUN_Z_MASK), (lx, ly, end - 1)
+
+    def materials(self):
+        return self.palette
+
+    def solid_count(self):
+        lengths = self.run_lengths(self.flat_starts())
+        return int(lengths[self.run_materials() != AIR].sum())
+
+
+class VoxelChunk:
+    """
+    Egy CHUNK_SIZE^3 méretű világrész.
+    A voxels tömb indexelése: voxels[x, y, z] (lokális koordináták).
+    """
+
+    def __init__(self, coord):
+        self.coord = coord
+        self.dense = np.zeros((CHUNK_SIZE, CHUNK_SIZE, CHUNK_SIZE), dtype=np.uint8)
+        # Tömörített alak (CompressedVoxels); ha be van állítva, a dense tömb None
+        self.compressed = None
+        # Voxelenkénti fényszint (VoxelLight: ég fény << 4 | blokk fény), ugyanígy
+        # sűrű vagy tömörített alakban; mindkettő None, amíg a chunk nincs megvilágítva
+        self.light_dense = None
+        self.light_compressed = None
+        # A chunk teljes geometriáját tartalmazó NodePath (egy GeomNode)
+        self.node_path = None
+        # Az aktuális mesh mérete (statisztikához és memória becsléshez)
+        self.mesh_vertices = 0
+        self.mesh_triangles = 0
+        self.mesh_bytes = 0
+
+    def origin(self):
+        """A chunk (0, 0, 0) lokális voxeljének világkoordinátája."""
+        cx, cy, cz = self.coord
+        return (cx * CHUNK_SIZE * VOXEL_SIZE,
+                cy * CHUNK_SIZE * VOXEL_SIZE,
+                cz * CHUNK_SIZE * VOXEL_SIZE)
+
+    @property
+    def voxels(self):
+        """A sűrű anyag tömb; tömörített chunknál az első hozzáféréskor kitömörítjük."""
+        if self.dense is None:
+            self.dense = self.compressed.decode()
+            self.compressed = None
+        return self.dense
+
+    @voxels.setter
+    def voxels(self, voxels):
+        self.dense = voxels
+        self.compressed = None
+        # Új voxel tartalom: a régi fény érvénytelen, újra kell számolni
+        self.light = None
+
+    @property
+    def light(self):
+        """A sűrű fény tömb, vagy None, ha a chunk még nincs megvilágítva."""
+        if self.light_dense is None and self.light_compressed is not None:
+            self.light_dense = self.light_compressed.decode()
+            self.light_compressed = None
+        return self.light_dense
+
+    @light.setter
+    def light(self, light):
+        self.light_dense = light
+        self.light_compressed = None
+
+    def is_lit(self):
+        return self.light_dense is not None or self.light_compressed is not None
+
+    def compress(self, codec=CompressedVoxels):
+        """
+        A sűrű tömb cseréje tömörített alakra (amíg valaki újra nem kéri a voxels-t).
+        codec: CompressedVoxels (paletta + RLE) vagy VoxelOctree (ritka oktális fa).
+        A fény tömb mindig paletta + RLE alakba kerül (oszloponként jellemzően 2 futás).
+        """
+        if self.dense is not None:
+            self.compressed = codec(self.dense)
+            self.dense = None
+        if self.light_dense is not None:
+            self.light_compressed = CompressedVoxels(self.light_dense)
+            self.light_dense = None
+
+    def is_compressed(self):
+        return self.dense is None
+
+    def get(self, lx, ly, lz):
+        if self.dense is None:
+            return self.compressed.get(lx, ly, lz)
+        return int(self.dense[lx, ly, lz])
+
+    def get_many(self, lx, ly, lz):
+        """Több voxel anyaga lokális koordináta tömbökkel (tömörített chunkot sem bont ki)."""
+        if self.dense is None:
+            return self.compressed.get_many(lx, ly, lz)
+        return self.dense[lx, ly, lz]
+
+    def set(self, lx, ly, lz, material):
+        self.voxels[lx, ly, lz] = material
+
+    def palette(self):
+        """A chunkban előforduló anyagok és színeik: [(anyag id, LColor), ...]."""
+        materials = self.compressed.materials() if self.dense is None else np.unique(self.dense)
+        return [(int(m), MATERIAL_COLORS[m]) for m in materials]
+
+    def empty_box(self, lx, ly, lz):
+        """
+        Ha a voxel levegő, a tartalmazó egynemű levegő tartomány (lo, hi) zárt doboza
+        lokális koordinátában (sugárvetésnél ezt egy lépésben át lehet ugrani), különben None.
+        """
+        if self.dense is None:
+            return self.compressed.empty_box(lx, ly, lz)
+        if self.dense[lx, ly, lz] != AIR:
+            return None
+        return (lx, ly, lz), (lx, ly, lz)
+
+    def is_empty(self):
+        if self.dense is None:
+            return bool((self.compressed.materials() == AIR).all())
+        return not self.dense.any()
+
+    def solid_count(self):
+        if self.dense is None:
+            return self.compressed.solid_count()
+        return int(np.count_nonzero(self.dense))
+
+    def set_mesh_stats(self, num_vertices, num_triangles, vertex_stride):
+        self.mesh_vertices = num_vertices
+        self.mesh_triangles = num_triangles
+        self.mesh_bytes = num_vertices * vertex_stride + num_triangles * 3 * 4
+
+    def remove_node(self):
+        """A chunk GeomNode-jának levétele a jelenetgráfról (az adat megmarad)."""
+        if self.node_path is not None:
+            self.node_path.removeNode()
+            self.node_path = None
+        self.set_mesh_stats(0, 0, 0)
+
+    def voxel_bytes(self):
+        """A voxel adat memóriája (sűrű tömb vagy paletta + RLE)."""
+        if self.dense is None:
+            return self.compressed.nbytes()
+        return self.dense.nbytes
+
+    def light_bytes(self):
+        if self.light_compressed is not None:
+            return self.light_compressed.nbytes()
+        return self.light_dense.nbytes if self.light_dense is not None else 0
+
+    def memory_bytes(self):
+        """Becsült memória: voxel és fény adat + a mesh vertex és index bufferei."""
+        return self.voxel_bytes() + self.light_bytes() + self.mesh_bytes
+
+    def fill_from_heights(self, heights):
+        """
+        A chunk kitöltése egy (CHUNK_SIZE, CHUNK_SIZE) magasságtérkép csempéből,
+        ugyanazzal a szabállyal, mint column_material(), de ciklusok nélkül.
+        """
+        z = self.coord[2] * CHUNK_SIZE + np.arange(CHUNK_SIZE)
+        h = heights[:, :, None]
+        materials = np.where(z == h - 1, surface_material_array(heights)[:, :, None], DIRT)
+        materials = np.where(z == 0, STONE, materials)
+        self.voxels[:] = np.where(z < h, materials, AIR)
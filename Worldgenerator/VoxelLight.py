@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+# Voxel fényterjedés: ég fény (skylight) és blokk fény (pl. lámpa), 0..15 szintekkel.
+# Voxelenként egy uint8: a felső 4 bit az ég fény, az alsó 4 bit a blokk fény.
+# Az ég fény oszloponként felülről lefelé csillapítás nélkül ér le az első nem
+# levegő voxelig, onnan (és a blokk fény minden irányban) lépésenként 1-et veszít.
+# A terjedés szélességi bejárás (BFS), de nem voxelenként, hanem hullámfrontonként
+# NumPy tömbökön. Szerkesztés után csak a környéket számoljuk újra: az eltávolító
+# sor kioltja a régi fényt, a hozzáadó sor a megmaradt forrásokból visszatölti.
+# A fény származtatott adat (a voxelekből bármikor újraszámolható), ezért nem
+# kerül a lemez cache-be; a mesher a vertex színbe süti.
+
+import numpy as np
+
+from VoxelChunk import CHUNK_SIZE, AIR, LAMP, chunk_coord
+
+MAX_LIGHT = 15
+SKY_SHIFT = 4
+BLOCK_MASK = 0x0F
+FULL_SKY = MAX_LIGHT << SKY_SHIFT  # Nyílt ég alatti levegő, blokk fény nélkül
+
+# Anyag azonosító -> kibocsátott blokk fény szint
+LIGHT_EMISSION = np.zeros(256, dtype=np.uint8)
+LIGHT_EMISSION[LAMP] = 14
+
+# Fényszint -> fényerő szorzó a vertex színben (szintenként LIGHT_FALLOFF-szoros)
+LIGHT_FALLOFF = 0.8
+MIN_BRIGHTNESS = 0.08
+LIGHT_CURVE = np.maximum(LIGHT_FALLOFF ** (MAX_LIGHT - np.arange(MAX_LIGHT + 1)),
+                         MIN_BRIGHTNESS).astype(np.float32)
+
+# Szerkesztésnél ennyi voxellel nagyobb környéket számolunk újra (a fény
+# legfeljebb MAX_LIGHT lépést tesz meg, a +1 réteg a változatlan forrásoké)
+RELIGHT_MARGIN = MAX_LIGHT + 1
+
+# A 6 szomszéd irány; az ég fény DOWN irányban csillapítás nélkül terjed
+NEIGHBOR_OFFSETS = [(1, 0, 0), (-1, 0, 0), (0, 1, 0), (0, -1, 0), (0, 0, 1), (0, 0, -1)]
+DOWN = 5
+
+
+def light_level(light):
+    """A megjelenítendő fényszint: az ég és a blokk fény közül a nagyobb."""
+    return np.maximum(light >> SKY_SHIFT, light & BLOCK_MASK)
+
+
+# --- BFS EGY FÉNYCSATORNÁN (LAPOSÍTOTT TÖMBÖKÖN) ---
+
+def propagate(channel, transparent, frontier, strides, sky):
+    """
+    Hozzáadó sor: a frontier cellák (laposított indexek) fényének szétterjesztése.
+    channel: a csatorna szintjei (uint8, módosul), transparent: a fényt átengedő
+    cellák; a kötet szélén egy zárt keret van, így a szomszéd index sosem lóg ki.
+    """
+    while len(frontier):
+        reached = []
+        for direction, stride in enumerate(strides):
+            levels = channel[frontier].astype(np.int16)
+            target = frontier + stride
+            new = levels - 1
+            if sky and direction == DOWN:
+                new = np.where(levels == MAX_LIGHT, MAX_LIGHT, new)
+            brighter = transparent[target] & (channel[target] < new)
+            target = target[brighter]
+            channel[target] = new[brighter]
+            reached.append(target)
+        frontier = np.unique(np.concatenate(reached))
+
+
+def unpropagate(channel, transparent, seeds, strides, sky):
+    """
+    Eltávolító sor: a seeds cellák fényének és a belőlük származó (halványabb)
+    fénynek a kioltása. Visszatérés: a határon talált, legalább olyan erős
+    cellák, amelyekből a propagate() a kioltott részt újra feltölti.
+    """
+    levels = channel[seeds].astype(np.int16)
+    channel[seeds] = 0
+    frontier = seeds
+    relight = []
+    while len(frontier):
+        next_cells, next_levels = [], []
+        for direction, stride in enumerate(strides):
+            target = frontier + stride
+            current = channel[target].astype(np.int16)
+            lit = current != 0
+            dimmer = current < levels
+            if sky and direction == DOWN:
+                # A lefelé csillapítatlan ég fény is ebből a forrásból jöhetett
+                dimmer |= (levels == MAX_LIGHT) & (current == MAX_LIGHT)
+            # Az átlátszatlan, világító cella (lámpa) sosem oltódik ki, az is forrás marad
+            remove = lit & dimmer & transparent[target]
+            relight.append(target[lit & ~remove])
+            next_cells.append(target[remove])
+            next_levels.append(current[remove])
+            channel[target[remove]] = 0
+        frontier = np.concatenate(next_cells)
+        levels = np.concatenate(next_levels)
+    return np.unique(np.concatenate(relight)) if relight else seeds[:0]
+
+
+# --- VILÁG DOBOZ (CHUNKOKBÓL ÖSSZERAKVA) ---
+
+class LightVolume:
+    """
+    A lo..hi (zárt, globális voxel index) doboz voxelei és fénye, egy 1 cellás
+    zárt kerettel. A hiányzó chunkok levegőnek és nyílt ég alattinak számítanak.
+    """
+
+    def __init__(self, chunks, lo, hi, with_light=True):
+        self.lo = np.array(lo, dtype=np.int64)
+        self.hi = np.array(hi, dtype=np.int64)
+        self.shape = tuple(int(n) for n in self.hi - self.lo + 3)
+        voxels = np.full(self.shape, AIR, dtype=np.uint8)
+        self.light = np.full(self.shape, FULL_SKY, dtype=np.uint8)
+        for chunk, inner, local in self.chunk_regions(chunks, lo, hi):
+            voxels[inner] = chunk.voxels[local]
+            if with_light and chunk.is_lit():
+                self.light[inner] = chunk.light[local]
+
+        self.voxels = voxels.ravel()
+        self.transparent = (voxels == AIR)
+        self.transparent[[0, -1], :, :] = False
+        self.transparent[:, [0, -1], :] = False
+        self.transparent[:, :, [0, -1]] = False
+        self.transparent = self.transparent.ravel()
+        self.light[[0, -1], :, :] = 0
+        self.light[:, [0, -1], :] = 0
+        self.light[:, :, [0, -1]] = 0
+        self.light = self.light.ravel()
+        sy, sz = self.shape[1] * self.shape[2], self.shape[2]
+        self.strides = [dx * sy + dy * sz + dz for dx, dy, dz in NEIGHBOR_OFFSETS]
+
+    def chunk_regions(self, chunks, lo, hi):
+        """(chunk, kötet szelet, chunk lokális szelet) a lo..hi dobozt metsző chunkokra."""
+        chunk_lo, chunk_hi = chunk_coord(*lo), chunk_coord(*hi)
+        for cx in range(chunk_lo[0], chunk_hi[0] + 1):
+            for cy in range(chunk_lo[1], chunk_hi[1] + 1):
+                for cz in range(chunk_lo[2], chunk_hi[2] + 1):
+                    chunk = chunks.get((cx, cy, cz))
+                    if chunk is None:
+                        continue
+                    origin = (cx * CHUNK_SIZE, cy * CHUNK_SIZE, cz * CHUNK_SIZE)
+                    g_lo = [max(lo[k], origin[k]) for k in range(3)]
+                    g_hi = [min(hi[k], origin[k] + CHUNK_SIZE - 1) for k in range(3)]
+                    inner = tuple(slice(g_lo[k] - self.lo[k] + 1, g_hi[k] - self.lo[k] + 2)
+                                  for k in range(3))
+                    local = tuple(slice(g_lo[k] - origin[k], g_hi[k] - origin[k] + 1)
+                                  for k in range(3))
+                    yield chunk, inner, local
+
+    def box_cells(self, lo, hi):
+        """A lo..hi globális doboz (a kötetre vágva) celláinak laposított indexei."""
+        lo = np.maximum(np.array(lo) - self.lo, 0) + 1
+        hi = np.minimum(np.array(hi) - self.lo, self.hi - self.lo) + 1
+        if (hi < lo).any():
+            return np.zeros(0, dtype=np.int64)
+        axes = [np.arange(lo[k], hi[k] + 1) for k in range(3)]
+        grid = np.meshgrid(*axes, indexing="ij")
+        return np.ravel_multi_index([g.ravel() for g in grid], self.shape)
+
+    def channels(self):
+        return (self.light >> SKY_SHIFT).astype(np.uint8), (self.light & BLOCK_MASK).astype(np.uint8)
+
+    def set_channels(self, sky, block):
+        self.light = ((sky << SKY_SHIFT) | block).astype(np.uint8)
+
+    def emitters(self, cells=None):
+        """Fényforrás cellák (az összes, vagy a cells közül) és a kibocsátásuk."""
+        if cells is None:
+            cells = np.flatnonzero(LIGHT_EMISSION[self.voxels])
+        else:
+            cells = cells[LIGHT_EMISSION[self.voxels[cells]] > 0]
+        return cells, LIGHT_EMISSION[self.voxels[cells]]
+
+    def compute(self):
+        """Teljes megvilágítás: ég fény oszloponként felülről, majd BFS mindkét csatornán."""
+        open_cells = self.transparent.reshape(self.shape)[1:-1, 1:-1, 1:-1]
+        # Egy cella az ég alatt van, ha felette (a kötet tetejéig) minden cella levegő
+        under_sky = np.logical_and.accumulate(open_cells[:, :, ::-1], axis=2)[:, :, ::-1]
+        sky = np.zeros(self.shape, dtype=np.uint8)
+        sky[1:-1, 1:-1, 1:-1] = np.where(under_sky, MAX_LIGHT, 0)
+        sky = sky.ravel()
+        block = np.zeros_like(sky)
+        cells, emission = self.emitters()
+        block[cells] = emission
+
+        propagate(sky, self.transparent, np.flatnonzero(sky), self.strides, True)
+        propagate(block, self.transparent, cells, self.strides, False)
+        self.set_channels(sky, block)
+
+    def relight(self, lo, hi):
+        """
+        Növekményes frissítés a lo..hi doboz szerkesztése után (a voxelek már az újak,
+        a fény még a régi): a doboz fényének kioltása, majd visszatöltése a
+        szomszédokból és az új fényforrásokból.
+        """
+        seeds = self.box_cells(lo, hi)
+        sky, block = self.channels()
+        for channel, is_sky in ((sky, True), (block, False)):
+            relight = unpropagate(channel, self.transparent, seeds, self.strides, is_sky)
+            frontier = [relight]
+            if not is_sky:
+                cells, emission = self.emitters(seeds)
+                channel[cells] = emission
+                frontier.append(cells)
+            propagate(channel, self.transparent, np.unique(np.concatenate(frontier)),
+                      self.strides, is_sky)
+        self.set_channels(sky, block)
+
+    def store(self, chunks, lo, hi):
+        """
+        A lo..hi doboz fényének visszaírása a chunkokba. Visszatérés: azon chunkok
+        koordinátái, amelyek mesh-ét a változás érinti (a változott cellák chunkja,
+        és a lapszomszéd chunk, ha a cella a határán van).
+        """
+        light = self.light.reshape(self.shape)
+        changed = set()
+        for chunk, inner, local in self.chunk_regions(chunks, lo, hi):
+            new = light[inner]
+            if not chunk.is_lit():
+                chunk.light = np.full((CHUNK_SIZE,) * 3, FULL_SKY, dtype=np.uint8)
+            elif np.array_equal(chunk.light[local], new):
+                continue
+            else:
+                cells = np.argwhere(chunk.light[local] != new) + [s.start for s in local]
+                for offset in [(0, 0, 0)] + NEIGHBOR_OFFSETS:
+                    moved = (cells + offset) // CHUNK_SIZE
+                    for delta in np.unique(moved, axis=0):
+                        changed.add(tuple(int(c) for c in np.add(chunk.coord, delta)))
+            chunk.light[local] = new
+        return {coord for coord in changed if coord in chunks}
+
+
+# --- VILÁG SZINTŰ MŰVELETEK ---
+
+def column_top(chunks, c_lo, c_hi):
+    """A c_lo..c_hi oszlop tartomány legfelső chunkjának teteje (voxel z), + 1 levegő réteg."""
+    top = 0
+    for cx, cy, cz in chunks:
+        if c_lo[0] <= cx <= c_hi[0] and c_lo[1] <= cy <= c_hi[1]:
+            top = max(top, (cz + 1) * CHUNK_SIZE)
+    return top
+
+
+def light_columns(chunks, c_lo, c_hi, context=1):
+    """
+    A c_lo..c_hi (zárt) chunk oszlop tartomány összes chunkjának teljes megvilágítása.
+    context: ennyi szomszéd oszlop is a kötetbe kerül (csak olvasásra), hogy a
+    szomszédból átszűrődő fény is meglegyen.
+    """
+    area_lo = (c_lo[0] - context, c_lo[1] - context)
+    area_hi = (c_hi[0] + context, c_hi[1] + context)
+    top = column_top(chunks, area_lo, area_hi)
+    lo = (area_lo[0] * CHUNK_SIZE, area_lo[1] * CHUNK_SIZE, 0)
+    hi = ((area_hi[0] + 1) * CHUNK_SIZE - 1, (area_hi[1] + 1) * CHUNK_SIZE - 1, top)
+    volume = LightVolume(chunks, lo, hi, with_light=False)
+    volume.compute()
+    volume.store(chunks, (c_lo[0] * CHUNK_SIZE, c_lo[1] * CHUNK_SIZE, 0),
+                 ((c_hi[0] + 1) * CHUNK_SIZE - 1, (c_hi[1] + 1) * CHUNK_SIZE - 1, top))
+
+
+def ensure_lit(chunks, c_lo, c_hi):
+    """A c_lo..c_hi oszlopok közül a még meg nem világított chunkúak megvilágítása."""
+    columns = {coord[:2] for coord, chunk in chunks.items()
+               if c_lo[0] <= coord[0] <= c_hi[0] and c_lo[1] <= coord[1] <= c_hi[1]
+               and not chunk.is_lit()}
+    for cx, cy in sorted(columns):
+        light_columns(chunks, (cx, cy), (cx, cy))
+
+
+def relight_region(chunks, lo, hi):
+    """
+    A lo..hi (zárt, globális) doboz szerkesztése utáni növekményes fényfrissítés.
+    Visszatérés: az újra mesh-elendő chunkok koordinátái.
+    """
+    # Oldalirányban RELIGHT_MARGIN, lefelé a világ aljáig (az ég fény oszlop miatt)
+    volume_lo = (lo[0] - RELIGHT_MARGIN, lo[1] - RELIGHT_MARGIN, 0)
+    c_lo = chunk_coord(*volume_lo)[:2]
+    c_hi = chunk_coord(hi[0] + RELIGHT_MARGIN, hi[1] + RELIGHT_MARGIN, 0)[:2]
+    ensure_lit(chunks, c_lo, c_hi)
+    top = max(column_top(chunks, c_lo, c_hi), hi[2] + 1)
+    volume_hi = (hi[0] + RELIGHT_MARGIN, hi[1] + RELIGHT_MARGIN, top)
+
+    volume = LightVolume(chunks, volume_lo, volume_hi)
+    volume.relight(lo, hi)
+    return volume.store(chunks, volume_lo, volume_hi)
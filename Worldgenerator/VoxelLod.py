@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+# Távolság alapú részletességi szintek (LOD) a voxel chunkokhoz.
+# A chunk voxel tömbjét 2x / 4x-esen lekicsinyítjük, és a durva rácsot
+# ugyanazzal a lapkivágó mesherrel mesh-eljük, nagyobb cellamérettel.
+# A fény tömböt ugyanígy kicsinyítjük, így a távoli barlangok is sötétek maradnak.
+# A váltást a Panda3D LODNode végzi a kamera távolsága alapján.
+
+import numpy as np
+
+from VoxelChunk import CHUNK_SIZE, AIR
+from VoxelMesher import ChunkMesh, visible_face_masks, face_corner_ao, face_light, mesh_key
+from VoxelLight import SKY_SHIFT, BLOCK_MASK
+from ChunkStore import stored_mesh, mesh_arrays
+
+# Lekicsinyítési szorzók a LOD1, LOD2, ... szintekhez (a LOD0 a teljes felbontás)
+LOD_FACTORS = (2, 4)
+
+# A LOD mesh-ek verziója (a cache kulcs része): 2 = legfelső anyag és fény
+LOD_MESH_VERSION = 2
+
+
+def lod_key(factor, packed=False):
+    """A LOD mesh neve a chunk cache-ben (mesh_arrays / stored_mesh mód kulcsa)."""
+    return mesh_key(f"lod{factor}v{LOD_MESH_VERSION}", packed)
+
+
+def lod_factors(count):
+    """
+    A LOD1 ... LOD<count> szintek lekicsinyítési szorzói (2, 4, 8, ...), egy-egy
+    lod_distances elemhez. A szorzónak osztania kell a chunk méretet.
+    """
+    factors = tuple(2 ** (level + 1) for level in range(count))
+    if factors and CHUNK_SIZE % factors[-1] != 0:
+        raise ValueError(f"Legfeljebb {CHUNK_SIZE.bit_length() - 1} LOD távolság adható meg "
+                         f"(CHUNK_SIZE = {CHUNK_SIZE}), kapott: {count}")
+    return factors
+
+
+def downsample_voxels(voxels, factor):
+    """
+    factor^3-os blokkonként egy cella. Egy cella tömör, ha a blokkjában van
+    tömör voxel (így a domborzat nem "fogy el" a távolban); az anyaga a blokk
+    legfelső tömör voxeléé, hogy a felszín színe (fű, hó) megmaradjon.
+    """
+    n = voxels.shape[0] // factor
+    # (x, y, z, blokkon belüli (x, y) aloszlop, blokkon belüli z)
+    blocks = voxels.reshape(n, factor, n, factor, n, factor).transpose(0, 2, 4, 1, 3, 5)
+    blocks = blocks.reshape(n, n, n, factor * factor, factor)
+    solid = blocks != AIR
+
+    # Aloszloponként a legfelső tömör voxel blokkon belüli magassága (-1: üres) és anyaga
+    tops = np.where(solid.any(axis=-1), factor - 1 - np.argmax(solid[..., ::-1], axis=-1), -1)
+    top_materials = np.take_along_axis(blocks, np.maximum(tops, 0)[..., None], axis=-1)[..., 0]
+
+    # A cella anyaga a legmagasabbra érő aloszlop tetejéé
+    highest = np.argmax(tops, axis=-1)[..., None]
+    coarse = np.take_along_axis(top_materials, highest, axis=-1)[..., 0]
+    return np.where(tops.max(axis=-1) >= 0, coarse, AIR).astype(voxels.dtype)
+
+
+def downsample_light(light, factor):
+    """
+    factor^3-os blokkonként egy cella fénye: az ég és a blokk fény csatornánként
+    a blokk legvilágosabb voxeléé (a tömör voxelek sötétek, így a cella fénye a
+    benne lévő levegőé).
+    """
+    n = light.shape[0] // factor
+    blocks = light.reshape(n, factor, n, factor, n, factor)
+    sky = (blocks >> SKY_SHIFT).max(axis=(1, 3, 5))
+    block = (blocks & BLOCK_MASK).max(axis=(1, 3, 5))
+    return ((sky << SKY_SHIFT) | block).astype(light.dtype)
+
+
+def build_lod_mesh(chunk, factor):
+    """
+    A chunk lekicsinyített rácsának mesh-e. A szomszéd chunkokat levegőnek
+    tekintjük, ezért a chunk határán a durva rács oldalfalai is kikerülnek:
+    ezek "szoknyaként" takarják a rést két eltérő szintű chunk között
+    (a durva felszín legfeljebb factor - 1 voxellel tér el a finomtól).
+    A lapok a lekicsinyített fényt kapják; a szoknyák előtti (chunkon kívüli)
+    cella fénye a szélső celláé. Megvilágítatlan chunknál teljes fény.
+    """
+    coarse = downsample_voxels(chunk.voxels, factor)
+    padded = np.zeros(tuple(size + 2 for size in coarse.shape), dtype=coarse.dtype)
+    padded[1:-1, 1:-1, 1:-1] = coarse
+    light = chunk.light
+    padded_light = None if light is None else np.pad(downsample_light(light, factor), 1, mode='edge')
+
+    mesh = ChunkMesh(scale=factor)
+    for face_index, mask in enumerate(visible_face_masks(padded)):
+        positions = np.argwhere(mask)
+        ao = face_corner_ao(padded, face_index)[mask]
+        face_levels = None if padded_light is None else face_light(padded_light, face_index)[mask]
+        mesh.add_faces(face_index, positions, positions, coarse[mask], ao, face_levels)
+    return mesh
+
+
+def build_lod_meshes(chunk, factors=LOD_FACTORS, packed=False):
+    """[(szorzó, rows bytes, index bytes, vertex szám, háromszög szám), ...] a LOD szintekre."""
+    lods = []
+    for factor in factors:
+        assert CHUNK_SIZE % factor == 0, "A LOD szorzónak osztania kell a chunk méretet"
+        mesh = build_lod_mesh(chunk, factor)
+        rows, indices = mesh.pack(packed)
+        lods.append((factor, rows, indices, mesh.num_vertices(), mesh.num_triangles()))
+    return lods
+
+
+def stored_lods(arrays, cz, factors=LOD_FACTORS, packed=False):
+    """A cache-elt LOD mesh-ek build_lod_meshes() formában, vagy None, ha valamelyik hiányzik."""
+    lods = []
+    for factor in factors:
+        cached = stored_mesh(arrays, cz, lod_key(factor, packed))
+        if cached is None:
+            return None
+        lods.append((factor,) + cached)
+    return lods
+
+
+def lod_mesh_arrays(coord, lods, packed=False):
+    """A LOD mesh-ek tárolható formában (a mesh_arrays() kulcsaival, lod<szorzó> móddal)."""
+    arrays = {}
+    for factor, rows, indices, num_vertices, num_triangles in lods:
+        arrays.update(mesh_arrays(coord, lod_key(factor, packed), rows, indices,
+                                  num_vertices, num_triangles))
+    return arrays
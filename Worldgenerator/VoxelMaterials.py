@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+# Blokk anyag nyilvántartás textúra tömbbel (2D texture array).
+# Minden anyag lapjaihoz (felső / oldalsó / alsó) egy-egy textúra réteg tartozik,
+# és az összes réteg EGY Texture objektumban van. A vertex a réteg indexét
+# viszi (PackedVertices "layer" oszlop), így egy chunk bármennyi anyaggal is
+# egyetlen Geom / draw call marad, és a chunkok között nincs TextureStage vagy
+# állapotváltás.
+# Atlasz helyett tömb: a rétegek mipmap szintjei nem keverednek egymással
+# (nincs szükség kitöltő keretre a csempék között), és a greedy mesher nagy
+# quadjain a textúra ismétlése (repeat wrap) rétegenként működik.
+# A textúrák procedurálisak (az anyag színéből és egy egész hash zajból),
+# így nincs szükség külső képfájlokra.
+
+from panda3d.core import Texture, SamplerState, PTAUchar
+import numpy as np
+
+from VoxelChunk import (
+    STONE, DIRT, WATER, GRASS, MOUNTAIN, SNOW, LAMP, MATERIAL_COLORS
+)
+from FractalNoise import hash_lattice
+
+TEXTURE_SIZE = 16  # Egy réteg felbontása (texel / voxel él)
+
+# Lap irány (VoxelMesher.VOXEL_FACES sorrend: +Z, -Z, -Y, +Y, -X, +X) -> anyag lap
+FACE_TOP, FACE_SIDE, FACE_BOTTOM = 0, 1, 2
+FACE_SLOTS = (FACE_TOP, FACE_BOTTOM, FACE_SIDE, FACE_SIDE, FACE_SIDE, FACE_SIDE)
+
+
+# --- PROCEDURÁLIS TEXTÚRÁK ---
+
+def texel_noise(size, seed):
+    """(size, size) egyenletes [0, 1) zaj texelenként, az egész rács hash-ből."""
+    v, u = np.mgrid[0:size, 0:size]
+    return hash_lattice(u, v, seed).astype(np.float64) / 2.0 ** 32
+
+
+def tinted(color, shade):
+    """RGBA float szín x (size, size) fényesség -> (size, size, 4) float kép."""
+    rgb = np.clip(np.asarray(color[:3])[None, None, :] * shade[:, :, None], 0.0, 1.0)
+    alpha = np.full(shade.shape + (1,), color[3])
+    return np.concatenate([rgb, alpha], axis=2)
+
+
+def grain_texture(color, seed, size=TEXTURE_SIZE, strength=0.3):
+    """Egyenletes szemcsés minta (kő, föld, hó)."""
+    return tinted(color, 1.0 - strength / 2.0 + strength * texel_noise(size, seed))
+
+
+def speckle_texture(color, seed, size=TEXTURE_SIZE, density=0.15):
+    """Szemcsés alap sötétebb pöttyökkel (föld, hegyoldal)."""
+    noise = texel_noise(size, seed)
+    shade = 0.9 + 0.2 * texel_noise(size, seed + 1)
+    return tinted(color, np.where(noise < density, shade * 0.6, shade))
+
+
+def fringe_texture(side_color, top_color, seed, size=TEXTURE_SIZE):
+    """Oldallap felső szegéllyel (fű oldala: föld, tetején egyenetlen fűsáv)."""
+    image = speckle_texture(side_color, seed, size)
+    top = grain_texture(top_color, seed + 1, size)
+    # A sáv texel soronként 2..4 mély; a 0. sor a kép alja (Panda3D konvenció)
+    depth = 2 + (hash_lattice(np.arange(size), 0, seed + 2) % 3).astype(np.int64)
+    rows = np.arange(size)[:, None]
+    return np.where((rows >= size - depth[None, :])[:, :, None], top, image)
+
+
+def ripple_texture(color, seed, size=TEXTURE_SIZE):
+    """Hullámos csíkok (víz)."""
+    v, u = np.mgrid[0:size, 0:size]
+    waves = 0.9 + 0.1 * np.sin((u + 2.0 * np.sin(v * np.pi / 4.0)) * np.pi / 4.0)
+    return tinted(color, waves * (0.95 + 0.1 * texel_noise(size, seed)))
+
+
+def lamp_texture(color, seed, size=TEXTURE_SIZE):
+    """Világos belső és sötét keret (lámpa)."""
+    v, u = np.mgrid[0:size, 0:size]
+    frame = (u < 2) | (v < 2) | (u >= size - 2) | (v >= size - 2)
+    shade = np.where(frame, 0.45, 1.0) * (0.95 + 0.1 * texel_noise(size, seed))
+    return tinted(color, shade)
+
+
+def to_bytes(image):
+    """float 0..1 RGBA kép -> uint8 RGBA."""
+    return np.clip(np.rint(image * 255.0), 0, 255).astype(np.uint8)
+
+
+def mipmap_chain(image):
+    """
+    Egy réteg (size, size, 4) float képének mipmap szintjei (2x2 átlagolással),
+    a teljes felbontástól 1x1-ig. A rétegek külön szűrődnek, így nincs átszivárgás.
+    """
+    levels = [image]
+    while levels[-1].shape[0] > 1:
+        level = levels[-1]
+        half = level.shape[0] // 2
+        levels.append(level.reshape(half, 2, half, 2, 4).mean(axis=(1, 3)))
+    return levels
+
+
+# --- NYILVÁNTARTÁS ---
+
+class MaterialRegistry:
+    """
+    Anyag azonosító -> (felső, oldalsó, alsó) textúra réteg hozzárendelés.
+    add_texture() egy új réteget vesz fel (név szerint egyszer), register()
+    egy anyag lapjait köti rétegekhez. layer_table() a mesher vektorizált
+    keresőtáblája, make_texture_array() a GPU-ra kerülő textúra tömb.
+    """
+
+    def __init__(self, texture_size=TEXTURE_SIZE):
+        self.texture_size = texture_size
+        self.images = []       # rétegenként (size, size, 4) float kép
+        self.layer_names = {}  # textúra név -> réteg index
+        self.face_layers = {}  # anyag id -> (felső, oldalsó, alsó) réteg
+
+    def add_texture(self, name, image):
+        """Egy réteg felvétele; ha a név már szerepel, a meglévő réteg indexe."""
+        if name in self.layer_names:
+            return self.layer_names[name]
+        image = np.asarray(image, dtype=np.float64)
+        if image.shape != (self.texture_size, self.texture_size, 4):
+            raise ValueError(f"A(z) {name!r} textúra mérete {image.shape}, "
+                             f"elvárt: ({self.texture_size}, {self.texture_size}, 4)")
+        if len(self.images) >= 256:
+            raise ValueError("Legfeljebb 256 réteg fér a vertex uint8 réteg indexébe")
+        self.layer_names[name] = len(self.images)
+        self.images.append(image)
+        return self.layer_names[name]
+
+    def register(self, material, top, side=None, bottom=None):
+        """Az anyag lapjainak textúrái (név); side / bottom alapértelmezése a felső."""
+        side = top if side is None else side
+        bottom = side if bottom is None else bottom
+        self.face_layers[material] = tuple(self.layer_names[name] for name in (top, side, bottom))
+
+    def layer_table(self):
+        """(anyagok száma, 6) uint8 tömb: [anyag, lap irány] -> réteg index."""
+        table = np.zeros((max(self.face_layers, default=0) + 1, len(FACE_SLOTS)), dtype=np.uint8)
+        for material, layers in self.face_layers.items():
+            table[material] = [layers[slot] for slot in FACE_SLOTS]
+        return table
+
+    def make_texture_array(self):
+        """
+        Az összes réteg egyetlen 2D textúra tömbben, előre számolt mipmap
+        szintekkel. Közelről a texelek élesek (nearest), távolról a mipmap szűr.
+        """
+        size = self.texture_size
+        texture = Texture("voxel_materials")
+        texture.setup2dTextureArray(size, size, len(self.images), Texture.T_unsigned_byte,
+                                    Texture.F_rgba8)
+        # A Panda3D RAM képe rétegenként egymás után, texelenként BGRA sorrendben
+        for level, pages in enumerate(zip(*(mipmap_chain(image) for image in self.images))):
+            data = np.concatenate([to_bytes(page)[..., [2, 1, 0, 3]] for page in pages])
+            image = PTAUchar()
+            image.setData(data.tobytes())
+            texture.setRamMipmapImage(level, image)
+        texture.setMinfilter(SamplerState.FT_linear_mipmap_linear)
+        texture.setMagfilter(SamplerState.FT_nearest)
+        texture.setWrapU(SamplerState.WM_repeat)
+        texture.setWrapV(SamplerState.WM_repeat)
+        texture.setAnisotropicDegree(4)
+        return texture
+
+
+def default_registry():
+    """A VoxelChunk anyagainak procedurális textúrái, az anyag színekből."""
+    colors = [None] + [(c.x, c.y, c.z, c.w) for c in MATERIAL_COLORS[1:]]
+    registry = MaterialRegistry()
+    registry.add_texture("stone", grain_texture(colors[STONE], 11))
+    registry.add_texture("dirt", speckle_texture(colors[DIRT], 23))
+    registry.add_texture("water", ripple_texture(colors[WATER], 37))
+    registry.add_texture("grass", grain_texture(colors[GRASS], 41, strength=0.25))
+    registry.add_texture("grass_side", fringe_texture(colors[DIRT], colors[GRASS], 43))
+    registry.add_texture("mountain", speckle_texture(colors[MOUNTAIN], 53, density=0.25))
+    registry.add_texture("snow", grain_texture(colors[SNOW], 61, strength=0.1))
+    registry.add_texture("snow_side", fringe_texture(colors[MOUNTAIN], colors[SNOW], 67))
+    registry.add_texture("lamp", lamp_texture(colors[LAMP], 71))
+
+    registry.register(STONE, "stone")
+    registry.register(DIRT, "dirt")
+    registry.register(WATER, "water")
+    registry.register(GRASS, "grass", "grass_side", "dirt")
+    registry.register(MOUNTAIN, "mountain")
+    registry.register(SNOW, "snow", "snow_side", "mountain")
+    registry.register(LAMP, "lamp")
+    return registry
+
+
+DEFAULT_MATERIALS = default_registry()
+
+# [anyag, lap irány] -> réteg index, a mesher vertex layer oszlopához
+FACE_LAYER_TABLE = DEFAULT_MATERIALS.layer_table()
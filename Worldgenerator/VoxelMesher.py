@@ -0,0 +1,425 @@
+# -*- coding: utf-8 -*-
+# Chunk alapú voxel mesh generátor.
+# Egy chunk összes kockáját EGY közös GeomVertexData-ba és EGY GeomTriangles-be
+# írja, így a draw call-ok száma a chunkok számával arányos, nem a voxelekével.
+# A lapkivágó és a greedy mesher sarkonkénti környezeti takarást (AO) is számol,
+# és a lap előtti voxel fényszintjét (VoxelLight) is figyelembe veszi; mindkettőt
+# a vertex színbe sütjük be: futásidőben nincs plusz megvilágítási költség.
+# A tömörített formátumban az anyag színe helyett a textúra tömb rétege kerül a
+# vertexbe (VoxelMaterials), a vertex szín ekkor csak az AO és a fény.
+
+from panda3d.core import (
+    GeomVertexFormat, Geom, GeomVertexArrayFormat, InternalName
+)
+import numpy as np
+
+from VoxelChunk import HALF_VOXEL, VOXEL_SIZE, CHUNK_SIZE, MATERIAL_COLORS
+from GeomBuffers import (
+    pack_vertex_rows, geom_node_from_packed, quad_indices
+)
+from PackedVertices import PACKED_FORMAT, pack_colors
+from VoxelLight import MAX_LIGHT, FULL_SKY, LIGHT_CURVE, light_level
+from VoxelMaterials import FACE_LAYER_TABLE
+
+# --- GLOBÁLIS GEOMETRIA BEÁLLÍTÁSOK ---
+
+# Explicit vertex format definíció: Pozíció (V3), Szín (C4), Normál (N3)
+array_format = GeomVertexArrayFormat()
+array_format.add_column(InternalName.make("vertex"), 3, Geom.NT_float32, Geom.C_point)
+array_format.add_column(InternalName.make("color"), 4, Geom.NT_float32, Geom.C_color)
+array_format.add_column(InternalName.make("normal"), 3, Geom.NT_float32, Geom.C_normal)
+
+CUSTOM_VOXEL_FORMAT = GeomVertexFormat.registerFormat(array_format)
+
+# Tömörített formátum (12 byte / vertex): int16 rács sarok koordináta, normál index,
+# textúra réteg index, uint8 RGBA
+PACKED_VOXEL_FORMAT = PACKED_FORMAT
+
+# Választható mesher stratégiák
+MESHER_NAIVE = "naive"    # minden voxel mind a 6 lapja
+MESHER_CULLED = "culled"  # csak a levegővel határos lapok
+MESHER_GREEDY = "greedy"  # a látható, azonos színű, egy síkban lévő lapok téglalapokká vonva
+MESHER_MODES = (MESHER_NAIVE, MESHER_CULLED, MESHER_GREEDY)
+
+
+def voxel_format(packed):
+    return PACKED_VOXEL_FORMAT if packed else CUSTOM_VOXEL_FORMAT
+
+
+def mesh_key(mode, packed):
+    """A mesh neve a chunk cache-ben; a két vertex formátum bufferei nem keverhetők."""
+    return f"{mode}_packed" if packed else mode
+
+
+# Kocka lapjai: (normál, 4 sarok eltolás HALF_VOXEL egységben).
+# A sarkok kívülről nézve az óramutatóval ellentétes (CCW) sorrendben vannak,
+# mert a Panda3D ezt tekinti a lap elülső oldalának.
+VOXEL_FACES = [
+    # Top (+Z)
+    (( 0, 0, 1), [(-1, -1,  1), ( 1, -1,  1), ( 1,  1,  1), (-1,  1,  1)]),
+    # Bottom (-Z)
+    (( 0, 0,-1), [(-1, -1, -1), (-1,  1, -1), ( 1,  1, -1), ( 1, -1, -1)]),
+    # Front (-Y)
+    (( 0,-1, 0), [(-1, -1, -1), ( 1, -1, -1), ( 1, -1,  1), (-1, -1,  1)]),
+    # Back (+Y)
+    (( 0, 1, 0), [(-1,  1, -1), (-1,  1,  1), ( 1,  1,  1), ( 1,  1, -1)]),
+    # Left (-X)
+    ((-1, 0, 0), [(-1, -1, -1), (-1, -1,  1), (-1,  1,  1), (-1,  1, -1)]),
+    # Right (+X)
+    (( 1, 0, 0), [( 1, -1, -1), ( 1,  1, -1), ( 1,  1,  1), ( 1, -1,  1)]),
+]
+
+
+# Lapirányonkénti normálok és sarok eltolások tömbként, a vektorizált emitáláshoz
+FACE_NORMALS = np.array([normal for normal, _ in VOXEL_FACES], dtype=np.float32)
+FACE_CORNER_SIGNS = np.array([offsets for _, offsets in VOXEL_FACES], dtype=np.float32)
+
+# Anyag azonosító -> RGBA tömb (a levegő sora átlátszó fekete, sosem kerül kiírásra)
+MATERIAL_COLOR_ARRAY = np.array(
+    [(0, 0, 0, 0)] + [(c.x, c.y, c.z, c.w) for c in MATERIAL_COLORS[1:]],
+    dtype=np.float32)
+PACKED_COLOR_ARRAY = pack_colors(MATERIAL_COLOR_ARRAY)
+
+# --- KÖRNYEZETI TAKARÁS (AO) ---
+
+# Sarok AO szint -> fényerő szorzó (0: mindhárom szomszéd takar, 3: szabad sarok)
+AO_LEVELS = np.array([0.45, 0.65, 0.82, 1.0], dtype=np.float32)
+AO_UNOCCLUDED = 3
+
+# [anyag, AO szint] -> a színtábla besötétített változata (az alfa nem változik)
+AO_SHADES = np.concatenate(
+    [np.repeat(AO_LEVELS[:, None], 3, axis=1), np.ones((len(AO_LEVELS), 1), np.float32)], axis=1)
+SHADED_COLOR_ARRAY = MATERIAL_COLOR_ARRAY[:, None, :] * AO_SHADES
+
+# Textúrázott lapokhoz: fehér alapszín, a színt a textúra réteg adja
+TEXTURED_SHADE_ARRAY = np.ones_like(MATERIAL_COLOR_ARRAY)[:, None, :] * AO_SHADES
+
+
+def shaded_colors(materials, ao, light, table=SHADED_COLOR_ARRAY):
+    """
+    n lap 4 sarkának színe (n * 4, 4): anyag szín x sarok AO x a lap fényszintje.
+    table=TEXTURED_SHADE_ARRAY: anyag szín nélkül (textúrázott lapok).
+    """
+    colors = table[materials[:, None], ao]  # (n, 4, 4)
+    colors[..., :3] *= LIGHT_CURVE[light][:, None, None]
+    return colors.reshape(-1, 4)
+
+
+class ChunkMesh:
+    """
+    Egy chunk geometriájának gyűjtője.
+    A lapokat irányonként NumPy blokkokban gyűjti (lo..hi voxel téglatest + anyag),
+    és a végén egyetlen bulk másolással írja be a Panda3D bufferbe.
+    """
+
+    def __init__(self, scale=1):
+        # (lap index, lo (n, 3), hi (n, 3), anyagok (n,), sarok AO (n, 4), fényszint (n,))
+        self.blocks = []
+        self.num_quads = 0
+        # Egy rács cella hány voxel élhosszú (LOD mesh-eknél 2, 4, ...)
+        self.scale = scale
+
+    def num_vertices(self):
+        return self.num_quads * 4
+
+    def num_triangles(self):
+        return self.num_quads * 2
+
+    def add_faces(self, face_index, lo, hi, materials, ao=None, light=None):
+        """
+        n darab lap hozzáadása a face_index irányban. A lo..hi (zárt, voxel index)
+        téglatestek lapjai; naiv/culled esetben lo == hi (egy voxel),
+        a greedy mesher így egyetlen quaddal fed le több egymás melletti lapot.
+        ao: (n, 4) sarkonkénti AO szint (0..3) a lap sarok sorrendjében; None: nincs takarás.
+        light: (n,) a lap előtti voxel fényszintje (0..15); None: teljes fény.
+        """
+        if len(materials) == 0:
+            return
+        if ao is None:
+            ao = np.full((len(materials), 4), AO_UNOCCLUDED, dtype=np.uint8)
+        if light is None:
+            light = np.full(len(materials), MAX_LIGHT, dtype=np.uint8)
+        self.blocks.append((face_index,
+                            np.asarray(lo, dtype=np.float32).reshape(-1, 3),
+                            np.asarray(hi, dtype=np.float32).reshape(-1, 3),
+                            np.asarray(materials, dtype=np.uint8),
+                            np.asarray(ao, dtype=np.uint8).reshape(-1, 4),
+                            np.asarray(light, dtype=np.uint8).reshape(-1)))
+        self.num_quads += len(materials)
+
+    def flipped_quads(self):
+        """
+        (num_quads,) bool: True, ha a quadot a másik átlója mentén kell háromszögelni.
+        Az átló a kisebb AO összegű (sötétebb) sarokpárt köti össze, így a
+        takarás interpolációja nem függ attól, melyik irányba néz a lap.
+        """
+        flips = [(ao[:, 0].astype(np.int16) + ao[:, 2]) > (ao[:, 1].astype(np.int16) + ao[:, 3])
+                 for _, _, _, _, ao, _ in self.blocks]
+        return np.concatenate(flips) if flips else np.zeros(0, dtype=bool)
+
+    def to_columns(self):
+        """A gyűjtött lapok vertex oszlopai: {'vertex': (N, 3), 'color': (N, 4), 'normal': (N, 3)}."""
+        vertices, colors, normals = [], [], []
+        for face_index, lo, hi, materials, ao, light in self.blocks:
+            signs = FACE_CORNER_SIGNS[face_index]  # (4, 3)
+            cell = self.scale * VOXEL_SIZE
+            corners = np.where(signs < 0,
+                               lo[:, None, :] * cell - HALF_VOXEL,
+                               (hi[:, None, :] + 1) * cell - HALF_VOXEL)  # (n, 4, 3)
+            vertices.append(corners.reshape(-1, 3))
+            colors.append(shaded_colors(materials, ao, light))
+            normals.append(np.broadcast_to(FACE_NORMALS[face_index], (len(materials) * 4, 3)))
+        if not vertices:
+            return {'vertex': np.zeros((0, 3), np.float32),
+                    'color': np.zeros((0, 4), np.float32),
+                    'normal': np.zeros((0, 3), np.float32)}
+        return {'vertex': np.concatenate(vertices),
+                'color': np.concatenate(colors),
+                'normal': np.concatenate(normals)}
+
+    def to_packed_columns(self):
+        """
+        Oszlopok a PACKED_VOXEL_FORMAT-hoz: a pozíció a voxel rács sarokpontjának
+        egész indexe (0..CHUNK_SIZE), a normál a lapirány indexe, a réteg az
+        anyag lapjának textúra rétege (FACE_LAYER_TABLE); a szín csak AO x fény.
+        A chunk NodePath-ja -HALF_VOXEL eltolással és VOXEL_SIZE skálával helyezi el.
+        """
+        vertices, colors, normals, layers = [], [], [], []
+        for face_index, lo, hi, materials, ao, light in self.blocks:
+            signs = FACE_CORNER_SIGNS[face_index]
+            corners = np.where(signs < 0, lo[:, None, :], hi[:, None, :] + 1) * self.scale
+            vertices.append(corners.reshape(-1, 3).astype(np.int16))
+            colors.append(pack_colors(shaded_colors(materials, ao, light, TEXTURED_SHADE_ARRAY)))
+            normals.append(np.full(len(materials) * 4, face_index, dtype=np.uint8))
+            layers.append(np.repeat(FACE_LAYER_TABLE[materials, face_index], 4))
+        if not vertices:
+            return {'vertex': np.zeros((0, 3), np.int16),
+                    'color': np.zeros((0, 4), np.uint8),
+                    'normal_index': np.zeros(0, np.uint8),
+                    'layer': np.zeros(0, np.uint8)}
+        return {'vertex': np.concatenate(vertices),
+                'color': np.concatenate(colors),
+                'normal_index': np.concatenate(normals),
+                'layer': np.concatenate(layers)}
+
+    def pack(self, packed=False):
+        """
+        A mesh GPU buffer elrendezésű vertex sorai és 32 bites indexei bytes-ként.
+        Így egy worker processz is elkészítheti, a fő szál csak bemásolja.
+        packed=True: PACKED_VOXEL_FORMAT (12 byte / vertex) a CUSTOM_VOXEL_FORMAT helyett.
+        """
+        if packed:
+            rows = pack_vertex_rows(PACKED_VOXEL_FORMAT, self.to_packed_columns())
+        else:
+            rows = pack_vertex_rows(CUSTOM_VOXEL_FORMAT, self.to_columns())
+        return rows.tobytes(), quad_indices(self.num_quads, flipped=self.flipped_quads()).tobytes()
+
+    def make_geom_node(self, name, packed=False):
+        """A gyűjtött adatokból egyetlen Geom-ot tartalmazó GeomNode-ot készít."""
+        return geom_node_from_packed(name, voxel_format(packed), *self.pack(packed))
+
+
+def build_naive_mesh(chunk):
+    """
+    Naiv mesher: minden szilárd voxel mind a 6 lapját kiírja,
+    de már a chunk közös bufferébe (nem voxelenként külön Geom-ba).
+    """
+    mesh = ChunkMesh()
+    voxels = chunk.voxels
+    positions = np.argwhere(voxels)
+    materials = voxels[voxels != 0]
+    for face_index in range(len(VOXEL_FACES)):
+        mesh.add_faces(face_index, positions, positions, materials)
+    return mesh
+
+
+# Szomszéd eltolás -> (cél szelet a keretes tömbben, forrás szelet a szomszéd chunkban)
+_PAD_SLICES = {-1: (slice(0, 1), slice(CHUNK_SIZE - 1, CHUNK_SIZE)),
+               0: (slice(1, CHUNK_SIZE + 1), slice(0, CHUNK_SIZE)),
+               1: (slice(CHUNK_SIZE + 1, CHUNK_SIZE + 2), slice(0, 1))}
+
+
+def get_padded_voxels(chunk, chunk_lookup, diagonals=True):
+    """
+    A chunk voxel tömbje egy 1 voxel széles kerettel, amit a szomszédos
+    chunkok határoló rétegéből töltünk fel. Hiányzó szomszéd = levegő (világ széle).
+    diagonals=True: a 26 szomszéd (élek és sarkok is, az AO-hoz kell),
+    különben csak a 6 lapszomszéd (a lapkivágáshoz elég).
+    chunk_lookup(coord) -> VoxelChunk vagy None
+    """
+    return get_padded_array(chunk, chunk_lookup, lambda c: c.voxels, 0, diagonals)
+
+
+def get_padded_light(chunk, chunk_lookup):
+    """
+    A chunk fény tömbje a 6 lapszomszéd határoló rétegével. A meg nem világított
+    vagy hiányzó chunk nyílt ég alatti levegőnek számít.
+    """
+    return get_padded_array(chunk, chunk_lookup, lambda c: c.light, FULL_SKY, False)
+
+
+def get_padded_array(chunk, chunk_lookup, read, fill, diagonals):
+    """get_padded_voxels() / get_padded_light() közös része: read(chunk) -> tömb vagy None."""
+    S = CHUNK_SIZE
+    padded = np.full((S + 2, S + 2, S + 2), fill, dtype=np.uint8)
+    own = read(chunk)
+    if own is not None:
+        padded[1:-1, 1:-1, 1:-1] = own
+
+    cx, cy, cz = chunk.coord
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            for dz in (-1, 0, 1):
+                moved = abs(dx) + abs(dy) + abs(dz)
+                if moved == 0 or (moved > 1 and not diagonals):
+                    continue
+                neighbor = chunk_lookup((cx + dx, cy + dy, cz + dz))
+                array = read(neighbor) if neighbor is not None else None
+                if array is None:
+                    continue
+                (tx, sx), (ty, sy), (tz, sz) = _PAD_SLICES[dx], _PAD_SLICES[dy], _PAD_SLICES[dz]
+                padded[tx, ty, tz] = array[sx, sy, sz]
+    return padded
+
+
+def visible_face_masks(padded):
+    """
+    Lapirányonként (VOXEL_FACES sorrendben) egy bool maszk a chunk méretében:
+    True, ha a voxel szilárd és a normál irányú szomszédja levegő.
+    """
+    solid = padded[1:-1, 1:-1, 1:-1] != 0
+    masks = []
+    for (nx, ny, nz), _ in VOXEL_FACES:
+        neighbor = padded[1 + nx:padded.shape[0] - 1 + nx,
+                          1 + ny:padded.shape[1] - 1 + ny,
+                          1 + nz:padded.shape[2] - 1 + nz]
+        masks.append(solid & (neighbor == 0))
+    return masks
+
+
+def face_light(padded_light, face_index):
+    """A face_index irányú lapok előtti voxel fényszintje minden voxelre: (S, S, S)."""
+    nx, ny, nz = VOXEL_FACES[face_index][0]
+    shape = padded_light.shape
+    front = padded_light[1 + nx:shape[0] - 1 + nx, 1 + ny:shape[1] - 1 + ny, 1 + nz:shape[2] - 1 + nz]
+    return light_level(front)
+
+
+def face_corner_ao(padded, face_index):
+    """
+    A face_index irányú lapok 4 sarkának AO szintje minden voxelre: (S, S, S, 4) uint8.
+    Egy sarkot a lap előtti réteg 3 voxele takarhat: a két él menti és az átlós.
+    Ha a két él menti tömör, a sarok teljesen takart (0), különben 3 - takarók száma.
+    """
+    solid = padded != 0
+    size = [n - 2 for n in padded.shape]
+
+    def occluder(offset):
+        return solid[1 + offset[0]:1 + offset[0] + size[0],
+                     1 + offset[1]:1 + offset[1] + size[1],
+                     1 + offset[2]:1 + offset[2] + size[2]]
+
+    normal = VOXEL_FACES[face_index][0]
+    axis = [abs(n) for n in normal].index(1)
+    u_axis, v_axis = [k for k in range(3) if k != axis]
+    levels = []
+    for signs in FACE_CORNER_SIGNS[face_index].astype(int):
+        # A sarok jelek normál tengelyű eleme megegyezik a normállal
+        side_u = signs.copy()
+        side_u[v_axis] = 0
+        side_v = signs.copy()
+        side_v[u_axis] = 0
+        a, b, c = occluder(side_u), occluder(side_v), occluder(signs)
+        count = a.astype(np.uint8) + b + c
+        levels.append(np.where(a & b, 0, AO_UNOCCLUDED - count).astype(np.uint8))
+    return np.stack(levels, axis=-1)
+
+
+def build_culled_mesh(chunk, chunk_lookup):
+    """
+    Szomszéd-tudatos mesher: csak azokat a lapokat írja ki, amelyek
+    levegővel vagy a világ szélével határosak (a chunk határokon át is).
+    """
+    mesh = ChunkMesh()
+    voxels = chunk.voxels
+    padded = get_padded_voxels(chunk, chunk_lookup)
+    padded_light = get_padded_light(chunk, chunk_lookup)
+    masks = visible_face_masks(padded)
+    for face_index, mask in enumerate(masks):
+        positions = np.argwhere(mask)
+        ao = face_corner_ao(padded, face_index)[mask]
+        light = face_light(padded_light, face_index)[mask]
+        mesh.add_faces(face_index, positions, positions, voxels[mask], ao, light)
+    return mesh
+
+
+def build_greedy_mesh(chunk, chunk_lookup):
+    """
+    Greedy mesher: a culled mesher látható lapjait irányonként és szeletenként
+    a lehető legnagyobb, azonos anyagú téglalapokká vonja össze.
+    Különösen a sík kő / föld / fű rétegeken csökkenti drasztikusan a háromszögszámot.
+    Csak az azonos sarok AO-jú és fényszintű lapok vonhatók össze, különben az árnyékolás elmosódna.
+    """
+    mesh = ChunkMesh()
+    voxels = chunk.voxels
+    padded = get_padded_voxels(chunk, chunk_lookup)
+    padded_light = get_padded_light(chunk, chunk_lookup)
+    masks = visible_face_masks(padded)
+    for face_index, mask in enumerate(masks):
+        normal, _ = VOXEL_FACES[face_index]
+        axis = [abs(n) for n in normal].index(1)
+        u_axis, v_axis = [k for k in range(3) if k != axis]
+
+        # Látható lapok kulcsa (anyag | 4 x 2 bit sarok AO | fényszint), a normál tengely az első dimenzió
+        ao = face_corner_ao(padded, face_index).astype(np.int32)
+        light = face_light(padded_light, face_index).astype(np.int32)
+        keys = (voxels.astype(np.int32) | (ao[..., 0] << 8) | (ao[..., 1] << 10)
+                | (ao[..., 2] << 12) | (ao[..., 3] << 14) | (light << 16))
+        slices = np.moveaxis(np.where(mask, keys, 0), axis, 0)
+        rect_lo, rect_hi, rect_keys = [], [], []
+        for s in range(slices.shape[0]):
+            plane = slices[s].copy()
+            if not plane.any():
+                continue
+            size_u, size_v = plane.shape
+            for u in range(size_u):
+                v = 0
+                while v < size_v:
+                    key = plane[u, v]
+                    if key == 0:
+                        v += 1
+                        continue
+                    # Bővítés v irányban, amíg azonos a kulcs
+                    h = 1
+                    while v + h < size_v and plane[u, v + h] == key:
+                        h += 1
+                    # Bővítés u irányban, amíg a teljes sor egyezik
+                    w = 1
+                    while u + w < size_u and (plane[u + w, v:v + h] == key).all():
+                        w += 1
+                    plane[u:u + w, v:v + h] = 0
+
+                    lo = [0, 0, 0]
+                    hi = [0, 0, 0]
+                    lo[axis] = hi[axis] = s
+                    lo[u_axis], hi[u_axis] = u, u + w - 1
+                    lo[v_axis], hi[v_axis] = v, v + h - 1
+                    rect_lo.append(lo)
+                    rect_hi.append(hi)
+                    rect_keys.append(key)
+                    v += h
+        rect_keys = np.array(rect_keys, dtype=np.int32)
+        rect_ao = (rect_keys[:, None] >> np.array([8, 10, 12, 14])) & 3
+        mesh.add_faces(face_index, rect_lo, rect_hi, rect_keys & 0xFF, rect_ao, rect_keys >> 16)
+    return mesh
+
+
+def build_chunk_mesh(chunk, chunk_lookup, mode=MESHER_CULLED):
+    """A kiválasztott stratégiával (naive / culled / greedy) készít chunk mesh-t."""
+    if mode == MESHER_NAIVE:
+        return build_naive_mesh(chunk)
+    elif mode == MESHER_CULLED:
+        return build_culled_mesh(chunk, chunk_lookup)
+    elif mode == MESHER_GREEDY:
+        return build_greedy_mesh(chunk, chunk_lookup)
+    raise ValueError(f"Ismeretlen mesher mód: {mode!r} (lehetséges: {MESHER_MODES})")
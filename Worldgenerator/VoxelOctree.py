@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+# Ritka (sparse) oktális fa tárolás a voxel chunkokhoz.
+# A CHUNK_SIZE^3 tömböt rekurzívan 8 részre osztjuk; az egynemű (pl. csupa levegő
+# vagy csupa kő) részek egyetlen levél csomópontban maradnak. A magasságmezős
+# terepnél így a memória a felszín méretével arányos, nem a térfogattal:
+# a terep feletti levegő és a mély kő néhány nagy levélre esik össze.
+#
+# Elrendezés (pointer nélküli, szintenként folytonos):
+#   nodes[level_starts[d]:level_starts[d + 1]] a d. mélység csomópontjai;
+#   érték >= 0: levél, az anyag id-je; érték < 0: belső csomópont, -(rang + 1),
+#   ahol a rang a belső csomópont sorszáma a saját szintjén. A gyerekei a
+#   level_starts[d + 1] + 8 * rang indextől kezdődő 8 bejegyzés
+#   (oktáns = ox * 4 + oy * 2 + oz sorrendben).
+
+import numpy as np
+
+from VoxelChunk import CHUNK_SIZE, AIR
+
+MIXED = -1  # Építés közben: a blokk nem egynemű
+
+# A 8 gyerek oktáns eltolása (ox, oy, oz), az oktáns index szerinti sorrendben
+OCTANT_OFFSETS = np.array([(ox, oy, oz) for ox in (0, 1) for oy in (0, 1) for oz in (0, 1)],
+                          dtype=np.int64)
+
+DEPTH = int(np.log2(CHUNK_SIZE))
+
+
+class VoxelOctree:
+    """
+    Egy chunk voxelei oktális fában (a CompressedVoxels-szel azonos felülettel,
+    így a VoxelChunk bármelyiket használhatja tömörített alakként).
+    """
+
+    def __init__(self, voxels):
+        self.dtype = voxels.dtype
+
+        # Alulról felfelé: minden szinten a blokk anyaga, vagy MIXED
+        levels = [voxels.astype(np.int16)]
+        while levels[-1].shape[0] > 1:
+            n = levels[-1].shape[0] // 2
+            blocks = levels[-1].reshape(n, 2, n, 2, n, 2).transpose(0, 2, 4, 1, 3, 5).reshape(n, n, n, 8)
+            first = blocks[..., 0]
+            uniform = (blocks == first[..., None]).all(axis=-1) & (first != MIXED)
+            levels.append(np.where(uniform, first, MIXED).astype(np.int16))
+
+        # Felülről lefelé: a belső csomópontok gyerekeinek kiírása szintenként
+        root = levels[-1].reshape(1)
+        nodes = [self.encode(root)]
+        level_starts = [0, 1]
+        coords = np.zeros((0, 3), dtype=np.int64) if root[0] != MIXED else np.zeros((1, 3), dtype=np.int64)
+        for depth in range(1, DEPTH + 1):
+            if len(coords) == 0:
+                break
+            children = (coords[:, None, :] * 2 + OCTANT_OFFSETS[None, :, :]).reshape(-1, 3)
+            values = levels[DEPTH - depth][children[:, 0], children[:, 1], children[:, 2]]
+            nodes.append(self.encode(values))
+            level_starts.append(level_starts[-1] + len(values))
+            coords = children[values == MIXED]
+        self.nodes = np.concatenate(nodes).astype(np.int16)
+        self.level_starts = np.array(level_starts, dtype=np.uint16)
+
+    @staticmethod
+    def encode(values):
+        """A MIXED bejegyzések cseréje -(rang + 1)-re a szinten belül."""
+        mixed = values == MIXED
+        ranks = np.cumsum(mixed) - 1
+        return np.where(mixed, -(ranks + 1), values)
+
+    def nbytes(self):
+        return self.nodes.nbytes + self.level_starts.nbytes
+
+    def materials(self):
+        return np.unique(self.nodes[self.nodes >= 0]).astype(self.dtype)
+
+    def leaf(self, lx, ly, lz):
+        """(anyag, lo (x, y, z), él hossz) a voxelt tartalmazó levél csomópontra."""
+        index = 0
+        size = CHUNK_SIZE
+        depth = 0
+        while self.nodes[index] < 0:
+            rank = -int(self.nodes[index]) - 1
+            size //= 2
+            octant = ((lx // size) % 2) * 4 + ((ly // size) % 2) * 2 + (lz // size) % 2
+            depth += 1
+            index = int(self.level_starts[depth]) + 8 * rank + octant
+        lo = (lx - lx % size, ly - ly % size, lz - lz % size)
+        return int(self.nodes[index]), lo, size
+
+    def get(self, lx, ly, lz):
+        return self.leaf(lx, ly, lz)[0]
+
+    def get_many(self, lx, ly, lz):
+        """get() lokális koordináta tömbökre: szintenként egy vektorizált lépés."""
+        lx, ly, lz = np.broadcast_arrays(np.asarray(lx), np.asarray(ly), np.asarray(lz))
+        index = np.zeros(lx.shape, dtype=np.int64)
+        size = CHUNK_SIZE
+        for depth in range(1, len(self.level_starts) - 1):
+            values = self.nodes[index]
+            inner = values < 0
+            if not inner.any():
+                break
+            size //= 2
+            octant = ((lx // size) % 2) * 4 + ((ly // size) % 2) * 2 + (lz // size) % 2
+            child = int(self.level_starts[depth]) + 8 * (-values.astype(np.int64) - 1) + octant
+            index = np.where(inner, child, index)
+        return self.nodes[index].astype(self.dtype)
+
+    def empty_box(self, lx, ly, lz):
+        """Ha a voxel levegő, a tartalmazó levegő levél (lo, hi) zárt doboza, különben None."""
+        material, lo, size = self.leaf(lx, ly, lz)
+        if material != AIR:
+            return None
+        return lo, (lo[0] + size - 1, lo[1] + size - 1, lo[2] + size - 1)
+
+    def leaves(self):
+        """
+        Régió bejárás a mesher / elemzések számára: szintenként
+        (lo (n, 3) voxel index, él hossz, anyagok (n,)) a levél csomópontokról.
+        """
+        coords = np.zeros((1, 3), dtype=np.int64)
+        size = CHUNK_SIZE
+        for depth in range(len(self.level_starts) - 1):
+            values = self.nodes[self.level_starts[depth]:self.level_starts[depth + 1]]
+            if depth > 0:
+                coords = (coords[:, None, :] * 2 + OCTANT_OFFSETS[None, :, :]).reshape(-1, 3)
+                size //= 2
+            leaf = values >= 0
+            yield coords[leaf] * size, size, values[leaf]
+            coords = coords[~leaf]
+
+    def decode(self):
+        """A sűrű tömb visszaállítása: a levelek dobozainak kitöltése."""
+        voxels = np.zeros((CHUNK_SIZE, CHUNK_SIZE, CHUNK_SIZE), dtype=self.dtype)
+        for lo, size, materials in self.leaves():
+            if size == 1:
+                voxels[lo[:, 0], lo[:, 1], lo[:, 2]] = materials
+                continue
+            for (x, y, z), material in zip(lo, materials):
+                if material != AIR:
+                    voxels[x:x + size, y:y + size, z:z + size] = material
+        return voxels
+
+    def solid_count(self):
+        return int(sum(size ** 3 * np.count_nonzero(materials != AIR)
+                       for _, size, materials in self.leaves()))
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+# Sugárvetés közvetlenül a voxel tömbökön (Amanatides–Woo rács bejárás / DDA).
+# Nincs szükség voxelenkénti CollisionNode-ra és CollisionTraverser-re: a sugár
+# cellánként lép végig a rácson, és az első nem-levegő voxelnél megáll.
+# A voxel középpontok egész koordinátán vannak, egy voxel a [-0.5, +0.5) tartományt
+# fedi le; a bejárás ezért a +0.5-tel eltolt rácsban dolgozik.
+
+from collections import namedtuple
+import math
+
+import numpy as np
+
+from VoxelChunk import VOXEL_SIZE, AIR
+
+# voxel: (x, y, z) globális voxel index, material: anyag id,
+# normal: a belépési lap normálja (pl. (0, 0, 1) = felülről találtuk el),
+# distance: távolság a sugár kezdőpontjától világegységben
+RayHit = namedtuple("RayHit", ["voxel", "material", "normal", "distance"])
+
+
+def raycast(lookup, origin, direction, max_distance=64.0):
+    """
+    Egyetlen sugár bejárása. lookup(x, y, z) -> anyag id (pl. VoxelWorld.get_voxel).
+    Visszatérés: RayHit, vagy None, ha max_distance-en belül nincs találat.
+    Ha a kezdőpont már tömör voxelben van, a normál (0, 0, 0) és a távolság 0.
+    """
+    length = math.sqrt(sum(c * c for c in direction))
+    if length == 0.0:
+        return None
+    d = [c / length for c in direction]
+    p = [c / VOXEL_SIZE + 0.5 for c in origin]
+    cell = [int(math.floor(c)) for c in p]
+    max_t = max_distance / VOXEL_SIZE
+
+    material = lookup(*cell)
+    if material != AIR:
+        return RayHit(tuple(cell), material, (0, 0, 0), 0.0)
+
+    step = [0, 0, 0]
+    t_max = [math.inf, math.inf, math.inf]
+    t_delta = [math.inf, math.inf, math.inf]
+    for k in range(3):
+        if d[k] > 0.0:
+            step[k] = 1
+            t_delta[k] = 1.0 / d[k]
+            t_max[k] = (cell[k] + 1 - p[k]) * t_delta[k]
+        elif d[k] < 0.0:
+            step[k] = -1
+            t_delta[k] = -1.0 / d[k]
+            t_max[k] = (p[k] - cell[k]) * t_delta[k]
+
+    while True:
+        # A legközelebbi cellahatár tengelye mentén lépünk
+        if t_max[0] < t_max[1]:
+            axis = 0 if t_max[0] < t_max[2] else 2
+        else:
+            axis = 1 if t_max[1] < t_max[2] else 2
+        t = t_max[axis]
+        if t > max_t:
+            return None
+        cell[axis] += step[axis]
+        t_max[axis] += t_delta[axis]
+
+        material = lookup(*cell)
+        if material != AIR:
+            normal = [0, 0, 0]
+            normal[axis] = -step[axis]
+            return RayHit(tuple(cell), material, tuple(normal), t * VOXEL_SIZE)
+
+
+def raycast_sparse(lookup, empty_box, origin, direction, max_distance=64.0):
+    """
+    raycast() az üres tartományok átugrásával. empty_box(x, y, z) -> (lo, hi) zárt
+    voxel index doboz, ha a voxel levegő (pl. VoxelWorld.empty_box), különben None.
+    Egy lépés a teljes levegő dobozon visz át, így a terep feletti üres térben
+    (hiányzó chunk, oktális fa levél, RLE levegő futás) nem cellánként lépünk.
+    """
+    length = math.sqrt(sum(c * c for c in direction))
+    if length == 0.0:
+        return None
+    d = [c / length for c in direction]
+    p = [c / VOXEL_SIZE + 0.5 for c in origin]
+    cell = [int(math.floor(c)) for c in p]
+    max_t = max_distance / VOXEL_SIZE
+
+    t = 0.0
+    normal = (0, 0, 0)
+    while True:
+        box = empty_box(*cell)
+        if box is None:
+            return RayHit(tuple(cell), lookup(*cell), normal, t * VOXEL_SIZE)
+        lo, hi = box
+
+        # A doboz elhagyása: a legkorábbi tengelyirányú kilépés
+        t_exit = math.inf
+        axis = -1
+        for k in range(3):
+            if d[k] > 0.0:
+                t_k = (hi[k] + 1 - p[k]) / d[k]
+            elif d[k] < 0.0:
+                t_k = (lo[k] - p[k]) / d[k]
+            else:
+                continue
+            if t_k < t_exit:
+                t_exit, axis = t_k, k
+        if t_exit > max_t:
+            return None
+        t = t_exit
+
+        # A szomszéd cella a kilépési lapon túl; a többi tengelyen a dobozon
+        # belül maradunk, hogy holtversenynél se lépjünk át átlósan egy voxelt
+        for k in range(3):
+            cell[k] = min(max(int(math.floor(p[k] + d[k] * t)), lo[k]), hi[k])
+        step = 1 if d[axis] > 0.0 else -1
+        cell[axis] = hi[axis] + 1 if step > 0 else lo[axis] - 1
+        normal = [0, 0, 0]
+        normal[axis] = -step
+        normal = tuple(normal)
+
+
+def raycast_batch(lookup_array, origins, directions, max_distance=64.0):
+    """
+    Sok sugár egyszerre, NumPy tömbökön (pl. AI látótávolság vizsgálat).
+    lookup_array(cells) -> anyag id tömb, cells: (N, 3) int tömb (pl. VoxelWorld.get_voxels).
+    origins, directions: (N, 3) tömbök; max_distance: skalár vagy (N,) tömb.
+    Visszatérés: (hit (N,) bool, voxels (N, 3), normals (N, 3), distances (N,));
+    találat nélküli sugárnál a távolság inf.
+    """
+    origins = np.asarray(origins, dtype=np.float64).reshape(-1, 3)
+    directions = np.asarray(directions, dtype=np.float64).reshape(-1, 3)
+    n = len(origins)
+    max_t = np.broadcast_to(np.asarray(max_distance, dtype=np.float64), (n,)) / VOXEL_SIZE
+
+    lengths = np.linalg.norm(directions, axis=1)
+    valid = lengths > 0.0
+    d = directions / np.where(valid, lengths, 1.0)[:, None]
+    p = origins / VOXEL_SIZE + 0.5
+    cells = np.floor(p).astype(np.int64)
+
+    step = np.sign(d).astype(np.int64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_delta = np.where(step != 0, 1.0 / np.abs(d), np.inf)
+        t_max = np.where(step > 0, (cells + 1 - p) * t_delta,
+                         np.where(step < 0, (p - cells) * t_delta, np.inf))
+
+    normals = np.zeros((n, 3), dtype=np.int64)
+    distances = np.full(n, np.inf)
+    hit = np.zeros(n, dtype=bool)
+
+    solid = valid & (lookup_array(cells) != AIR)
+    hit |= solid
+    distances[solid] = 0.0
+
+    # Egy sugár legfeljebb ennyi cellahatárt léphet át max_t távolságon belül
+    max_steps = int(math.ceil(np.max(max_t, initial=0.0) * math.sqrt(3.0))) + 3
+    active = np.flatnonzero(valid & ~hit)
+    for _ in range(max_steps):
+        if len(active) == 0:
+            break
+        axis = np.argmin(t_max[active], axis=1)
+        t = t_max[active, axis]
+        inside = t <= max_t[active]
+        active, axis, t = active[inside], axis[inside], t[inside]
+
+        cells[active, axis] += step[active, axis]
+        t_max[active, axis] += t_delta[active, axis]
+
+        found = lookup_array(cells[active]) != AIR
+        done = active[found]
+        hit[done] = True
+        distances[done] = t[found] * VOXEL_SIZE
+        normals[done, axis[found]] = -step[done, axis[found]]
+        active = active[~found]
+
+    return hit, cells, normals, distances
+
+
+def line_of_sight(lookup_array, eyes, targets):
+    """
+    (N,) bool tömb: True, ha az eyes[i] és targets[i] pont között nincs tömör voxel.
+    """
+    eyes = np.asarray(eyes, dtype=np.float64).reshape(-1, 3)
+    targets = np.asarray(targets, dtype=np.float64).reshape(-1, 3)
+    directions = targets - eyes
+    lengths = np.linalg.norm(directions, axis=1)
+    hit, _, _, distances = raycast_batch(lookup_array, eyes, directions, lengths)
+    return ~hit | (distances >= lengths)
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+# Voxel terep generálás (magasságtérkép + 3D zaj barlangok -> chunk voxel tömbök).
+# Külön modulban van, hogy a háttérben futó worker processzek is importálhassák
+# a ShowBase alkalmazás nélkül.
+
+import math
+import numpy as np
+
+from VoxelChunk import CHUNK_SIZE, AIR, VoxelChunk
+from ChunkStore import ChunkStore, voxel_column_arrays, stored_voxels
+from FractalNoise import NoiseParams, noise_tile, noise_region, fbm3
+
+# A generátor verziója: ha a terep algoritmusa változik, növelni kell,
+# így a lemezen lévő régi chunk cache automatikusan érvénytelen lesz
+# (a cache-elt oszlop a sütött mesh-eket is tartalmazza, így mesher változásnál is)
+TERRAIN_VERSION = 6
+
+# A terep zaja: 64 voxeles alap hullámhossz, 5 oktáv, enyhe domain warp
+TERRAIN_NOISE = NoiseParams(scale=1.0 / 64.0, octaves=5, lacunarity=2.0, gain=0.5,
+                            warp_strength=24.0, warp_scale=1.0 / 128.0, warp_octaves=2)
+TERRAIN_BASE_HEIGHT = 7.0  # A zaj 0 értékéhez tartozó magasság
+TERRAIN_AMPLITUDE = 16.0   # A zaj [-1, 1] tartományának magasság szorzója
+
+# Barlangok: ahol a 3D zaj abszolút értéke CAVE_WIDTH alatt van, ott alagút fut
+# (a zaj nulla-szintfelülete mentén). A sűrűség mező egysége kb. voxel távolság.
+CAVE_NOISE = NoiseParams(scale=1.0 / 24.0, octaves=2, lacunarity=2.0, gain=0.5)
+CAVE_SEED = 104729
+CAVE_WIDTH = 0.08
+CAVE_SCALE = 8.0        # A zaj -> voxel távolság szorzó (a zaj meredeksége kb. 1/8 / voxel)
+CAVE_MIN_DEPTH = 3.0    # Ennél sekélyebben az alagutak fokozatosan elzáródnak
+CAVE_FLOOR = 1.5        # A z = 0 kőréteg felett legalább ennyi marad meg
+
+# A régi, egyszerű zajgenerátor (a WorldGenBenchmark régi útja használja)
+def simple_noise(x, y, scale=0.1, amplitude=10.0):
+    """
+    Egy egyszerű hullámzó zajfüggvény a magasság kiszámításához.
+    """
+    return int(amplitude * (math.sin(x * scale) + math.cos(y * scale)) + amplitude)
+
+def simple_noise_array(x, y, scale=0.1, amplitude=10.0):
+    """
+    A simple_noise() vektorizált változata: x és y NumPy tömbök (broadcastolhatók),
+    az eredmény egész magasságtérkép.
+    """
+    return (amplitude * (np.sin(x * scale) + np.cos(y * scale)) + amplitude).astype(np.int32)
+
+def surface_heights(x0, y0, width, height, world_size=None, seed=0):
+    """
+    A [x0, x0 + width) x [y0, y0 + height) terület folytonos (nem kerekített)
+    felszín magassága a zaj csempékből; column_heights() ennek egészrésze.
+    """
+    noise = noise_region(seed, x0, y0, width, height, CHUNK_SIZE, TERRAIN_NOISE)
+    heights = np.maximum(TERRAIN_BASE_HEIGHT + TERRAIN_AMPLITUDE * noise, 1.0)
+    if world_size is not None:
+        x = x0 + np.arange(width)
+        y = y0 + np.arange(height)
+        inside_x = (x >= -world_size) & (x < world_size)
+        inside_y = (y >= -world_size) & (y < world_size)
+        heights = np.where(inside_x[:, None] & inside_y[None, :], heights, 0.0)
+    return heights
+
+def cave_field(x, y, z, depth, seed=0):
+    """
+    A barlang sűrűség a felszín alatti (depth >= 0) pontokban: negatív = kivájt.
+    cave_walls() a pontok falvastagítása, a zajból legfeljebb CAVE_WIDTH * CAVE_SCALE
+    vonódik le, így ahol a fal ennél vastagabb, ott nem lehet barlang.
+    """
+    cave = fbm3(x, y, z, seed + CAVE_SEED, CAVE_NOISE.scale,
+                CAVE_NOISE.octaves, CAVE_NOISE.lacunarity, CAVE_NOISE.gain)
+    return (np.abs(cave) - CAVE_WIDTH) * CAVE_SCALE + cave_walls(z, depth)
+
+def cave_walls(z, depth):
+    """A felszín közelében és a talapzat felett a barlang "falai" vastagodnak."""
+    return np.maximum(CAVE_MIN_DEPTH - depth, 0.0) + np.maximum(CAVE_FLOOR - z, 0.0) * 4.0
+
+def terrain_density(x0, y0, z0, size, world_size=None, seed=0, heights=None):
+    """
+    A terep sűrűség mezője a voxel középpontokon: (size, size, size) float32 tömb
+    az (x0 + i, y0 + j, z0 + k) pontokban. Pozitív = tömör, negatív = levegő; a
+    nulla-szintfelület a terep felszíne, a mező kb. voxel távolság egységű.
+    A felszín tag (h - 1 - z) >= 0 pontosan akkor, ha z < floor(h), így a
+    barlangok nélküli tömör voxelek megegyeznek a magasságtérképes kitöltéssel.
+    A barlang zajt csak a felszín alatti pontokban számoljuk.
+    heights: a terület surface_heights() tömbje, ha a hívó már kiszámolta.
+    """
+    if heights is None:
+        heights = surface_heights(x0, y0, size, size, world_size, seed)
+    z = z0 + np.arange(size)
+    density = heights[:, :, None] - 1.0 - z[None, None, :]
+    below = np.nonzero(density >= 0.0)
+    if len(below[0]):
+        depth = density[below]
+        cave = cave_field(x0 + below[0], y0 + below[1], z[below[2]], depth, seed)
+        density[below] = np.minimum(depth, cave)
+    return density.astype(np.float32)
+
+def cave_mask(x0, y0, z0, heights, seed=0):
+    """
+    A (CHUNK_SIZE,)^3 chunk kivájt voxelei: ugyanaz, mint terrain_density() < 0
+    a felszín alatt, de a zajt csak ott számoljuk, ahol a fal elég vékony
+    ahhoz, hogy barlang lehessen (a felszín alatti néhány réteg és a talapzat
+    kimarad). heights: a chunk oszlop surface_heights() tömbje.
+    """
+    z = z0 + np.arange(CHUNK_SIZE)
+    depth = heights[:, :, None] - 1.0 - z[None, None, :]
+    walls = cave_walls(z[None, None, :], depth)
+    candidates = np.nonzero((depth >= 0.0) & (walls < CAVE_WIDTH * CAVE_SCALE))
+    mask = np.zeros(depth.shape, dtype=bool)
+    if len(candidates[0]):
+        mask[candidates] = cave_field(x0 + candidates[0], y0 + candidates[1], z[candidates[2]],
+                                      depth[candidates], seed) < 0.0
+    return mask
+
+def column_heights(cx, cy, world_size=None, seed=0):
+    """
+    A (cx, cy) chunk oszlop (CHUNK_SIZE, CHUNK_SIZE) magasságtérkép csempéje,
+    egyben NumPy tömbként, a seedelt fraktál zajból (a zaj csempe LRU cache-elt,
+    így a szomszéd oszlopok újraépítése nem számolja újra).
+    Ha world_size meg van adva, a [-world_size, world_size)
+    négyzeten kívüli oszlopok magassága 0 (véges világ), különben a világ végtelen.
+    """
+    x = cx * CHUNK_SIZE + np.arange(CHUNK_SIZE)
+    y = cy * CHUNK_SIZE + np.arange(CHUNK_SIZE)
+    noise = noise_tile(seed, cx, cy, CHUNK_SIZE, TERRAIN_NOISE)
+    heights = np.maximum(np.floor(TERRAIN_BASE_HEIGHT + TERRAIN_AMPLITUDE * noise), 1).astype(np.int32)
+    if world_size is not None:
+        inside_x = (x >= -world_size) & (x < world_size)
+        inside_y = (y >= -world_size) & (y < world_size)
+        heights = np.where(inside_x[:, None] & inside_y[None, :], heights, 0)
+    return heights
+
+def generate_column(cx, cy, world_size=None, seed=0):
+    """
+    A (cx, cy) chunk oszlop összes nem üres chunkja: a magasságtérképből kitöltve
+    (anyagok), majd a sűrűség mező negatív pontjain a barlangok kivájva.
+    """
+    x0, y0 = cx * CHUNK_SIZE, cy * CHUNK_SIZE
+    # A folytonos felszínt oszloponként egyszer számoljuk; egészrésze a column_heights()
+    surface = surface_heights(x0, y0, CHUNK_SIZE, CHUNK_SIZE, world_size, seed)
+    heights = np.floor(surface).astype(np.int32)
+    max_height = int(heights.max())
+    chunks = []
+    for cz in range((max_height + CHUNK_SIZE - 1) // CHUNK_SIZE):
+        chunk = VoxelChunk((cx, cy, cz))
+        chunk.fill_from_heights(heights)
+        chunk.voxels[cave_mask(x0, y0, cz * CHUNK_SIZE, surface, seed)] = AIR
+        chunks.append(chunk)
+    return chunks
+
+def open_voxel_store(cache_dir, world_size=None, seed=0):
+    """A voxel világ chunk cache-e; a véges és a végtelen világ külön névtérbe kerül."""
+    namespace = f"voxel_{world_size}" if world_size is not None else "voxel_inf"
+    return ChunkStore(cache_dir, namespace, seed=seed, version=TERRAIN_VERSION)
+
+def load_or_generate_column(cx, cy, world_size=None, store=None, seed=0):
+    """
+    A (cx, cy) oszlop chunkjai: ha a cache-ben megvannak, onnan (fájl olvasás),
+    különben generálva és a cache-be elmentve. A store-t ugyanazzal a seeddel
+    kell megnyitni (open_voxel_store), különben más terep kerülne a cache-be.
+    """
+    if store is not None:
+        arrays = store.load_column(cx, cy)
+        if arrays is not None:
+            chunks = []
+            for cz, voxels in sorted(stored_voxels(arrays).items()):
+                chunk = VoxelChunk((cx, cy, cz))
+                chunk.voxels = voxels
+                chunks.append(chunk)
+            return chunks
+
+    chunks = generate_column(cx, cy, world_size, seed)
+    if store is not None:
+        store.save_column(cx, cy, voxel_column_arrays(chunks))
+    return chunks
+
+def generate_chunks(world_size, store=None, seed=0):
+    """
+    A [-world_size, world_size) négyzet összes chunkja, oszloponként
+    NumPy csempékben generálva (vagy a cache-ből betöltve).
+    Visszatérés: {chunk koordináta: VoxelChunk}
+    """
+    first_chunk = -world_size // CHUNK_SIZE
+    last_chunk = (world_size - 1) // CHUNK_SIZE
+
+    chunks = {}
+    for cx in range(first_chunk, last_chunk + 1):
+        for cy in range(first_chunk, last_chunk + 1):
+            for chunk in load_or_generate_column(cx, cy, world_size, store, seed):
+                chunks[chunk.coord] = chunk
+    return chunks
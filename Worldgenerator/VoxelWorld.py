@@ -5,27 +5,41 @@
 from panda3d.core import (
     PandaNode, NodePath, GeomVertexFormat, GeomVertexData, GeomVertexWriter, 
     GeomTriangles, Geom, GeomNode, LVector3f, LColor, ClockObject,
-    GeomVertexArrayFormat, InternalName
+    GeomVertexArrayFormat, InternalName, Point3, LODNode, KeyboardButton
 )
 from direct.showbase.ShowBase import ShowBase
 import math
 import random
+import time
+import numpy as np
 
-# --- GLOBÁLIS GEOMETRIA BEÁLLÍTÁSOK ---
-
-# Explicit vertex format definíció: Pozíció (V3), Szín (C4), Normál (N3)
-array_format = GeomVertexArrayFormat()
-array_format.add_column(InternalName.make("vertex"), 3, Geom.NT_float32, Geom.C_point)
-array_format.add_column(InternalName.make("color"), 4, Geom.NT_float32, Geom.C_color)
-array_format.add_column(InternalName.make("normal"), 3, Geom.NT_float32, Geom.C_normal)
+from VoxelChunk import (
+    VOXEL_SIZE, HALF_VOXEL, CHUNK_SIZE, AIR, STONE, LAMP, VoxelChunk, CompressedVoxels,
+    MATERIAL_COLORS, chunk_coord, local_coord, surface_material
+)
+from VoxelMesher import (
+    CUSTOM_VOXEL_FORMAT, MESHER_CULLED, FACE_NORMALS, voxel_format, mesh_key
+)
+from SmoothMesher import MESHER_SMOOTH, build_mesh
+from PackedVertices import apply_textured_shader
+from VoxelMaterials import DEFAULT_MATERIALS
+from ChunkStreaming import ChunkStreamer
+from ChunkWorkers import ChunkBuildPool
+from GeomBuffers import geom_node_from_packed
+from GeomUploader import GeomUploadScheduler
+from VoxelTerrain import generate_chunks, load_or_generate_column, open_voxel_store
+from ChunkStore import DEFAULT_CACHE_DIR, stored_mesh, mesh_arrays, voxel_column_arrays
+from VoxelRaycast import raycast_sparse
+from VoxelOctree import VoxelOctree
+from VoxelLod import lod_factors, build_lod_meshes, stored_lods, lod_mesh_arrays
+from VoxelLight import light_columns, ensure_lit, relight_region
+from VoxelCharacter import CharacterController
 
-CUSTOM_VOXEL_FORMAT = GeomVertexFormat.registerFormat(array_format)
+# Tömörített voxel tárolási módok: paletta + oszlop RLE, vagy ritka oktális fa
+VOXEL_STORAGE = {"rle": CompressedVoxels, "octree": VoxelOctree}
 
 # --- GEOMETRIA DEFINÍCIÓK ÉS SEGÉDFÜGGVÉNYEK ---
 
-VOXEL_SIZE = 1.0  # Egy kocka mérete
-HALF_VOXEL = VOXEL_SIZE / 2.0
-
 # Kocka sarokpontjai lokális koordinátákban
 CUBE_VERTICES = [
     LVector3f(-HALF_VOXEL, -HALF_VOXEL, -HALF_VOXEL), # 0
@@ -55,16 +69,11 @@ CUBE_FACES = [
     (( 1, 0, 0), [1, 5, 6, 2]),
 ]
 
-# Egyszerű zajgenerátor (Perlin zaj helyett)
-def simple_noise(x, y, scale=0.1, amplitude=10.0):
-    """
-    Egy egyszerű hullámzó zajfüggvény a magasság kiszámításához.
-    """
-    return int(amplitude * (math.sin(x * scale) + math.cos(y * scale)) + amplitude)
-
 def make_cube(x_idx, y_idx, z_idx, color):
     """
     Létrehoz egy kocka (voxel) modellt a megadott rács koordinátán.
+    Régi, voxelenként külön GeomNode-ot építő változat; a világ már
+    chunkonként épül (lásd VoxelMesher), ez csak összehasonlításra maradt meg.
     """
     center_pos = LVector3f(
         x_idx * VOXEL_SIZE,
@@ -127,7 +136,9 @@ def make_cube(x_idx, y_idx, z_idx, color):
 # --- FŐ ALKALMAZÁS ---
 
 class VoxelWorld(ShowBase):
-    def __init__(self):
+    def __init__(self, mesher_mode=MESHER_CULLED, stream_radius=None, workers=None,
+                 cache_dir=DEFAULT_CACHE_DIR, lod_distances=(48.0, 96.0), packed_vertices=True,
+                 voxel_storage="rle", seed=0):
         ShowBase.__init__(self)
         self.setBackgroundColor(0.2, 0.2, 0.4) # Sötétkék égbolt
 
@@ -153,7 +164,92 @@ class VoxelWorld(ShowBase):
 
         # Globális változók
         self.world_size = 15 # A generált rács mérete
-        self.generate_world()
+        # Mesher stratégia: "naive", "culled" vagy "greedy" (CPU idő vs. GPU vertex terhelés),
+        # vagy "smooth": sima felület a terep sűrűség mezőjéből (Surface Nets)
+        self.mesher_mode = mesher_mode
+        if mesher_mode == MESHER_SMOOTH:
+            # A sima felület szabad normáljait a tömörített formátum nem tudja tárolni,
+            # a kocka LOD-ok pedig nem illeszkednének hozzá
+            packed_vertices = False
+            lod_distances = ()
+        # LOD váltási távolságok: LOD0 a lod_distances[0]-ig, LOD1 a következőig, ...
+        # (None vagy üres: mindig teljes felbontás); a LOD<i> szint szorzója 2^i
+        self.lod_distances = tuple(lod_distances or ())
+        self.lod_factors = lod_factors(len(self.lod_distances))
+        self.chunks = {}
+        self.world_root = self.render.attachNewNode("WorldRoot")
+
+        # A kész chunk node-ok frame-enként upload_budget_ms időkeretben, a kamerához
+        # legközelebbivel kezdve kerülnek a jelenetgráfba (első kirajzolási akadás ellen)
+        self.uploader = GeomUploadScheduler(self.world_root, self.win.getGsg() if self.win else None,
+                                            budget_ms=2.0)
+        self.taskMgr.add(self.geom_upload_task, "GeomUploadTask", sort=10)
+
+        # Tömörített vertex formátum (12 byte / vertex a 40 helyett), saját shaderrel dekódolva;
+        # az anyagok textúrái egyetlen textúra tömbben, a réteg indexe a vertexben van
+        self.packed_vertices = packed_vertices
+        self.vertex_format = voxel_format(packed_vertices)
+        self.mesh_key = mesh_key(mesher_mode, packed_vertices)
+        self.materials = DEFAULT_MATERIALS
+        if packed_vertices:
+            self.material_textures = self.materials.make_texture_array()
+            apply_textured_shader(self.world_root, FACE_NORMALS, self.material_textures)
+
+        # A terep zaj seedje (a chunk cache kulcsának is része)
+        self.seed = seed
+
+        # Lemezen tárolt chunk cache (cache_dir=None: mindig újragenerálás)
+        self.cache_dir = cache_dir
+        # A terep véges (world_size) vagy végtelen (None); a smooth mesher sűrűség mezőjéhez is kell
+        self.terrain_size = None if stream_radius is not None else self.world_size
+        self.store = open_voxel_store(cache_dir, self.terrain_size, seed) if cache_dir else None
+
+        # Háttér processz pool a generáláshoz és mesh-eléshez (workers=0: szinkron építés)
+        if workers == 0:
+            self.pool = None
+        else:
+            self.pool = ChunkBuildPool(workers)
+            self.finalExitCallbacks.append(self.pool.shutdown)
+            self.taskMgr.add(self.upload_task, "ChunkUploadTask")
+
+        # Egérrel való voxel kijelölés: bal gomb ás, jobb gomb követ, középső lámpát rak le
+        self.accept("mouse1", self.dig_at_mouse)
+        self.accept("mouse3", self.place_at_mouse)
+        self.accept("mouse2", self.place_at_mouse, [LAMP])
+
+        # Séta mód (F): WASD mozgás, nyilak a nézéshez, szóköz ugrás; a karakter
+        # ütközése közvetlenül a voxel tömbökön történik (CharacterController)
+        self.player = None
+        self.player_heading = 0.0
+        self.player_pitch = 0.0
+        self.walk_speed = 5.0
+        self.eye_height = 1.6
+        self.fall_limit = -HALF_VOXEL  # Ez alá zuhanva a karakter újraéled
+        self.accept("f", self.toggle_walk_mode)
+
+        # Szerkesztés után újraépítendő chunkok; frame-enként legfeljebb
+        # remesh_budget_ms ideig dolgozzuk fel őket, a kamerához legközelebbivel kezdve
+        self.dirty_chunks = set()
+        self.edited_columns = set()
+        self.stale_chunks = set()  # A lemez cache-ben elavult mesh-ű chunkok
+        self.remesh_budget_ms = 4.0
+        self.taskMgr.add(self.remesh_task, "ChunkRemeshTask")
+
+        # A nem szerkesztett chunkok voxeljei időnként tömörülnek (compact_interval
+        # másodpercenként): "rle" = paletta + oszlop RLE (magasságmezőhöz a legkisebb),
+        # "octree" = ritka oktális fa (magas, üregekkel teli világokhoz)
+        self.voxel_codec = VOXEL_STORAGE[voxel_storage]
+        self.compact_interval = 2.0
+        self.taskMgr.doMethodLater(self.compact_interval, self.compact_task, "VoxelCompactTask")
+
+        if stream_radius is None:
+            # Véges világ: a teljes world_size négyzet egyszerre épül fel
+            self.streamer = None
+            self.generate_world()
+        else:
+            # Végtelen világ: csak a kamera körüli stream_radius sugarú kör van betöltve
+            self.streamer = ChunkStreamer(self, radius=stream_radius)
+            self.taskMgr.add(self.streaming_task, "ChunkStreamingTask")
 
     def camera_task(self, task):
         """Kamera körbeforgatása a világ körül."""
@@ -171,56 +267,532 @@ class VoxelWorld(ShowBase):
         
         return task.cont
 
+    # --- SÉTA MÓD ---
+
+    def toggle_walk_mode(self):
+        """Váltás a keringő kamera és a talajon sétáló karakter között."""
+        if self.player is not None:
+            self.player = None
+            self.taskMgr.remove("PlayerWalkTask")
+            self.taskMgr.add(self.camera_task, "CameraControlTask")
+            return
+        x, y, _ = self.camera.getPos(self.render)
+        self.player = CharacterController(self.get_voxels, self.spawn_point(x, y))
+        self.player_heading = self.camera.getH(self.render)
+        self.player_pitch = 0.0
+        self.taskMgr.remove("CameraControlTask")
+        self.taskMgr.add(self.walk_task, "PlayerWalkTask")
+
+    def spawn_point(self, x, y):
+        """
+        A karakter kezdőpontja: az (x, y)-hoz (pl. a keringő kamerához, ami a
+        térképen kívül is lehet) legközelebbi betöltött oszlop közepe, a felszínen.
+        Ha egyik oszlop közepe alatt sincs talaj, a térkép közepe fölé kerül.
+        """
+        size = CHUNK_SIZE * VOXEL_SIZE
+        columns = {coord[:2] for coord, chunk in self.chunks.items() if not chunk.is_empty()}
+        def distance(column):
+            return ((column[0] + 0.5) * size - x) ** 2 + ((column[1] + 0.5) * size - y) ** 2
+        for cx, cy in sorted(columns, key=distance):
+            spawn_x, spawn_y = (cx + 0.5) * size, (cy + 0.5) * size
+            z = self.ground_height(spawn_x, spawn_y)
+            if z is not None:
+                return spawn_x, spawn_y, z
+        return 0.0, 0.0, self.ground_height(0.0, 0.0) or 0.0
+
+    def ground_height(self, x, y, top=256.0):
+        """A terep felszínének magassága (világkoordináta) az (x, y) pont alatt, vagy None."""
+        hit = raycast_sparse(self.get_voxel, self.empty_box, (x, y, top), (0, 0, -1), 2 * top)
+        if hit is None:
+            return None
+        return (hit.voxel[2] + 1) * VOXEL_SIZE - HALF_VOXEL
+
+    def walk_task(self, task):
+        """A karakter mozgatása a lenyomott billentyűk alapján, a kamera a szemmagasságban."""
+        dt = min(globalClock.getDt(), 0.1)
+        watcher = self.mouseWatcherNode  # Ablak nélkül (offscreen) nincs bemenet
+        is_down = watcher.is_button_down if watcher is not None else (lambda button: False)
+        turn = is_down(KeyboardButton.left()) - is_down(KeyboardButton.right())
+        look = is_down(KeyboardButton.up()) - is_down(KeyboardButton.down())
+        self.player_heading += 90.0 * turn * dt
+        self.player_pitch = min(max(self.player_pitch + 60.0 * look * dt, -85.0), 85.0)
+
+        forward = is_down(KeyboardButton.ascii_key("w")) - is_down(KeyboardButton.ascii_key("s"))
+        strafe = is_down(KeyboardButton.ascii_key("d")) - is_down(KeyboardButton.ascii_key("a"))
+        heading = math.radians(self.player_heading)
+        move_x = (-math.sin(heading) * forward + math.cos(heading) * strafe) * self.walk_speed
+        move_y = (math.cos(heading) * forward + math.sin(heading) * strafe) * self.walk_speed
+        x, y, z = self.player.update(dt, move_x, move_y, is_down(KeyboardButton.space()))
+        if z < self.fall_limit:
+            # Leesett a világról (pl. a térkép szélén vagy egy kiásott lyukon át): újraéled
+            self.player.position = list(self.spawn_point(x, y))
+            self.player.velocity = [0.0, 0.0, 0.0]
+            x, y, z = self.player.position
+
+        self.camera.setPos(x, y, z + self.eye_height)
+        self.camera.setHpr(self.player_heading, self.player_pitch, 0)
+        return task.cont
+
     def get_color_by_height(self, height):
         """Magasság alapján színt rendel a voxelhez (Minecraft-stílusú biómok)."""
-        if height < 3:
-            # Víz (kék)
-            return LColor(0.1, 0.4, 0.9, 1) 
-        elif height < 7:
-            # Fű/Síkság (világos zöld)
-            return LColor(0.3, 0.8, 0.3, 1) 
-        elif height < 12:
-            # Hegyoldal (szürke-barna)
-            return LColor(0.6, 0.5, 0.4, 1)
-        else:
-            # Csúcs/Hó (TISZTA FEHÉR)
-            return LColor(1.0, 1.0, 1.0, 1) 
-        
+        return MATERIAL_COLORS[surface_material(height)]
+
+    def get_chunk(self, coord, create=False):
+        """Visszaadja a chunkot a koordinátán (ha create=True, létre is hozza)."""
+        chunk = self.chunks.get(coord)
+        if chunk is None and create:
+            chunk = VoxelChunk(coord)
+            self.chunks[coord] = chunk
+        return chunk
+
+    def get_voxel(self, x_idx, y_idx, z_idx):
+        """A globális (x, y, z) voxel anyaga; nem létező chunk esetén levegő (0)."""
+        chunk = self.chunks.get(chunk_coord(x_idx, y_idx, z_idx))
+        if chunk is None:
+            return 0
+        return chunk.get(*local_coord(x_idx, y_idx, z_idx))
+
+    def empty_box(self, x_idx, y_idx, z_idx):
+        """
+        Ha a voxel levegő, a tartalmazó egynemű levegő tartomány (lo, hi) zárt
+        doboza globális voxel indexben (hiányzó chunknál a teljes chunk), különben None.
+        """
+        coord = chunk_coord(x_idx, y_idx, z_idx)
+        origin = [c * CHUNK_SIZE for c in coord]
+        chunk = self.chunks.get(coord)
+        if chunk is None:
+            return tuple(origin), tuple(o + CHUNK_SIZE - 1 for o in origin)
+        box = chunk.empty_box(*local_coord(x_idx, y_idx, z_idx))
+        if box is None:
+            return None
+        lo, hi = box
+        return (tuple(o + l for o, l in zip(origin, lo)),
+                tuple(o + h for o, h in zip(origin, hi)))
+
+    def get_voxels(self, cells):
+        """
+        Vektorizált get_voxel: cells (N, 3) globális voxel indexek -> (N,) anyag tömb.
+        Chunkonként egyetlen fancy-index olvasás.
+        """
+        cells = np.asarray(cells, dtype=np.int64).reshape(-1, 3)
+        materials = np.zeros(len(cells), dtype=np.uint8)
+        if len(cells) == 0:
+            return materials
+        coords = np.floor_divide(cells, CHUNK_SIZE)
+        local = cells - coords * CHUNK_SIZE
+        # A chunk koordinátákat egyetlen int64 kulcsba csomagoljuk (gyors 1D unique)
+        packed = ((coords[:, 0] + (1 << 20)) << 42) | ((coords[:, 1] + (1 << 20)) << 21) \
+            | (coords[:, 2] + (1 << 20))
+        order = np.argsort(packed, kind="stable")
+        keys, starts = np.unique(packed[order], return_index=True)
+        bounds = np.append(starts, len(order))
+        for i in range(len(keys)):
+            rows = order[bounds[i]:bounds[i + 1]]
+            chunk = self.chunks.get(tuple(int(c) for c in coords[rows[0]]))
+            if chunk is None:
+                continue
+            materials[rows] = chunk.get_many(local[rows, 0], local[rows, 1], local[rows, 2])
+        return materials
+
     def generate_world(self):
-        """A kockaalapú világ procedurális generálása."""
+        """A kockaalapú világ procedurális generálása chunkokba."""
         
         print(f"Voxel világ generálása indul: {self.world_size}x{self.world_size} területen.")
-        
-        # Az összes generált voxel egy közös NodePath alá kerül
-        self.world_root = self.render.attachNewNode("WorldRoot")
+        self.build_start = time.perf_counter()
+
+        if self.pool is not None:
+            # Az oszlopokat a workerek építik, az upload_task tölti fel őket frame-enként
+            first_chunk = -self.world_size // CHUNK_SIZE
+            last_chunk = (self.world_size - 1) // CHUNK_SIZE
+            for cx in range(first_chunk, last_chunk + 1):
+                for cy in range(first_chunk, last_chunk + 1):
+                    self.pool.submit((cx, cy), self.world_size, self.mesher_mode,
+                                     self.cache_dir, self.lod_factors, self.packed_vertices,
+                                     self.seed)
+            return
+
+        # 1. lépés: magasságtérkép és voxel adatok, egyben NumPy tömbökként
+        self.chunks = generate_chunks(self.world_size, self.store, self.seed)
+        first_chunk = -self.world_size // CHUNK_SIZE
+        last_chunk = (self.world_size - 1) // CHUNK_SIZE
+        light_columns(self.chunks, (first_chunk, first_chunk), (last_chunk, last_chunk), context=0)
+
+        # 2. lépés: chunkonként egyetlen Geom építése a választott mesherrel
+        for chunk in self.chunks.values():
+            self.build_chunk_node(chunk)
+        self.report_world_stats()
+
+    def report_world_stats(self):
+        build_ms = (time.perf_counter() - self.build_start) * 1000.0
+        num_vertices = sum(chunk.mesh_vertices for chunk in self.chunks.values())
+        num_triangles = sum(chunk.mesh_triangles for chunk in self.chunks.values())
+        print(f"Voxel világ generálása kész: {len(self.chunks)} chunk, "
+              f"{num_vertices} vertex, {num_triangles} háromszög "
+              f"({self.mesher_mode} mesher, {build_ms:.1f} ms).")
+        self.compact_voxels()
+        report = self.memory_report()
+        print(f"Voxel adat: {report['voxel_bytes'] / 1024.0:.1f} KB "
+              f"({report['compressed_chunks']}/{report['chunks']} chunk tömörítve), "
+              f"fény: {report['light_bytes'] / 1024.0:.1f} KB, mesh: {report['mesh_bytes'] / 1024.0:.1f} KB.")
+
+    def build_chunk_node(self, chunk, use_cache=True, immediate=False):
+        """
+        Felépíti (vagy újraépíti) a chunk GeomNode-ját a world_root alatt.
+        Ha a chunk mesh-e már a lemez cache-ben van, onnan tölti be.
+        immediate: azonnal csatolja (szerkesztés), különben a feltöltési sorba kerül.
+        """
+        chunk.remove_node()
+        if chunk.is_empty():
+            return
+
+        cx, cy, cz = chunk.coord
+        if use_cache and self.store is not None:
+            arrays = self.store.load_column(cx, cy)
+            if arrays is not None:
+                cached = stored_mesh(arrays, cz, self.mesh_key)
+                lods = stored_lods(arrays, cz, self.lod_factors, self.packed_vertices)
+                if cached is not None and lods is not None:
+                    self.attach_chunk_geom(chunk, *cached, lods, immediate=immediate)
+                    return
+
+        # A chunk és a szomszédai fénye kell a lapok árnyalásához
+        ensure_lit(self.chunks, (cx - 1, cy - 1), (cx + 1, cy + 1))
+        mesh = build_mesh(chunk, self.chunks.get, self.mesher_mode, self.terrain_size, self.seed)
+        rows, indices = mesh.pack(self.packed_vertices)
+        lods = build_lod_meshes(chunk, self.lod_factors, self.packed_vertices)
+        if self.store is not None:
+            baked = mesh_arrays(chunk.coord, self.mesh_key, rows, indices,
+                                mesh.num_vertices(), mesh.num_triangles())
+            baked.update(lod_mesh_arrays(chunk.coord, lods, self.packed_vertices))
+            self.store.update_column(cx, cy, baked)
+        self.attach_chunk_geom(chunk, rows, indices, mesh.num_vertices(), mesh.num_triangles(),
+                               lods, immediate)
 
-        # Két ciklus a 2D rácshoz (x, y)
-        for x_idx in range(-self.world_size, self.world_size):
-            for y_idx in range(-self.world_size, self.world_size):
-                
-                # Kiszámoljuk a magasságot zajfüggvény alapján
-                height_blocks = simple_noise(x_idx, y_idx, scale=0.1, amplitude=5.0)
-                
-                # A kockák építése a legalsó szinttől a zaj által meghatározott magasságig
-                for z_idx in range(height_blocks):
-                    
-                    # Ha a legalsó réteg (kő)
-                    if z_idx == 0:
-                        voxel_color = LColor(0.5, 0.5, 0.5, 1) # Szürke (kő)
-                    # Ha a legfelső réteg (biome)
-                    elif z_idx == height_blocks - 1:
-                        voxel_color = self.get_color_by_height(height_blocks)
-                    # Ha középső réteg (föld)
+    def attach_chunk_geom(self, chunk, rows, indices, num_vertices, num_triangles, lods=(),
+                          immediate=False):
+        """
+        Csomagolt vertex / index bytes-ból GeomNode a chunk pozíciójára.
+        Ha vannak LOD mesh-ek, a chunk egy LODNode lesz, aminek gyerekei a
+        teljes és a lekicsinyített felbontású GeomNode-ok.
+        A kész node a feltöltési sorba kerül (immediate=True: azonnal a world_root alá).
+        """
+        chunk.remove_node()
+        if num_triangles == 0:
+            return
+        stride = self.vertex_format.getArray(0).getStride()
+        chunk.set_mesh_stats(num_vertices, num_triangles, stride)
+        name = "Chunk_%d_%d_%d" % chunk.coord
+        node = geom_node_from_packed(name, self.vertex_format, rows, indices)
+        if not lods:
+            chunk.node_path = NodePath(node)
+            self.place_chunk_node(chunk)
+            self.upload_chunk_node(chunk, immediate)
+            return
+
+        lod_node = LODNode(name)
+        chunk.node_path = NodePath(lod_node)
+        self.place_chunk_node(chunk)
+        # A váltási távolságot a chunk közepétől mérjük (a node saját koordinátáiban)
+        if self.packed_vertices:
+            center = CHUNK_SIZE / 2.0
+        else:
+            center = (CHUNK_SIZE - 1) * VOXEL_SIZE / 2.0
+        lod_node.setCenter(Point3(center, center, center))
+        switches = (0.0,) + self.lod_distances + (1e9,)
+        chunk.node_path.attachNewNode(node)
+        lod_node.addSwitch(switches[1], switches[0])
+        for level, (factor, lod_rows, lod_indices, lod_vertices, lod_triangles) in enumerate(lods, 1):
+            lod_geom = geom_node_from_packed("%s_lod%d" % (name, factor),
+                                             self.vertex_format, lod_rows, lod_indices)
+            chunk.node_path.attachNewNode(lod_geom)
+            lod_node.addSwitch(switches[level + 1], switches[level])
+            chunk.mesh_bytes += lod_vertices * stride + lod_triangles * 3 * 4
+        self.upload_chunk_node(chunk, immediate)
+
+    def upload_chunk_node(self, chunk, immediate=False):
+        """A chunk még le nem csatolt node-jának csatolása vagy sorba állítása."""
+        if immediate:
+            self.uploader.cancel(chunk.coord)
+            chunk.node_path.reparentTo(self.world_root)
+            return
+        half = (CHUNK_SIZE - 1) * VOXEL_SIZE / 2.0
+        center = [c + half for c in chunk.origin()]
+        self.uploader.enqueue(chunk.coord, chunk.node_path, center)
+
+    def place_chunk_node(self, chunk):
+        """
+        A chunk NodePath elhelyezése. Tömörített formátumnál a vertexek egész
+        rács sarokpontok, így az eltolás és a voxel méret a transzformációba kerül.
+        """
+        if self.packed_vertices:
+            x, y, z = chunk.origin()
+            chunk.node_path.setPos(x - HALF_VOXEL, y - HALF_VOXEL, z - HALF_VOXEL)
+            chunk.node_path.setScale(VOXEL_SIZE)
+        else:
+            chunk.node_path.setPos(*chunk.origin())
+
+    # --- VOXEL SZERKESZTÉS ---
+
+    def set_voxel(self, x_idx, y_idx, z_idx, material):
+        """Egy voxel anyagának beállítása; csak az érintett chunk(ok) lesznek piszkosak."""
+        self.fill_region((x_idx, y_idx, z_idx), (x_idx, y_idx, z_idx), material)
+
+    def clear_voxel(self, x_idx, y_idx, z_idx):
+        """Egy voxel törlése (levegőre állítása)."""
+        self.set_voxel(x_idx, y_idx, z_idx, AIR)
+
+    def fill_box(self, lo, hi, material):
+        """A lo..hi (zárt, globális voxel index) doboz kitöltése egyetlen művelettel."""
+        self.fill_region(lo, hi, material)
+
+    def fill_sphere(self, center, radius, material):
+        """Gömb kitöltése (material=AIR esetén kivájása) a center voxel körül."""
+        cx, cy, cz = center
+        r = int(math.ceil(radius))
+        inside = lambda x, y, z: (x - cx) ** 2 + (y - cy) ** 2 + (z - cz) ** 2 <= radius * radius
+        self.fill_region((cx - r, cy - r, cz - r), (cx + r, cy + r, cz + r), material, inside)
+
+    def fill_region(self, lo, hi, material, inside=None):
+        """
+        Tömeges szerkesztés: a lo..hi doboz (opcionálisan az inside(x, y, z) maszkkal
+        szűkítve, globális koordináta tömbökön) voxeljeinek beállítása chunkonként
+        vektorizálva. Az érintett chunkok csak egyszer kerülnek a remesh sorba.
+        Végül a környék fénye növekményesen frissül (a fény miatt változó chunkok is piszkosak).
+        """
+        changed = False
+        chunk_lo = chunk_coord(*lo)
+        chunk_hi = chunk_coord(*hi)
+        for cx in range(chunk_lo[0], chunk_hi[0] + 1):
+            for cy in range(chunk_lo[1], chunk_hi[1] + 1):
+                self.prepare_column_edit(cx, cy)
+                for cz in range(chunk_lo[2], chunk_hi[2] + 1):
+                    coord = (cx, cy, cz)
+                    chunk = self.get_chunk(coord, create=(material != AIR))
+                    if chunk is None:
+                        continue
+
+                    # A doboz chunkon belüli (lokális, zárt) tartománya
+                    origin = (cx * CHUNK_SIZE, cy * CHUNK_SIZE, cz * CHUNK_SIZE)
+                    local_lo = [max(lo[k] - origin[k], 0) for k in range(3)]
+                    local_hi = [min(hi[k] - origin[k], CHUNK_SIZE - 1) for k in range(3)]
+                    region = chunk.voxels[local_lo[0]:local_hi[0] + 1,
+                                          local_lo[1]:local_hi[1] + 1,
+                                          local_lo[2]:local_hi[2] + 1]
+                    if inside is None:
+                        updated = np.full_like(region, material)
                     else:
-                        voxel_color = LColor(0.4, 0.25, 0.05, 1) # Sötétbarna (föld)
-                        
-                    # Létrehozza a 3D kockát
-                    cube_voxel = make_cube(x_idx, y_idx, z_idx, voxel_color)
-                    
-                    # Hozzáadja a világhoz
-                    cube_voxel.reparentTo(self.world_root)
-
-        print("Voxel világ generálása kész.")
+                        gx, gy, gz = (origin[k] + np.arange(local_lo[k], local_hi[k] + 1)
+                                      for k in range(3))
+                        mask = inside(gx[:, None, None], gy[None, :, None], gz[None, None, :])
+                        updated = np.where(mask, material, region).astype(region.dtype)
+                    if np.array_equal(updated, region):
+                        continue
+                    region[...] = updated
+                    self.mark_dirty(coord, local_lo, local_hi)
+                    changed = True
+        if changed:
+            relit = relight_region(self.chunks, lo, hi)
+            self.dirty_chunks.update(relit)
+            self.stale_chunks.update(relit)
+
+    def mark_dirty(self, coord, local_lo, local_hi):
+        """
+        A chunk, és ha a változás a határán van, a szomszéd chunkok újraépítésre jelölése.
+        Az élen / sarkon lévő változás az átlós szomszédok sarok AO-ját is érinti.
+        """
+        self.dirty_chunks.add(coord)
+        self.stale_chunks.add(coord)
+        self.edited_columns.add(coord[:2])
+        steps = [[0] + ([-1] if local_lo[axis] == 0 else []) + ([1] if local_hi[axis] == CHUNK_SIZE - 1 else [])
+                 for axis in range(3)]
+        for dx in steps[0]:
+            for dy in steps[1]:
+                for dz in steps[2]:
+                    neighbor = (coord[0] + dx, coord[1] + dy, coord[2] + dz)
+                    if neighbor != coord and neighbor in self.chunks:
+                        self.dirty_chunks.add(neighbor)
+                        self.stale_chunks.add(neighbor)
+
+    def prepare_column_edit(self, cx, cy):
+        """
+        Ha az oszlop még a workereknél készül, az eredményt eldobjuk és az adatot
+        szinkron betöltjük, különben a beérkező régi adat felülírná a szerkesztést.
+        """
+        if self.pool is None:
+            return
+        if (cx, cy) in self.pool.pending or any(item[0] == (cx, cy) for item in self.pool.ready):
+            self.pool.cancel((cx, cy))
+            self.load_column(cx, cy)
+            for chunk in self.column_chunks(cx, cy):
+                self.dirty_chunks.add(chunk.coord)
+
+    def remesh_task(self, task):
+        """A piszkos chunkok újraépítése frame-enkénti időkeretben, közelebbiekkel kezdve."""
+        if not self.dirty_chunks:
+            return task.cont
+
+        # A szerkesztett oszlopok voxeljeit elmentjük, és csak a megváltozott chunkok
+        # (minden mesher módú és LOD) mesh-e kerül ki a cache-ből
+        if self.store is not None:
+            stale_columns = {}
+            for cx, cy, cz in self.stale_chunks:
+                stale_columns.setdefault((cx, cy), set()).add(cz)
+            for cx, cy in self.edited_columns | stale_columns.keys():
+                voxels = (voxel_column_arrays(self.column_chunks(cx, cy))
+                          if (cx, cy) in self.edited_columns else {})
+                self.store.update_column(cx, cy, voxels, stale_columns.get((cx, cy), ()))
+        self.edited_columns.clear()
+        self.stale_chunks.clear()
+
+        cam = self.camera.getPos(self.render)
+        size = CHUNK_SIZE * VOXEL_SIZE
+        def camera_distance(coord):
+            return sum(((coord[k] + 0.5) * size - cam[k]) ** 2 for k in range(3))
+
+        start = time.perf_counter()
+        for coord in sorted(self.dirty_chunks, key=camera_distance):
+            self.dirty_chunks.discard(coord)
+            chunk = self.chunks.get(coord)
+            if chunk is None:
+                continue
+            if self.streamer is not None and coord[:2] not in self.streamer.mesh_columns:
+                continue
+            self.build_chunk_node(chunk, use_cache=False, immediate=True)
+            if (time.perf_counter() - start) * 1000.0 >= self.remesh_budget_ms:
+                break
+        return task.cont
+
+    # --- KIJELÖLÉS (SUGÁRVETÉS) ---
+
+    def pick_voxel(self, max_distance=200.0):
+        """A kurzor alatti voxel (RayHit) a kamerából vetett sugárral, vagy None."""
+        if not self.mouseWatcherNode.hasMouse():
+            return None
+        mpos = self.mouseWatcherNode.getMouse()
+        near, far = Point3(), Point3()
+        self.camLens.extrude(mpos, near, far)
+        origin = self.render.getRelativePoint(self.cam, near)
+        target = self.render.getRelativePoint(self.cam, far)
+        return raycast_sparse(self.get_voxel, self.empty_box, origin, target - origin, max_distance)
+
+    def dig_at_mouse(self):
+        start = time.perf_counter()
+        hit = self.pick_voxel()
+        elapsed_us = (time.perf_counter() - start) * 1e6
+        if hit is None:
+            return
+        print(f"Találat: voxel {hit.voxel}, normál {hit.normal}, "
+              f"távolság {hit.distance:.2f} ({elapsed_us:.0f} µs)")
+        self.clear_voxel(*hit.voxel)
+
+    def place_at_mouse(self, material=STONE):
+        hit = self.pick_voxel()
+        if hit is None or hit.normal == (0, 0, 0):
+            return
+        # Az eltalált lap előtti (levegő) cellába rakunk
+        self.set_voxel(*(v + n for v, n in zip(hit.voxel, hit.normal)), material)
+
+    # --- HÁTTÉR GENERÁLÁS ---
+
+    def upload_task(self, task):
+        """A workerektől beérkezett oszlopok feltöltése, frame-enkénti időkeretben."""
+        if self.pool.busy():
+            self.pool.upload(self.apply_column)
+            if not self.pool.busy() and self.streamer is None:
+                self.report_world_stats()
+        return task.cont
+
+    def geom_upload_task(self, task):
+        """A sorban álló chunk node-ok feltöltése a GeomUploadScheduler időkeretében."""
+        if self.uploader.busy():
+            self.uploader.update(self.camera.getPos(self.render))
+            self.uploader.log_progress()
+            if not self.uploader.busy() and self.streamer is None:
+                stats = self.uploader.stats()
+                print(f"Geometria feltöltés kész: {stats['total_uploaded']} node, "
+                      f"{stats['total_upload_bytes'] / 1024.0:.1f} KB, "
+                      f"{stats['total_upload_ms']:.1f} ms összesen, "
+                      f"csúcs {stats['peak_upload_ms']:.2f} ms / frame.")
+        return task.cont
+
+    def apply_column(self, column, results):
+        """Egy worker által elkészített oszlop voxel adatainak és mesh-einek átvétele."""
+        if self.streamer is not None and column not in self.streamer.mesh_columns:
+            return  # Időközben kikerült a streaming sugárból
+        for coord, voxels, rows, indices, num_vertices, num_triangles, lods in results:
+            chunk = self.get_chunk(coord, create=True)
+            chunk.voxels = voxels
+            self.attach_chunk_geom(chunk, rows, indices, num_vertices, num_triangles, lods)
+
+    def request_column(self, cx, cy):
+        """A (cx, cy) oszlop építésének elküldése a workereknek (végtelen világ)."""
+        self.pool.submit((cx, cy), None, self.mesher_mode, self.cache_dir, self.lod_factors,
+                         self.packed_vertices, self.seed)
+
+    # --- CHUNK STREAMING ---
+
+    def streaming_task(self, task):
+        """A kamera körüli chunkok betöltése / eltávolítása frame-enként."""
+        self.streamer.update(self.camera.getPos(self.render))
+        return task.cont
+
+    def load_column(self, cx, cy):
+        """A (cx, cy) chunk oszlop voxel adatainak generálása (végtelen világ)."""
+        for chunk in load_or_generate_column(cx, cy, store=self.store, seed=self.seed):
+            self.chunks[chunk.coord] = chunk
+
+    def column_chunks(self, cx, cy):
+        return [chunk for coord, chunk in self.chunks.items() if coord[:2] == (cx, cy)]
+
+    def unload_column(self, cx, cy):
+        """Az oszlop chunkjainak levétele a jelenetgráfról és felszabadítása."""
+        if self.pool is not None:
+            self.pool.cancel((cx, cy))
+        for chunk in self.column_chunks(cx, cy):
+            chunk.remove_node()
+            del self.chunks[chunk.coord]
+
+    def build_column_nodes(self, cx, cy):
+        for chunk in self.column_chunks(cx, cy):
+            self.build_chunk_node(chunk)
+
+    def remove_column_nodes(self, cx, cy):
+        if self.pool is not None:
+            self.pool.cancel((cx, cy))
+        for chunk in self.column_chunks(cx, cy):
+            chunk.remove_node()
+
+    # --- MEMÓRIA ---
+
+    def compact_task(self, task):
+        self.compact_voxels()
+        return task.again
+
+    def compact_voxels(self):
+        """A nem piszkos chunkok tömörítése; szerkesztéskor a voxels elérés kibontja őket."""
+        for coord, chunk in self.chunks.items():
+            if coord not in self.dirty_chunks:
+                chunk.compress(self.voxel_codec)
+
+    def chunk_memory(self):
+        """Chunkonkénti memória: {koordináta: (voxel byte, mesh byte)}."""
+        return {coord: (chunk.voxel_bytes(), chunk.mesh_bytes)
+                for coord, chunk in self.chunks.items()}
+
+    def memory_report(self):
+        """Összesített memória statisztika a betöltött chunkokról."""
+        chunks = list(self.chunks.values())
+        return {
+            'chunks': len(chunks),
+            'compressed_chunks': sum(chunk.is_compressed() for chunk in chunks),
+            'voxel_bytes': sum(chunk.voxel_bytes() for chunk in chunks),
+            'light_bytes': sum(chunk.light_bytes() for chunk in chunks),
+            'mesh_bytes': sum(chunk.mesh_bytes for chunk in chunks),
+        }
+
+    def memory_bytes(self):
+        """A betöltött chunkok becsült memóriája (voxel adat + GPU bufferek)."""
+        return sum(chunk.memory_bytes() for chunk in self.chunks.values())
 
 if __name__ == "__main__":
     app = VoxelWorld()
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+# Világgenerálás benchmark (ablak nélkül futtatható).
+# Használat: python WorldGenBenchmark.py [térkép méret, alapértelmezés 256]
+#
+# Összeméri a régi, voxelenként make_cube() + vertexenkénti GeomVertexWriter
+# utat az új NumPy alapú chunk mesheléssel és bulk buffer másolással, ugyanazon
+# a generate_chunks() terepen (külön a lapkiválogatás nélküli naiv mesherrel és
+# a takart lapokat elhagyó mesherrel, hogy a vektorizálás és a culling nyeresége
+# külön látsszon), majd a mesherek chunkonkénti idejét (a kocka mesherek és a
+# sima Surface Nets).
+# A hatszög világnál a szintenkénti make_hex_prism() hasábokat, ugyanazokat az
+# oszlopokat vertexenként írt listákkal (azonos geometria), és a chunkonként
+# vektorizált oszlop meshelést (make_hex_chunk) méri össze.
+
+from panda3d.core import NodePath
+import sys
+import time
+import numpy as np
+
+from VoxelWorld import make_cube
+from VoxelTerrain import generate_chunks
+from VoxelChunk import CHUNK_SIZE, MATERIAL_COLORS
+from VoxelMesher import MESHER_NAIVE, MESHER_CULLED, MESHER_GREEDY, build_chunk_mesh
+from VoxelLight import light_columns
+from SmoothMesher import MESHER_SMOOTH, build_mesh
+from HexVoxelWorld import (
+    HexGrid, make_hex_prism, make_hex_chunk, hex_level_color, hex_geom_node,
+    get_hex_center, get_hex_corner, HEX_HEIGHT_STEP, HEX_NORMALS
+)
+
+MAP_SIZE = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+
+
+def legacy_voxel_world(chunks):
+    """A régi generate_world() útja: a chunkok minden szilárd voxelére egy make_cube()."""
+    world_root = NodePath("WorldRoot")
+    for chunk in chunks.values():
+        if chunk.is_empty():
+            continue
+        voxels = chunk.voxels
+        base = np.array(chunk.coord) * CHUNK_SIZE
+        for lx, ly, lz in zip(*np.nonzero(voxels)):
+            color = MATERIAL_COLORS[voxels[lx, ly, lz]]
+            make_cube(base[0] + int(lx), base[1] + int(ly), base[2] + int(lz), color).reparentTo(world_root)
+    return world_root
+
+
+def numpy_voxel_world(chunks, mode=MESHER_CULLED):
+    """Az új út: chunkonként egy NumPy mesh, egy bulk másolt Geom."""
+    world_root = NodePath("WorldRoot")
+    for chunk in chunks.values():
+        if chunk.is_empty():
+            continue
+        mesh = build_chunk_mesh(chunk, chunks.get, mode)
+        node_path = world_root.attachNewNode(mesh.make_geom_node("Chunk_%d_%d_%d" % chunk.coord))
+        node_path.setPos(*chunk.origin())
+    return world_root
+
+
+def mesher_ms_per_chunk(world_size, modes=(MESHER_CULLED, MESHER_GREEDY, MESHER_SMOOTH)):
+    """Mesher módonként a chunkonkénti átlagos mesh-elési idő (ms) és háromszögszám."""
+    chunks = generate_chunks(world_size)
+    first_chunk = -world_size // CHUNK_SIZE
+    last_chunk = (world_size - 1) // CHUNK_SIZE
+    light_columns(chunks, (first_chunk, first_chunk), (last_chunk, last_chunk), context=0)
+    filled = [chunk for chunk in chunks.values() if not chunk.is_empty()]
+    results = {}
+    for mode in modes:
+        start = time.perf_counter()
+        triangles = 0
+        for chunk in filled:
+            triangles += build_mesh(chunk, chunks.get, mode, world_size).num_triangles()
+        elapsed = time.perf_counter() - start
+        results[mode] = (elapsed * 1000.0 / len(filled), triangles / len(filled))
+    return results
+
+
+def hex_grid(world_size):
+    """A hatszög térkép chunkjai (cache nélkül, a zajból)."""
+    grid = HexGrid(world_size)
+    for coord in grid.chunk_range():
+        chunk = grid.generate_chunk(coord)
+        if not chunk.is_empty():
+            grid.chunks[coord] = chunk
+    return grid
+
+
+def legacy_hex_world(grid):
+    """A régi út: szintenként egy make_hex_prism() node, vertexenként írt listákkal."""
+    world_root = NodePath("WorldRoot")
+    for chunk in grid.chunks.values():
+        q0, r0 = chunk.origin()
+        for qi, ri in zip(*np.nonzero(chunk.heights > 0)):
+            height_blocks = int(chunk.heights[qi, ri])
+            for z in range(height_blocks):
+                color = hex_level_color(z, height_blocks)
+                make_hex_prism(q0 + int(qi), r0 + int(ri), z, color).reparentTo(world_root)
+    return world_root
+
+
+def per_vertex_hex_columns(q, r, heights, neighbor_heights, level_color=hex_level_color):
+    """
+    A make_hex_columns() vertexenként, Python listákba író változata: ugyanazok
+    a lapok ugyanabban a sorrendben, így a két út geometriája azonos.
+    """
+    vertices = []
+    colors = []
+    normal_indices = []
+    indices = []
+
+    def add_face(points, color, shade, normal_index):
+        first = len(vertices)
+        vertices.extend(points)
+        colors.extend([(color.x * shade, color.y * shade, color.z * shade, color.w)] * len(points))
+        normal_indices.extend([normal_index] * len(points))
+        for k in range(1, len(points) - 1):
+            indices.extend((first, first + k, first + k + 1))
+
+    for column_q, column_r, height_blocks, column_neighbors in zip(q, r, heights, neighbor_heights):
+        height_blocks = int(height_blocks)
+        hex_center = get_hex_center(column_q, column_r)
+        corners_2d = [get_hex_corner(hex_center, i) for i in range(6)]
+        top_z = height_blocks * HEX_HEIGHT_STEP
+        add_face([(cx, cy, top_z) for cx, cy in corners_2d],
+                 level_color(height_blocks - 1, height_blocks), 1.0, 0)
+        add_face([(cx, cy, 0.0) for cx, cy in reversed(corners_2d)],
+                 level_color(0, height_blocks), 0.8, 1)
+        for i in range(6):
+            low = max(int(column_neighbors[i]), 0)
+            if low >= height_blocks:
+                continue
+            p0 = corners_2d[i]
+            p1 = corners_2d[(i + 1) % 6]
+            cuts = sorted({low, height_blocks} | {z for z in (1, height_blocks - 1) if low < z < height_blocks})
+            for z0, z1 in zip(cuts, cuts[1:]):
+                add_face([(p0[0], p0[1], z0 * HEX_HEIGHT_STEP), (p1[0], p1[1], z0 * HEX_HEIGHT_STEP),
+                          (p1[0], p1[1], z1 * HEX_HEIGHT_STEP), (p0[0], p0[1], z1 * HEX_HEIGHT_STEP)],
+                         level_color(z0, height_blocks), 0.9, 2 + i)
+
+    if not indices:
+        return None
+    normals = [HEX_NORMALS[index] for index in normal_indices]
+    return hex_geom_node('HexColumns', vertices, colors, normals, normal_indices, indices)
+
+
+def per_vertex_hex_world(grid):
+    """Az oszlop mód vertexenkénti írással: chunkonként egy node, a vektorizálttal azonos geometria."""
+    world_root = NodePath("WorldRoot")
+    for chunk in grid.chunks.values():
+        q, r = np.nonzero(chunk.heights > 0)
+        node_path = per_vertex_hex_columns(q, r, chunk.heights[q, r], grid.neighbor_heights(chunk)[q, r])
+        if node_path is not None:
+            node_path.setPos(get_hex_center(*chunk.origin()))
+            node_path.reparentTo(world_root)
+    return world_root
+
+
+def vectorized_hex_world(grid):
+    """Az új út: chunkonként egy oszlop mesh, NumPy broadcasttal és bulk másolással."""
+    world_root = NodePath("WorldRoot")
+    for chunk in grid.chunks.values():
+        node_path = make_hex_chunk(grid, chunk)
+        if node_path is not None:
+            node_path.reparentTo(world_root)
+    return world_root
+
+
+def vertex_count(world_root):
+    return sum(geom.getVertexData().getNumRows()
+               for node_path in world_root.findAllMatches("**/+GeomNode")
+               for geom in node_path.node().getGeoms())
+
+
+def timed(label, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed * 1000.0:10.1f} ms")
+    return elapsed, result
+
+
+if __name__ == "__main__":
+    world_size = MAP_SIZE // 2
+    print(f"Voxel világ benchmark: {MAP_SIZE}x{MAP_SIZE} oszlop")
+
+    # Mindkét út ugyanazokat a voxeleket rajzolja ki; a generálás ideje külön
+    _, chunks = timed("terep generálás (generate_chunks)", generate_chunks, world_size)
+    voxel_count = sum(chunk.solid_count() for chunk in chunks.values())
+    legacy_time, legacy_root = timed("régi (make_cube / voxel)", legacy_voxel_world, chunks)
+    naive_time, naive_root = timed("NumPy naiv + bulk másolás", numpy_voxel_world, chunks, MESHER_NAIVE)
+    numpy_time, numpy_root = timed("NumPy culled + bulk másolás", numpy_voxel_world, chunks)
+
+    print(f"Gyorsulás: {legacy_time / numpy_time:.1f}x (vektorizálás: {legacy_time / naive_time:.1f}x, "
+          f"lapkiválogatás: {naive_time / numpy_time:.1f}x)")
+    print(f"Voxelek: {voxel_count} (régi: {legacy_root.getNumChildren()} kocka), vertexek: "
+          f"{vertex_count(legacy_root)} -> {vertex_count(naive_root)} (naiv) -> "
+          f"{vertex_count(numpy_root)} (culled)")
+
+    print("Mesherek chunkonként:")
+    for mode, (ms_per_chunk, triangles) in mesher_ms_per_chunk(world_size).items():
+        print(f"  {mode:<10} {ms_per_chunk:8.2f} ms / chunk {triangles:10.0f} háromszög / chunk")
+
+    hex_world_size = MAP_SIZE // 8
+    print(f"Hatszög világ benchmark: world_size = {hex_world_size}")
+    grid = hex_grid(hex_world_size)
+    legacy_time, legacy_root = timed("régi (make_hex_prism / szint)", legacy_hex_world, grid)
+    column_time, column_root = timed("oszlop chunk, vertexenként", per_vertex_hex_world, grid)
+    vector_time, vector_root = timed("oszlop chunk, vektorizált", vectorized_hex_world, grid)
+    print(f"Oszlop összevonás: {legacy_time / column_time:.1f}x, vertexek: "
+          f"{vertex_count(legacy_root)} -> {vertex_count(column_root)}")
+    print(f"Vektorizálás (azonos geometria): {column_time / vector_time:.1f}x, vertexek: "
+          f"{vertex_count(column_root)} -> {vertex_count(vector_root)}")